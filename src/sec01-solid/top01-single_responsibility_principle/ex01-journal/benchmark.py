@@ -0,0 +1,151 @@
+import pathlib
+import random
+import tempfile
+import time
+from importlib import import_module
+
+from inverted_index import InvertedIndex
+from segmented_store import SegmentedJournalStore
+from tombstone_journal import StoreObserver, TombstoneJournal
+
+srp = import_module("prg02-srp_adherence")
+
+
+def _timed(func, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def benchmark_save(entries: int = 200_000, saves: int = 20) -> None:
+    """
+    Compares saving a growing journal through `PersistenceManager.save_to_file` with the
+    segmented store.
+
+    :param entries: the number of entries the journal starts with
+    :param saves: the number of single entry appends, each followed by a save
+    """
+    journal = srp.Journal()
+    for i in range(entries):
+        journal.add_entry(f"entry number {i}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = (pathlib.Path(directory) / "journal.txt").as_posix()
+        with SegmentedJournalStore(pathlib.Path(directory) / "segments") as store:
+            initial = _timed(store.save, journal)
+
+            rewrite = append = 0.0
+            for i in range(saves):
+                journal.add_entry(f"late entry {i}")
+                rewrite += _timed(
+                    srp.PersistenceManager.save_to_file, str(journal), filename
+                )
+                append += _timed(store.save, journal)
+
+            ids = [random.randrange(len(store)) for _ in range(10_000)]
+            lookups = _timed(lambda: [store.get(i) for i in ids])
+
+    print(f"Journal with {entries} entries, {saves} appends followed by a save")
+    print(f" - initial segmented save: {initial * 1000:9.2f} ms")
+    print(f" - whole file rewrite:     {rewrite / saves * 1000:9.3f} ms per save")
+    print(f" - segmented append:       {append / saves * 1000:9.3f} ms per save")
+    print(f" - random reads by id:     {lookups / len(ids) * 1e6:9.3f} us per read")
+
+
+def benchmark_remove(entries: int = 200_000, removals: int = 50_000) -> None:
+    """
+    Compares removing random entries through `Journal.remove_entry` with the
+    TombstoneJournal.
+
+    :param entries: the number of entries the journal starts with
+    :param removals: the number of removed entries
+    """
+    journal = srp.Journal()
+    tombstone_journal = TombstoneJournal()
+    for i in range(entries):
+        journal.add_entry(f"entry number {i}")
+        tombstone_journal.add_entry(f"entry number {i}")
+
+    # positions shrink with every removal from the list, ids stay the same
+    positions = [random.randrange(entries - i) for i in range(removals)]
+    ids = random.sample(range(entries), removals)
+
+    list_removal = _timed(lambda: [journal.remove_entry(pos) for pos in positions])
+    tombstone_removal = _timed(
+        lambda: [tombstone_journal.remove_entry(entry_id) for entry_id in ids]
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        with SegmentedJournalStore(directory) as store:
+            persisted = TombstoneJournal()
+            persisted.subscribe(StoreObserver(store))
+            for i in range(entries):
+                persisted.add_entry(f"entry number {i}")
+            store.flush()
+            persisted_removal = _timed(
+                lambda: [persisted.remove_entry(entry_id) for entry_id in ids]
+            )
+            compaction = _timed(store.compact)
+
+    print(f"Journal with {entries} entries, {removals} random removals")
+    print(
+        f" - list deletion:          {list_removal / removals * 1e6:9.3f} us per removal"
+    )
+    print(
+        f" - tombstone:              {tombstone_removal / removals * 1e6:9.3f} us per removal"
+    )
+    print(
+        f" - tombstone with store:   {persisted_removal / removals * 1e6:9.3f} us per removal"
+    )
+    print(f" - store compaction:       {compaction * 1000:9.2f} ms")
+
+
+def benchmark_query(entries: int = 300_000, vocabulary: int = 20_000) -> None:
+    """
+    Compares term and phrase queries through the InvertedIndex with scanning every
+    entry.
+
+    :param entries: the number of entries in the journal
+    :param vocabulary: the number of distinct words the entries are made of
+    """
+    words = [f"word{i}" for i in range(vocabulary)]
+    journal = TombstoneJournal()
+    for _ in range(entries):
+        journal.add_entry(" ".join(random.choices(words, k=8)))
+
+    build = time.perf_counter()
+    index = InvertedIndex(journal)
+    build = time.perf_counter() - build
+
+    queries = [
+        f"{random.choice(words)} OR {random.choice(words)}" for _ in range(1_000)
+    ]
+    term_queries = _timed(lambda: [index.query(query) for query in queries])
+
+    phrases = [" ".join(journal.get_entry(i).split()[2:4]) for i in range(1_000)]
+    phrase_queries = _timed(lambda: [index.query(f'"{p}"') for p in phrases])
+
+    scans = 10
+    scan = _timed(
+        lambda: [[e for e in journal if phrases[i] in e] for i in range(scans)]
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = pathlib.Path(directory) / "journal.terms"
+        save = _timed(index.save, path)
+        load = time.perf_counter()
+        InvertedIndex.load(path, journal)
+        load = time.perf_counter() - load
+
+    print(f"Journal with {entries} entries over {vocabulary} words")
+    print(f" - full index build:       {build * 1000:9.2f} ms")
+    print(f" - OR query of two terms:  {term_queries / len(queries) * 1e6:9.3f} us")
+    print(f" - phrase query:           {phrase_queries / len(phrases) * 1e6:9.3f} us")
+    print(f" - substring scan:         {scan / scans * 1e6:9.3f} us")
+    print(f" - index save / load:      {save * 1000:9.2f} ms / {load * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    benchmark_save()
+    benchmark_remove()
+    benchmark_query()
@@ -0,0 +1,260 @@
+import os
+import pathlib
+import re
+import struct
+from array import array
+from typing import Iterable
+
+from tombstone_journal import JournalObserver, TombstoneJournal
+
+_WORD = re.compile(r"\w+")
+# a double quoted phrase, which an unbalanced quote extends to the end of the query, or
+# a bare word
+_QUERY_TOKEN = re.compile(r'"([^"]*)"?|([^\s"]+)')
+# file header: format version, id watermark of the journal and its number of live
+# entries
+_HEADER = struct.Struct("<IQQ")
+_TERM = struct.Struct("<HI")
+_VERSION = 1
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Splits a text into lowercase terms.
+
+    :param text: the text to split
+    """
+    return _WORD.findall(text.lower())
+
+
+def _text_of(entry: str) -> str:
+    """
+    Strips the "{id}: " prefix of a journal entry, so ids are not indexed as terms.
+    """
+    return entry.partition(": ")[2]
+
+
+class InvertedIndex(JournalObserver):
+    """
+    A full-text index mapping every term to the ids of the journal entries that contain
+    it.
+
+    The index subscribes to a TombstoneJournal and is updated incrementally as entries
+    are added and removed. Queries combine terms and quoted phrases with AND and OR,
+    where AND binds stronger and adjacent terms are implicitly joined by AND, e.g.
+    `"best day" OR diary AND bug`.
+    """
+
+    def __init__(self, journal: TombstoneJournal, build: bool = True):
+        """
+        :param journal: the journal to index
+        :param build: whether to index the entries the journal already holds
+        """
+        self.journal = journal
+        self._postings: dict[str, set[int]] = {}
+        # set after loading an index that may still hold ids which were removed since it
+        # was saved
+        self._verify = False
+        if build:
+            for entry_id, entry in journal.items():
+                self.entry_added(entry_id, entry)
+        journal.subscribe(self)
+
+    def __len__(self) -> int:
+        """
+        The number of distinct terms in the index.
+        """
+        return len(self._postings)
+
+    def entry_added(self, entry_id: int, entry: str) -> None:
+        postings = self._postings
+        for term in set(tokenize(_text_of(entry))):
+            ids = postings.get(term)
+            if ids is None:
+                postings[term] = {entry_id}
+            else:
+                ids.add(entry_id)
+
+    def entry_removed(self, entry_id: int, entry: str) -> None:
+        postings = self._postings
+        for term in set(tokenize(_text_of(entry))):
+            ids = postings.get(term)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del postings[term]
+
+    def term(self, term: str) -> set[int]:
+        """
+        Looks up the ids of all entries that contain a term.
+
+        :param term: a single term, compared case-insensitively
+        :return: a copy of the ids, which the caller may modify
+        """
+        ids = self._postings.get(term.lower(), ())
+        if self._verify:
+            return {entry_id for entry_id in ids if entry_id in self.journal}
+        return set(ids)
+
+    def phrase(self, phrase: str) -> set[int]:
+        """
+        Looks up the ids of all entries that contain the terms of a phrase in order.
+
+        :param phrase: the words of the phrase
+        """
+        terms = tokenize(phrase)
+        if not terms:
+            return set()
+        candidates = self._all_of(terms)
+        if len(terms) == 1:
+            return candidates
+        width = len(terms)
+        matches = set()
+        for entry_id in candidates:
+            if entry_id not in self.journal:
+                continue
+            tokens = tokenize(_text_of(self.journal.get_entry(entry_id)))
+            if any(
+                tokens[i : i + width] == terms for i in range(len(tokens) - width + 1)
+            ):
+                matches.add(entry_id)
+        return matches
+
+    def _all_of(self, terms: Iterable[str]) -> set[int]:
+        """
+        Intersects the postings of several terms, starting with the rarest one.
+        """
+        postings = []
+        for term in set(terms):
+            ids = self._postings.get(term)
+            if not ids:
+                return set()
+            postings.append(ids)
+        postings.sort(key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def query(self, query: str) -> list[int]:
+        """
+        Evaluates a query of terms and quoted phrases joined by AND and OR.
+
+        :param query: the query, e.g. `"best day" OR diary AND bug`
+        :return: the sorted ids of all matching entries
+        """
+        result: set[int] = set()
+        for group in self._parse(query):
+            matches = [self.phrase(part) for part in group]
+            if not matches:
+                continue
+            matches.sort(key=len)
+            result |= matches[0].intersection(*matches[1:])
+        if self._verify:
+            return sorted(entry_id for entry_id in result if entry_id in self.journal)
+        return sorted(result)
+
+    @staticmethod
+    def _parse(query: str) -> list[list[str]]:
+        """
+        Splits a query into OR-joined groups of AND-joined terms or phrases. Only double
+        quotes delimit phrases, so apostrophes as in `today's` are part of a word, and
+        quoted "AND" or "OR" are searched for as words.
+        """
+        groups: list[list[str]] = [[]]
+        for match in _QUERY_TOKEN.finditer(query):
+            phrase, word = match.groups()
+            if word == "OR":
+                groups.append([])
+            elif word == "AND":
+                continue
+            elif word is not None:
+                groups[-1].append(word)
+            elif phrase.strip():
+                groups[-1].append(phrase)
+        return groups
+
+    def save(self, path: str | os.PathLike) -> None:
+        """
+        Persists the index, typically next to the files of the journal it belongs to.
+
+        :param path: the file to write the index to
+        """
+        path = pathlib.Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(_HEADER.pack(_VERSION, self.journal.count, len(self.journal)))
+            for term, ids in self._postings.items():
+                encoded = term.encode("utf-8")
+                fh.write(_TERM.pack(len(encoded), len(ids)))
+                fh.write(encoded)
+                fh.write(array("Q", ids).tobytes())
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str | os.PathLike, journal: TombstoneJournal):
+        """
+        Loads a persisted index and catches up with the entries added to the journal
+        after it was saved.
+
+        :param path: the file the index was saved to
+        :param journal: the journal the index belongs to
+        """
+        index = cls(journal, build=False)
+        data = pathlib.Path(path).read_bytes()
+        version, watermark, live = _HEADER.unpack_from(data)
+        if version != _VERSION:
+            raise ValueError(f"unsupported index version {version}")
+
+        pos = _HEADER.size
+        postings = index._postings
+        while pos < len(data):
+            term_length, count = _TERM.unpack_from(data, pos)
+            pos += _TERM.size
+            term = data[pos : pos + term_length].decode("utf-8")
+            pos += term_length
+            ids = array("Q")
+            ids.frombytes(data[pos : pos + count * ids.itemsize])
+            pos += count * ids.itemsize
+            postings[term] = set(ids)
+
+        for entry_id in range(watermark, journal.count):
+            if entry_id in journal:
+                index.entry_added(entry_id, journal.get_entry(entry_id))
+        # entries removed after saving are only filtered out of query results
+        index._verify = live != len(journal) - (journal.count - watermark)
+        return index
+
+
+def driver():
+    import tempfile
+
+    from segmented_store import SegmentedJournalStore
+    from tombstone_journal import StoreObserver
+
+    with tempfile.TemporaryDirectory() as directory:
+        j = TombstoneJournal()
+        with SegmentedJournalStore(directory) as store:
+            j.subscribe(StoreObserver(store))
+            index = InvertedIndex(j)
+            j.add_entry("Dear diary...")
+            j.add_entry("I ate a bug.")
+            j.add_entry("Today was the best day ever, I ...")
+            j.add_entry("The best bug day.")
+            print(f"best: {index.query('best')}")
+            print('"best day":', index.query('"best day"'))
+            print(f"diary OR bug: {index.query('diary OR bug')}")
+            print(f"best AND bug: {index.query('best AND bug')}")
+            j.remove_entry(1)
+            print(f"bug after removing entry 1: {index.query('bug')}")
+            index.save(store.directory / "journal.terms")
+
+        # on startup the journal is restored from the store and the index is loaded next
+        # to it
+        with SegmentedJournalStore(directory) as store:
+            j = TombstoneJournal.restore(store)
+            index = InvertedIndex.load(store.directory / "journal.terms", j)
+            print(f"bug after reloading: {index.query('bug')}")
+
+
+if __name__ == "__main__":
+    driver()
@@ -0,0 +1,419 @@
+import mmap
+import os
+import pathlib
+import struct
+from array import array
+from typing import Any, Iterable, Iterator
+
+# every index record holds the byte offset and the byte length of one entry
+_INDEX_RECORD = struct.Struct("<QI")
+# length marker of an index record whose entry was deleted and whose data is no longer
+# in the log
+_DELETED = 0xFFFFFFFF
+# offset flag of an index record whose entry was deleted, the length still tells how far
+# its data reaches in the log
+_TOMBSTONE = 1 << 63
+
+
+class _Segment:
+    """
+    A single log file of the store together with the path of its offset index.
+    """
+
+    def __init__(self, directory: pathlib.Path, number: int):
+        self.number = number
+        self.log_path = directory / f"segment-{number:06d}.log"
+        self.index_path = directory / f"segment-{number:06d}.idx"
+        self.first_id = 0
+        self.count = 0
+        self.size = 0
+        self.dead = 0
+        self._map: mmap.mmap | None = None
+
+    def read(self, offset: int, length: int) -> bytes:
+        """
+        Reads a slice of the log through a memory map, remapping once the log has grown
+        past the mapped region.
+
+        :param offset: byte offset of the entry within the log
+        :param length: byte length of the entry
+        """
+        if self._map is None or offset + length > len(self._map):
+            self.close()
+            with open(self.log_path, "rb") as fh:
+                self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map[offset : offset + length]
+
+    def close(self) -> None:
+        """
+        Releases the memory map of the log, if any.
+        """
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+class SegmentedJournalStore:
+    """
+    An append-only journal backend which spreads entries over size limited segment
+    files.
+
+    Only entries that were not stored before are written, fsyncs are batched and every
+    entry is read back by its id in O(1) through an in-memory offset index and a memory
+    mapped segment. Deleting an entry overwrites its index record with a tombstone, the
+    space is reclaimed by `compact`.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        segment_size: int = 64 * 1024 * 1024,
+        sync_every: int = 1024,
+    ):
+        """
+        Opens the store in the given directory, recovering any segments that were
+        written before.
+
+        :param directory: the directory holding the segment and index files
+        :param segment_size: the number of bytes after which a new segment is started
+        :param sync_every: the number of appended entries that are buffered before they
+            are written and fsynced
+        """
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_size = segment_size
+        self.sync_every = sync_every
+
+        self._segments: list[_Segment] = []
+        # entry id -> location, kept as compact arrays rather than a list of tuples
+        self._segment_numbers = array("I")
+        self._offsets = array("Q")
+        self._lengths = array("I")
+        self._pending: list[bytes] = []
+        self._pending_index: list[bytes] = []
+        # ids of deleted entries with their lengths, which their tombstones keep
+        self._pending_deletes: list[tuple[int, int]] = []
+        self._durable = 0
+
+        self._recover()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __iter__(self) -> Iterator[str]:
+        for entry_id in range(len(self)):
+            if self._lengths[entry_id] != _DELETED:
+                yield self.get(entry_id)
+
+    def items(self) -> Iterator[tuple[int, str]]:
+        """
+        Iterates over the live entries together with their ids.
+        """
+        for entry_id in range(len(self)):
+            if self._lengths[entry_id] != _DELETED:
+                yield entry_id, self.get(entry_id)
+
+    def __contains__(self, entry_id: int) -> bool:
+        return 0 <= entry_id < len(self) and self._lengths[entry_id] != _DELETED
+
+    def _recover(self) -> None:
+        """
+        Loads the offset index of every existing segment and drops entries which only
+        partially reached the disk.
+        """
+        for log_path in sorted(self.directory.glob("segment-*.log")):
+            segment = _Segment(self.directory, int(log_path.stem.split("-")[1]))
+            self._finish_compaction(segment)
+            segment.first_id = len(self._offsets)
+            log_size = log_path.stat().st_size
+            raw = (
+                segment.index_path.read_bytes() if segment.index_path.exists() else b""
+            )
+            raw = raw[: len(raw) - len(raw) % _INDEX_RECORD.size]
+
+            live = 0
+            for offset, length in _INDEX_RECORD.iter_unpack(raw):
+                if offset & _TOMBSTONE or length == _DELETED:
+                    # tombstones are only written for entries already on disk, so they
+                    # never end the index, and their data still counts towards the size,
+                    # or truncating would move later appends onto it
+                    if length != _DELETED:
+                        offset &= ~_TOMBSTONE
+                        segment.size = max(segment.size, offset + length + 1)
+                    length = _DELETED
+                # the trailing newline must be on disk as well
+                elif offset + length + 1 > log_size:
+                    break
+                else:
+                    segment.size = max(segment.size, offset + length + 1)
+                    live += length + 1
+                self._segment_numbers.append(len(self._segments))
+                self._offsets.append(offset)
+                self._lengths.append(length)
+                segment.count += 1
+
+            # truncate a torn tail so new entries are appended right after the last
+            # complete one
+            if segment.size != log_size:
+                os.truncate(log_path, segment.size)
+            valid = segment.count * _INDEX_RECORD.size
+            if valid != len(raw) or not segment.index_path.exists():
+                segment.index_path.write_bytes(raw[:valid])
+            segment.dead = segment.size - live
+            self._segments.append(segment)
+
+        self._durable = len(self._offsets)
+
+    @staticmethod
+    def _finish_compaction(segment: _Segment) -> None:
+        """
+        Completes or rolls back a compaction of the segment that was interrupted.
+
+        The compacted log replaces the old one before the compacted index does, so a
+        left over compacted log means the old files are still intact, while a lone
+        compacted index still has to be moved into place.
+        """
+        log_tmp = segment.log_path.with_suffix(".log.compact")
+        index_tmp = segment.index_path.with_suffix(".idx.compact")
+        if log_tmp.exists():
+            log_tmp.unlink()
+            index_tmp.unlink(missing_ok=True)
+        elif index_tmp.exists():
+            os.replace(index_tmp, segment.index_path)
+
+    def _roll(self) -> _Segment:
+        """
+        Starts a new, empty segment and makes it the active one.
+        """
+        number = self._segments[-1].number + 1 if self._segments else 0
+        segment = _Segment(self.directory, number)
+        segment.first_id = len(self._offsets)
+        segment.log_path.touch()
+        segment.index_path.touch()
+        self._segments.append(segment)
+        return segment
+
+    def append(self, text: str) -> int:
+        """
+        Appends an entry to the store.
+
+        :param text: the journal entry
+        :return: the id of the stored entry
+        """
+        data = text.encode("utf-8")
+        segment = self._segments[-1] if self._segments else self._roll()
+        if segment.size and segment.size + len(data) + 1 > self.segment_size:
+            self.flush()
+            segment = self._roll()
+
+        entry_id = len(self._offsets)
+        self._segment_numbers.append(len(self._segments) - 1)
+        self._offsets.append(segment.size)
+        self._lengths.append(len(data))
+        self._pending.append(data)
+        self._pending_index.append(_INDEX_RECORD.pack(segment.size, len(data)))
+        segment.size += len(data) + 1
+        segment.count += 1
+
+        if len(self._pending) >= self.sync_every:
+            self.flush()
+        return entry_id
+
+    def extend(self, texts: Iterable[str]) -> None:
+        """
+        Appends several entries to the store.
+
+        :param texts: the journal entries
+        """
+        for text in texts:
+            self.append(text)
+
+    def save(self, journal: Any) -> int:
+        """
+        Stores the entries of a journal which are not in the store yet and syncs them to
+        disk.
+
+        Entry ids of the store follow the positions in `journal.entries`, so this only
+        holds for journals whose entries are never removed.
+
+        :param journal: a Journal instance
+        :return: the number of newly written entries
+        """
+        entries = journal.entries
+        start = len(self)
+        for pos in range(start, len(entries)):
+            self.append(entries[pos])
+        self.flush()
+        return len(entries) - start
+
+    def delete(self, entry_id: int) -> None:
+        """
+        Deletes an entry by marking its index record with a tombstone. The record is
+        rewritten in place with the next batch of entries, the entry data stays on disk
+        until the segment is compacted.
+
+        :param entry_id: the id of the entry to delete
+        """
+        if entry_id not in self:
+            raise KeyError(f"no entry with id {entry_id}")
+        segment = self._segments[self._segment_numbers[entry_id]]
+        segment.dead += self._lengths[entry_id] + 1
+        self._pending_deletes.append((entry_id, self._lengths[entry_id]))
+        self._lengths[entry_id] = _DELETED
+        if len(self._pending) + len(self._pending_deletes) >= self.sync_every:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes all buffered entries to the active segment and fsyncs both the log and
+        its index, then writes the tombstones of deleted entries.
+        """
+        self._flush_entries()
+        self._flush_deletes()
+
+    def _flush_entries(self) -> None:
+        if not self._pending:
+            return
+        segment = self._segments[-1]
+        # the log goes first, recovery drops index records which point past its end
+        with open(segment.log_path, "ab") as fh:
+            fh.write(b"\n".join(self._pending) + b"\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+        with open(segment.index_path, "ab") as fh:
+            fh.write(b"".join(self._pending_index))
+            fh.flush()
+            os.fsync(fh.fileno())
+        self._durable += len(self._pending)
+        self._pending.clear()
+        self._pending_index.clear()
+
+    def _flush_deletes(self) -> None:
+        if not self._pending_deletes:
+            return
+        by_segment: dict[int, list[tuple[int, int]]] = {}
+        for entry_id, length in self._pending_deletes:
+            by_segment.setdefault(self._segment_numbers[entry_id], []).append(
+                (entry_id, length)
+            )
+        for number, deletes in by_segment.items():
+            segment = self._segments[number]
+            with open(segment.index_path, "r+b") as fh:
+                for entry_id, length in deletes:
+                    fh.seek((entry_id - segment.first_id) * _INDEX_RECORD.size)
+                    fh.write(
+                        _INDEX_RECORD.pack(self._offsets[entry_id] | _TOMBSTONE, length)
+                    )
+                fh.flush()
+                os.fsync(fh.fileno())
+        self._pending_deletes.clear()
+
+    def compact(self, min_dead_ratio: float = 0.5) -> int:
+        """
+        Rewrites every segment in which deleted entries take up at least the given share
+        of the log.
+
+        :param min_dead_ratio: the share of dead bytes from which a segment is rewritten
+        :return: the number of reclaimed bytes
+        """
+        self.flush()
+        reclaimed = 0
+        for segment in self._segments:
+            if segment.dead and segment.dead >= segment.size * min_dead_ratio:
+                reclaimed += self._compact_segment(segment)
+        return reclaimed
+
+    def _compact_segment(self, segment: _Segment) -> int:
+        """
+        Copies the live entries of a segment into a new log and index and swaps them in.
+        """
+        log_tmp = segment.log_path.with_suffix(".log.compact")
+        index_tmp = segment.index_path.with_suffix(".idx.compact")
+        offsets: list[int] = []
+        size = 0
+        with open(log_tmp, "wb") as log, open(index_tmp, "wb") as index:
+            for entry_id in range(segment.first_id, segment.first_id + segment.count):
+                length = self._lengths[entry_id]
+                if length == _DELETED:
+                    offsets.append(0)
+                    index.write(_INDEX_RECORD.pack(0, _DELETED))
+                    continue
+                log.write(segment.read(self._offsets[entry_id], length) + b"\n")
+                index.write(_INDEX_RECORD.pack(size, length))
+                offsets.append(size)
+                size += length + 1
+            for fh in (log, index):
+                fh.flush()
+                os.fsync(fh.fileno())
+
+        segment.close()
+        # see _finish_compaction for how a crash between both replacements is resolved
+        os.replace(log_tmp, segment.log_path)
+        os.replace(index_tmp, segment.index_path)
+
+        reclaimed = segment.size - size
+        self._offsets[segment.first_id : segment.first_id + segment.count] = array(
+            "Q", offsets
+        )
+        segment.size = size
+        segment.dead = 0
+        return reclaimed
+
+    def get(self, entry_id: int) -> str:
+        """
+        Reads back a single entry.
+
+        :param entry_id: the id returned by `append`
+        :return: the journal entry
+        """
+        if not 0 <= entry_id < len(self._offsets):
+            raise IndexError(f"no entry with id {entry_id}")
+        if self._lengths[entry_id] == _DELETED:
+            raise KeyError(f"entry {entry_id} was deleted")
+        if entry_id >= self._durable:
+            return self._pending[entry_id - self._durable].decode("utf-8")
+        segment = self._segments[self._segment_numbers[entry_id]]
+        return segment.read(self._offsets[entry_id], self._lengths[entry_id]).decode(
+            "utf-8"
+        )
+
+    def close(self) -> None:
+        """
+        Flushes pending entries and releases all memory maps.
+        """
+        self.flush()
+        for segment in self._segments:
+            segment.close()
+
+
+def driver():
+    import tempfile
+    from importlib import import_module
+
+    Journal = import_module("prg02-srp_adherence").Journal
+
+    j = Journal()
+    j.add_entry("Dear diary...")
+    j.add_entry("Today was the best day ever, I ...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        with SegmentedJournalStore(directory, segment_size=64) as store:
+            print(f"Stored {store.save(j)} new entries")
+            j.add_entry("Tomorrow will be even better.")
+            print(f"Stored {store.save(j)} new entry")
+
+        # reopen the store and read the entries back by id
+        with SegmentedJournalStore(directory, segment_size=64) as store:
+            for entry_id in range(len(store)):
+                print(store.get(entry_id))
+            print(f"Segments: {sorted(p.name for p in store.directory.iterdir())}")
+
+
+if __name__ == "__main__":
+    driver()
@@ -0,0 +1,206 @@
+from abc import ABC, abstractmethod
+from array import array
+from typing import Iterator
+
+from segmented_store import SegmentedJournalStore
+
+
+class JournalObserver(ABC):
+    """
+    Interface for anything that has to follow the changes made to a journal, such as a
+    store or an index.
+    """
+
+    @abstractmethod
+    def entry_added(self, entry_id: int, entry: str) -> None:
+        pass
+
+    @abstractmethod
+    def entry_removed(self, entry_id: int, entry: str) -> None:
+        pass
+
+
+class TombstoneJournal:
+    """
+    A journal whose entries keep their id for good.
+
+    Removing an entry only leaves a tombstone in its slot, so both removal and the
+    lookup of an entry by its id take O(1). Once tombstones make up more than
+    `compact_ratio` of the slots, they are dropped in a single pass, which keeps the
+    amortized cost of a removal constant.
+    """
+
+    def __init__(self, compact_ratio: float = 0.5):
+        """
+        :param compact_ratio: the share of tombstones among all slots which triggers a
+            compaction
+        """
+        self.compact_ratio = compact_ratio
+        self.count = 0
+        self._entries: list[str | None] = []
+        self._ids = array("Q")
+        self._positions: dict[int, int] = {}
+        self._tombstones = 0
+        self._observers: list[JournalObserver] = []
+
+    def __str__(self) -> str:
+        """
+        An EOL separated string representation of the journal.
+        """
+        return "\n".join(self)
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __iter__(self) -> Iterator[str]:
+        return (entry for entry in self._entries if entry is not None)
+
+    def __contains__(self, entry_id: int) -> bool:
+        return entry_id in self._positions
+
+    def items(self) -> Iterator[tuple[int, str]]:
+        """
+        Iterates over the entries together with their ids.
+        """
+        for entry_id, entry in zip(self._ids, self._entries):
+            if entry is not None:
+                yield entry_id, entry
+
+    @classmethod
+    def restore(cls, store: SegmentedJournalStore, compact_ratio: float = 0.5):
+        """
+        Rebuilds a journal from the live entries of a store, without notifying any
+        observers.
+
+        :param store: the store the journal was persisted to
+        :param compact_ratio: the share of tombstones among all slots which triggers a
+            compaction
+        """
+        journal = cls(compact_ratio=compact_ratio)
+        for entry_id, entry in store.items():
+            journal._positions[entry_id] = len(journal._entries)
+            journal._entries.append(entry)
+            journal._ids.append(entry_id)
+        journal.count = len(store)
+        return journal
+
+    @property
+    def tombstones(self) -> int:
+        """
+        The number of removed entries whose slots were not reclaimed yet.
+        """
+        return self._tombstones
+
+    def subscribe(self, observer: JournalObserver) -> None:
+        """
+        Registers an observer that is notified about every added and removed entry.
+
+        :param observer: the JournalObserver implementation
+        """
+        self._observers.append(observer)
+
+    def add_entry(self, text: str) -> int:
+        """
+        Adds an entry to the journal and updates the entry id.
+
+        :param text: the journal entry
+        :return: the id of the new entry
+        """
+        entry_id = self.count
+        entry = f"{entry_id}: {text}"
+        self._positions[entry_id] = len(self._entries)
+        self._entries.append(entry)
+        self._ids.append(entry_id)
+        self.count += 1
+        for observer in self._observers:
+            observer.entry_added(entry_id, entry)
+        return entry_id
+
+    def get_entry(self, entry_id: int) -> str:
+        """
+        Looks up an entry by its id.
+
+        :param entry_id: id of the journal entry
+        """
+        return self._entries[self._positions[entry_id]]
+
+    def remove_entry(self, entry_id: int) -> None:
+        """
+        Removes an entry from the journal based on its id, leaving a tombstone in its
+        slot.
+
+        :param entry_id: id of the journal entry
+        """
+        pos = self._positions.pop(entry_id)
+        entry = self._entries[pos]
+        self._entries[pos] = None
+        self._tombstones += 1
+        for observer in self._observers:
+            observer.entry_removed(entry_id, entry)
+        if self._tombstones > len(self._entries) * self.compact_ratio:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Drops all tombstones in one pass and reassigns the positions of the remaining
+        entries.
+        """
+        if not self._tombstones:
+            return
+        entries: list[str | None] = []
+        ids = array("Q")
+        for entry_id, entry in zip(self._ids, self._entries):
+            if entry is not None:
+                entries.append(entry)
+                ids.append(entry_id)
+        self._entries = entries
+        self._ids = ids
+        self._positions = {entry_id: pos for pos, entry_id in enumerate(ids)}
+        self._tombstones = 0
+
+
+class StoreObserver(JournalObserver):
+    """
+    Keeps a SegmentedJournalStore in line with a TombstoneJournal, so that the ids of
+    both stay the same.
+    """
+
+    def __init__(self, store: SegmentedJournalStore):
+        self.store = store
+
+    def entry_added(self, entry_id: int, entry: str) -> None:
+        stored_id = self.store.append(entry)
+        if stored_id != entry_id:
+            raise ValueError(
+                f"store is out of sync, entry {entry_id} was stored as {stored_id}"
+            )
+
+    def entry_removed(self, entry_id: int, entry: str) -> None:
+        self.store.delete(entry_id)
+
+
+def driver():
+    import tempfile
+
+    j = TombstoneJournal()
+    with tempfile.TemporaryDirectory() as directory:
+        store = SegmentedJournalStore(directory)
+        j.subscribe(StoreObserver(store))
+
+        for text in ("Dear diary...", "I ate a bug.", "Today was the best day ever"):
+            j.add_entry(text)
+        j.remove_entry(1)
+        print(f"Journal entries:\n{j}\n")
+        print(f"Entry 2 is still found by its id: {j.get_entry(2)!r}")
+
+        store.flush()
+        print(f"Reclaimed {store.compact(min_dead_ratio=0)} bytes on disk")
+        store.close()
+
+        # the persisted journal keeps the tombstone after it was reopened
+        with SegmentedJournalStore(directory) as reopened:
+            print(f"Persisted entries: {list(reopened)}, 1 in store: {1 in reopened}")
+
+
+if __name__ == "__main__":
+    driver()
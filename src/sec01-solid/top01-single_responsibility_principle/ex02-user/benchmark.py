@@ -0,0 +1,164 @@
+import csv
+import os
+import tempfile
+import time
+import tracemalloc
+from importlib import import_module
+from typing import Sequence
+
+from broadcast import Broadcaster
+from stand_in_server import StandInSMSServer, StandInSMTPServer
+from transports import PooledEmailSender, PooledSMSSender
+from user_loaders import iter_users_csv
+
+srp = import_module("prg04-srp_adherence")
+# its User still keeps a __dict__ per instance, like the User before __slots__ were
+# added
+srp_violation = import_module("prg03-srp_violation")
+
+
+class StandInTransport(srp.SenderInterface):
+    """
+    A local stand-in for a real transport which only simulates the latency of a
+    round-trip and rejects some recipients.
+    """
+
+    def __init__(self, latency: float = 0.001, fail_every: int = 1000):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.round_trips = 0
+
+    def _check(self, recipient_info) -> None:
+        if int(recipient_info.username[4:]) % self.fail_every == 0:
+            raise ConnectionError(f"{recipient_info.email} rejected")
+
+    def send(self, recipient_info, message: str) -> None:
+        self.round_trips += 1
+        time.sleep(self.latency)
+        self._check(recipient_info)
+
+    def send_batch(self, recipients: Sequence, message: str) -> dict[str, Exception]:
+        self.round_trips += 1
+        time.sleep(self.latency)
+        failures = {}
+        for recipient_info in recipients:
+            try:
+                self._check(recipient_info)
+            except ConnectionError as e:
+                failures[recipient_info.username] = e
+        return failures
+
+
+def benchmark_broadcast(users: int = 2_000) -> None:
+    """
+    Compares the serial `UserManager.send_message_to_all_users` with concurrent, batched
+    broadcasts.
+
+    :param users: the number of registered users
+    """
+    user_manager = srp.UserManager()
+    for i in range(1, users + 1):
+        user_manager.add_user(
+            srp.User(username=f"user{i}", email=f"user{i}@example.com", phone_number="")
+        )
+
+    transport = StandInTransport(fail_every=users + 1)
+    start = time.perf_counter()
+    user_manager.send_message_to_all_users(sender=transport, message="Hello!")
+    serial = time.perf_counter() - start
+
+    print(f"Broadcast to {users} users with a 1 ms round-trip")
+    print(f" - serial send:                    {users / serial:10.0f} messages/s")
+    for concurrency, batch_size in ((16, 1), (16, 100), (64, 100)):
+        transport = StandInTransport()
+        report = Broadcaster(transport, concurrency, batch_size).run(
+            user_manager.get_users().values(), "Hello!"
+        )
+        print(
+            f" - concurrency {concurrency:3d}, batch {batch_size:3d}:     "
+            f"{report.throughput:10.0f} messages/s, "
+            f"{transport.round_trips} round-trips, {len(report.failures)} failed"
+        )
+
+
+def benchmark_pooling(messages: int = 500) -> None:
+    """
+    Compares pooled transports with opening a new connection per message, against the
+    local stand-in servers.
+
+    :param messages: the number of messages sent per run
+    """
+    users = [
+        srp.User(username=f"user{i}", email=f"user{i}@example.com", phone_number=str(i))
+        for i in range(messages)
+    ]
+
+    print(f"Sending {messages} messages one by one through the stand-in servers")
+    for server_type, sender_type in (
+        (StandInSMTPServer, PooledEmailSender),
+        (StandInSMSServer, PooledSMSSender),
+    ):
+        # a connection that may not idle at all is never reused
+        for label, max_idle in (("per message", 0.0), ("pooled", 60.0)):
+            with server_type() as server:
+                sender = sender_type(*server.address, max_idle=max_idle)
+                report = Broadcaster(sender, concurrency=8, batch_size=1).run(
+                    users, "Hello!"
+                )
+                sender.pool.close()
+                print(
+                    f" - {sender_type.__name__:18s} {label:12s}"
+                    f"{report.throughput:8.0f} messages/s, "
+                    f"{server.connections} connections opened"
+                )
+
+
+def _allocated(func) -> int:
+    tracemalloc.start()
+    try:
+        result = func()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+def benchmark_memory(users: int = 200_000) -> None:
+    """
+    Compares the memory per user of `__dict__` based users with the `__slots__` based
+    User, both as plain objects and streamed from CSV into an indexed UserManager.
+
+    :param users: the number of users
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "users.csv")
+        with open(path, "w", newline="", encoding="utf-8") as fh:
+            writer = csv.writer(fh)
+            writer.writerow(("username", "email", "phone_number"))
+            for i in range(users):
+                writer.writerow((f"user{i}", f"user{i}@example.com", f"+1555{i:07d}"))
+
+        print(f"Memory per user for {users} users")
+        for label, user_type in (
+            ("__dict__", srp_violation.User),
+            ("__slots__", srp.User),
+        ):
+            objects = _allocated(lambda: list(iter_users_csv(path, user_type)))
+
+            def load():
+                user_manager = srp.UserManager()
+                user_manager.add_users(iter_users_csv(path, user_type))
+                return user_manager
+
+            managed = _allocated(load)
+            print(
+                f" - {label:10s} objects: {objects / users:6.1f} bytes, "
+                f"indexed UserManager: {managed / users:6.1f} bytes"
+            )
+
+
+if __name__ == "__main__":
+    benchmark_broadcast()
+    benchmark_pooling()
+    benchmark_memory()
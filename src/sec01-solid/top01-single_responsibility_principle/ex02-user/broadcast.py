@@ -0,0 +1,153 @@
+import asyncio
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from typing import Any, Iterable, Sequence
+
+srp = import_module("prg04-srp_adherence")
+
+
+class BroadcastReport:
+    """
+    The outcome of a broadcast, including every recipient whose message could not be
+    sent.
+    """
+
+    def __init__(self):
+        self.sent = 0
+        self.batches = 0
+        self.failures: dict[str, Exception] = {}
+        self.elapsed = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.sent} sent in {self.batches} batches, {len(self.failures)} failed, "
+            f"{self.throughput:.0f} messages/s"
+        )
+
+    @property
+    def throughput(self) -> float:
+        """
+        The number of successfully sent messages per second.
+        """
+        return self.sent / self.elapsed if self.elapsed else 0.0
+
+    def record(self, batch: Sequence[Any], failures: dict[str, Exception]) -> None:
+        """
+        Adds the outcome of a single batch to the report.
+
+        :param batch: the users the batch was sent to
+        :param failures: the usernames whose message could not be sent, mapped to the
+            raised exception
+        """
+        self.batches += 1
+        self.sent += len(batch) - len(failures)
+        self.failures.update(failures)
+
+
+class Broadcaster:
+    """
+    Sends a message to many users concurrently, in batches of recipients per round-trip.
+
+    Users are read lazily and handed to a bounded queue, so a large user base is never
+    copied into memory and the producer waits whenever all workers are busy. A failing
+    batch or recipient is recorded in the report instead of aborting the broadcast.
+    """
+
+    def __init__(self, sender: Any, concurrency: int = 16, batch_size: int = 100):
+        """
+        :param sender: the SenderInterface implementation, `send_batch` may also be a
+            coroutine function
+        :param concurrency: the maximum number of batches in flight
+        :param batch_size: the maximum number of recipients per `send_batch` call
+        """
+        if concurrency < 1 or batch_size < 1:
+            raise ValueError("concurrency and batch_size must be at least 1")
+        self.sender = sender
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+
+    def run(self, users: Iterable[Any], message: str) -> BroadcastReport:
+        """
+        Runs a broadcast to completion from synchronous code.
+
+        :param users: the users to send the message to
+        :param message: the message to send
+        """
+        return asyncio.run(self.broadcast(users, message))
+
+    async def broadcast(self, users: Iterable[Any], message: str) -> BroadcastReport:
+        """
+        Sends a message to all given users.
+
+        :param users: the users to send the message to
+        :param message: the message to send
+        """
+        report = BroadcastReport()
+        queue: asyncio.Queue[list[Any] | None] = asyncio.Queue(maxsize=self.concurrency)
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+
+            async def work() -> None:
+                while (batch := await queue.get()) is not None:
+                    try:
+                        failures = await self._send_batch(batch, message, executor)
+                    except Exception as e:
+                        failures = {user.username: e for user in batch}
+                    report.record(batch, failures)
+
+            workers = [asyncio.create_task(work()) for _ in range(self.concurrency)]
+            try:
+                batch = []
+                for user in users:
+                    batch.append(user)
+                    if len(batch) == self.batch_size:
+                        # blocks while the queue is full, which throttles reading users
+                        await queue.put(batch)
+                        batch = []
+                if batch:
+                    await queue.put(batch)
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                for worker in workers:
+                    worker.cancel()
+
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    async def _send_batch(
+        self, batch: list[Any], message: str, executor: ThreadPoolExecutor
+    ) -> dict[str, Exception]:
+        """
+        Awaits asynchronous senders directly and runs blocking ones on the thread pool.
+        """
+        if inspect.iscoroutinefunction(self.sender.send_batch):
+            return await self.sender.send_batch(batch, message)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            executor, self.sender.send_batch, batch, message
+        )
+
+
+def driver():
+    user_manager = srp.UserManager()
+    for i in range(5):
+        user_manager.add_user(
+            srp.User(
+                username=f"User{i}", email=f"user{i}@example.com", phone_number=f"0{i}"
+            )
+        )
+
+    broadcaster = Broadcaster(srp.EmailSender(), concurrency=2, batch_size=2)
+    report = broadcaster.run(
+        user_manager.get_users().values(), "Welcome to our emailing platform!"
+    )
+    print(report)
+
+
+if __name__ == "__main__":
+    driver()
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Iterable, Sequence
 
 
 class User:
@@ -6,6 +7,9 @@ class User:
     A class to construct representations of user for a certain platform.
     """
 
+    # no per-instance __dict__, which keeps millions of users compact in memory
+    __slots__ = ("_username", "_email", "_phone_number")
+
     def __init__(self, username: str, email: str, phone_number: str):
         self._username = username
         self._email = email
@@ -48,6 +52,27 @@ class SenderInterface(ABC):
     def send(self, recipient_info: User, message: str):
         pass
 
+    def send_batch(
+        self, recipients: Sequence[User], message: str
+    ) -> dict[str, Exception]:
+        """
+        Sends the same message to many recipients. Implementations that can reach
+        several recipients in a single round-trip should override this, by default the
+        message is sent to each recipient separately.
+
+        :param recipients: the users to send the message to
+        :param message: the message to send
+        :return: a mapping of the usernames whose message could not be sent to the
+            raised exception
+        """
+        failures = {}
+        for recipient_info in recipients:
+            try:
+                self.send(recipient_info=recipient_info, message=message)
+            except Exception as e:
+                failures[recipient_info.username] = e
+        return failures
+
 
 class EmailSender(SenderInterface):
     """
@@ -68,6 +93,22 @@ class EmailSender(SenderInterface):
             f"Sending email to {recipient_info.username} at address {recipient_info.email}: {message}"
         )
 
+    def send_batch(
+        self, recipients: Sequence[User], message: str
+    ) -> dict[str, Exception]:
+        """
+        Sends the email message to many recipients at once, as a single message with
+        multiple recipients.
+
+        :param recipients: the users to send the email to
+        :param message: the actual email
+        :return: a mapping of the usernames whose email could not be sent to the raised
+            exception
+        """
+        addresses = ", ".join(recipient_info.email for recipient_info in recipients)
+        print(f"Sending email to {addresses}: {message}")
+        return {}
+
     # implement email sending logic here
 
 
@@ -88,6 +129,24 @@ class SMSSender(SenderInterface):
         """
         print(f"Sending SMS to {recipient_info.phone_number}: {message}")
 
+    def send_batch(
+        self, recipients: Sequence[User], message: str
+    ) -> dict[str, Exception]:
+        """
+        Sends the sms message to many recipients at once, as a single bulk request to
+        the sms gateway.
+
+        :param recipients: the users to send the sms to
+        :param message: the actual sms
+        :return: a mapping of the usernames whose sms could not be sent to the raised
+            exception
+        """
+        numbers = ", ".join(
+            recipient_info.phone_number for recipient_info in recipients
+        )
+        print(f"Sending SMS to {numbers}: {message}")
+        return {}
+
     # implement SMS sending logic here
 
 
@@ -101,14 +160,72 @@ class UserManager:
 
     def __init__(self):
         self._users: dict[str, User] = {}
+        # secondary indexes hold the single user of a key, which is by far the most
+        # common case, and only turn an entry into a dict of users by username once a
+        # second user shares the key, so every update stays O(1)
+        self._by_email: dict[str, User | dict[str, User]] = {}
+        self._by_phone_number: dict[str, User | dict[str, User]] = {}
+
+    @staticmethod
+    def _index(index: dict[str, User | dict[str, User]], key: str, user: User) -> None:
+        """
+        Adds a user to a secondary index.
+        """
+        indexed = index.get(key)
+        if indexed is None:
+            index[key] = user
+        elif isinstance(indexed, dict):
+            indexed[user.username] = user
+        else:
+            index[key] = {indexed.username: indexed, user.username: user}
+
+    @staticmethod
+    def _unindex(
+        index: dict[str, User | dict[str, User]], key: str, user: User
+    ) -> None:
+        """
+        Removes a user from a secondary index.
+        """
+        indexed = index[key]
+        if not isinstance(indexed, dict):
+            del index[key]
+            return
+        del indexed[user.username]
+        if len(indexed) == 1:
+            index[key] = next(iter(indexed.values()))
+
+    @staticmethod
+    def _lookup(index: dict[str, User | dict[str, User]], key: str) -> list[User]:
+        indexed = index.get(key)
+        if indexed is None:
+            return []
+        return list(indexed.values()) if isinstance(indexed, dict) else [indexed]
 
     def add_user(self, user: User) -> None:
         """
-        Add a user to the registry.
+        Add a user to the registry, replacing a registered user with the same username.
 
         :param user: the User representation of the user you want to add to the registry,
         """
+        if user.username in self._users:
+            self.remove_user(user)
         self._users[user.username] = user
+        self._index(self._by_email, user.email, user)
+        self._index(self._by_phone_number, user.phone_number, user)
+
+    def add_users(self, users: Iterable[User]) -> int:
+        """
+        Adds users one at a time as they are read, so a streamed source is never
+        materialized as a whole.
+
+        :param users: the User representations to add to the registry
+        :return: the number of added users
+        """
+        count = 0
+        for user in users:
+            self.add_user(user)
+            count += 1
+        return count
 
     def remove_user(self, user: User) -> None:
         """
@@ -116,7 +233,25 @@ class UserManager:
 
         :param user: the User representation of the user you want to remove from the registery,
         """
-        del self._users[user.username]
+        registered = self._users.pop(user.username)
+        self._unindex(self._by_email, registered.email, registered)
+        self._unindex(self._by_phone_number, registered.phone_number, registered)
+
+    def find_by_email(self, email: str) -> list[User]:
+        """
+        Looks up the users registered with an email address.
+
+        :param email: the email address
+        """
+        return self._lookup(self._by_email, email)
+
+    def find_by_phone_number(self, phone_number: str) -> list[User]:
+        """
+        Looks up the users registered with a phone number.
+
+        :param phone_number: the phone number
+        """
+        return self._lookup(self._by_phone_number, phone_number)
 
     @property
     def usernames(self) -> list[str]:
@@ -151,6 +286,7 @@ def driver():
     user_manager.add_user(user2)
 
     print(user_manager.usernames)
+    print([user.username for user in user_manager.find_by_phone_number("xxxxx")])
     # send an email and a sms message to all users
     user_manager.send_message_to_all_users(
         sender=EmailSender(), message="Welcome to our emailing platform!"
@@ -0,0 +1,146 @@
+import socketserver
+import threading
+
+
+class _StandInHandler(socketserver.StreamRequestHandler):
+    """
+    Base handler which reads line based commands and counts the connections it serves.
+    """
+
+    server: "_StandInServer"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(line.encode("utf-8") + b"\r\n")
+        self.wfile.flush()
+
+    def lines(self):
+        for raw in self.rfile:
+            yield raw.decode("utf-8").rstrip("\r\n")
+
+
+class _SMTPHandler(_StandInHandler):
+    """
+    Speaks just enough SMTP for `smtplib.SMTP.sendmail`, `noop` and `quit`.
+    """
+
+    def handle(self):
+        self.reply("220 stand-in ESMTP")
+        recipients: list[str] = []
+        lines = self.lines()
+        for line in lines:
+            command = line[:4].upper()
+            if command in ("HELO", "EHLO"):
+                self.reply("250 stand-in")
+            elif command == "MAIL":
+                recipients = []
+                self.reply("250 OK")
+            elif command == "RCPT":
+                address = line.partition(":")[2].strip().strip("<>")
+                if address in self.server.rejected:
+                    self.reply("550 mailbox unavailable")
+                else:
+                    recipients.append(address)
+                    self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 end data with <CR><LF>.<CR><LF>")
+                for data in lines:
+                    if data == ".":
+                        break
+                self.server.delivered(recipients)
+                self.reply("250 OK")
+            elif command == "RSET":
+                recipients = []
+                self.reply("250 OK")
+            elif command == "NOOP":
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 command not implemented")
+
+
+class _SMSHandler(_StandInHandler):
+    """
+    Speaks a minimal line protocol: `SEND <number>[,<number>...] <message>` answered by
+    `OK` or `ERR <number>[,<number>...]` listing rejected numbers, and `PING` answered
+    by `PONG`.
+    """
+
+    def handle(self):
+        for line in self.lines():
+            command, _, rest = line.partition(" ")
+            if command == "PING":
+                self.reply("PONG")
+            elif command == "SEND":
+                numbers = rest.partition(" ")[0].split(",")
+                rejected = [n for n in numbers if n in self.server.rejected]
+                self.server.delivered([n for n in numbers if n not in rejected])
+                self.reply(f"ERR {','.join(rejected)}" if rejected else "OK")
+            elif command == "QUIT":
+                return
+            else:
+                self.reply("ERR unknown command")
+
+
+class _StandInServer(socketserver.ThreadingTCPServer):
+    """
+    A local server running in a background thread, counting the connections it accepted
+    and the messages it delivered.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+    handler: type[_StandInHandler]
+
+    def __init__(self, rejected: set[str] | None = None, port: int = 0):
+        """
+        :param rejected: recipients the server refuses to deliver to
+        :param port: the port to listen on, a free one is picked by default
+        """
+        super().__init__(("127.0.0.1", port), self.handler)
+        self.rejected = rejected or set()
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = 0
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.shutdown()
+        self.server_close()
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """
+        The host and port the server listens on.
+        """
+        return self.server_address[0], self.server_address[1]
+
+    def delivered(self, recipients: list[str]) -> None:
+        with self.lock:
+            self.messages += len(recipients)
+
+
+class StandInSMTPServer(_StandInServer):
+    """
+    A local SMTP server that accepts and discards mail.
+    """
+
+    handler = _SMTPHandler
+
+
+class StandInSMSServer(_StandInServer):
+    """
+    A local SMS gateway that accepts and discards messages.
+    """
+
+    handler = _SMSHandler
@@ -0,0 +1,366 @@
+import smtplib
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from email.message import EmailMessage
+from importlib import import_module
+from typing import Any, Callable, Generic, Iterator, Sequence, TypeVar
+
+srp = import_module("prg04-srp_adherence")
+
+C = TypeVar("C")
+
+
+class ConnectionPool(Generic[C]):
+    """
+    A thread-safe pool of persistent connections.
+
+    At most `max_size` connections exist at any time, callers wait for one to be
+    released once all of them are in use. Connections idle for longer than `max_idle`
+    seconds are closed instead of reused, and connections idle for longer than
+    `check_after` seconds are health checked before they are handed out again.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], C],
+        close: Callable[[C], None],
+        is_healthy: Callable[[C], bool],
+        max_size: int = 8,
+        max_idle: float = 60.0,
+        check_after: float = 5.0,
+    ):
+        """
+        :param connect: opens a new connection
+        :param close: closes a connection, errors are ignored
+        :param is_healthy: checks whether a connection is still usable
+        :param max_size: the maximum number of open connections
+        :param max_idle: the number of seconds after which an idle connection is evicted
+        :param check_after: the number of idle seconds after which a connection is
+            health checked before reuse
+        """
+        self._connect = connect
+        self._close = close
+        self._is_healthy = is_healthy
+        self.max_size = max_size
+        self.max_idle = max_idle
+        self.check_after = check_after
+
+        self._idle: list[tuple[C, float]] = []
+        self._lock = threading.Lock()
+        self._available = threading.BoundedSemaphore(max_size)
+        self.opened = 0
+        self.reused = 0
+        self.evicted = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+    def _discard(self, connection: C) -> None:
+        try:
+            self._close(connection)
+        except Exception:
+            pass
+
+    def _healthy(self, connection: C) -> bool:
+        """
+        Runs the health check, a check failing with an error, e.g. on a connection the
+        server dropped, counts as unhealthy.
+        """
+        try:
+            return self._is_healthy(connection)
+        except Exception:
+            return False
+
+    def _take_idle(self) -> C | None:
+        """
+        Returns the most recently used idle connection that is still usable, closing
+        stale ones on the way.
+        """
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                connection, released = self._idle.pop()
+            idle_for = time.monotonic() - released
+            if idle_for > self.max_idle or (
+                idle_for > self.check_after and not self._healthy(connection)
+            ):
+                with self._lock:
+                    self.evicted += 1
+                self._discard(connection)
+                continue
+            with self._lock:
+                self.reused += 1
+            return connection
+
+    @contextmanager
+    def connection(self) -> Iterator[C]:
+        """
+        Hands out a connection for the duration of the block. A connection is dropped
+        rather than returned to the pool when the block raises.
+        """
+        self._available.acquire()
+        try:
+            connection = self._take_idle()
+            if connection is None:
+                connection = self._connect()
+                with self._lock:
+                    self.opened += 1
+            try:
+                yield connection
+            except BaseException:
+                self._discard(connection)
+                raise
+            with self._lock:
+                self._idle.append((connection, time.monotonic()))
+        finally:
+            self._available.release()
+
+    def evict_idle(self) -> int:
+        """
+        Closes all connections that were idle for longer than `max_idle` seconds.
+
+        :return: the number of evicted connections
+        """
+        now = time.monotonic()
+        with self._lock:
+            stale = [c for c, released in self._idle if now - released > self.max_idle]
+            self._idle = [
+                (c, released)
+                for c, released in self._idle
+                if now - released <= self.max_idle
+            ]
+            self.evicted += len(stale)
+        for connection in stale:
+            self._discard(connection)
+        return len(stale)
+
+    def close(self) -> None:
+        """
+        Closes all idle connections.
+        """
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._discard(connection)
+
+
+class PooledEmailSender(srp.SenderInterface):
+    """
+    Implementation of the SenderInterface which sends emails over SMTP, reusing pooled
+    connections across calls.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        sender_address: str = "noreply@example.com",
+        max_size: int = 8,
+        max_idle: float = 60.0,
+    ):
+        """
+        :param host: the SMTP host
+        :param port: the SMTP port
+        :param sender_address: the address the emails are sent from
+        :param max_size: the maximum number of open SMTP connections
+        :param max_idle: the number of seconds after which an idle connection is closed
+        """
+        self.sender_address = sender_address
+        self.pool: ConnectionPool[smtplib.SMTP] = ConnectionPool(
+            connect=lambda: smtplib.SMTP(host, port, timeout=10),
+            close=lambda smtp: smtp.quit(),
+            is_healthy=lambda smtp: smtp.noop()[0] == 250,
+            max_size=max_size,
+            max_idle=max_idle,
+        )
+
+    def _send(self, addresses: list[str], message: str) -> dict[str, Any]:
+        """
+        Sends a message to several addresses in one SMTP transaction and returns the
+        refused ones. Refused recipients leave the connection usable, so it is returned
+        to the pool.
+        """
+        email = EmailMessage()
+        email["From"] = self.sender_address
+        email.set_content(message)
+        with self.pool.connection() as smtp:
+            try:
+                return smtp.send_message(email, self.sender_address, addresses)
+            except smtplib.SMTPRecipientsRefused as e:
+                return e.recipients
+
+    def send(self, recipient_info: Any, message: str) -> None:
+        """
+        Sends the email message to a provided recipient.
+
+        :param recipient_info: A user instance containing all info needed to send the
+            email to the user.
+        :param message: the actual email
+        """
+        if refused := self._send([recipient_info.email], message):
+            raise smtplib.SMTPRecipientsRefused(refused)
+
+    def send_batch(
+        self, recipients: Sequence[Any], message: str
+    ) -> dict[str, Exception]:
+        """
+        Sends the email message to many recipients in a single SMTP transaction.
+
+        :param recipients: the users to send the email to
+        :param message: the actual email
+        :return: a mapping of the usernames whose email could not be sent to the raised
+            exception
+        """
+        by_address = {
+            recipient_info.email: recipient_info for recipient_info in recipients
+        }
+        refused = self._send(list(by_address), message)
+        return {
+            by_address[address].username: smtplib.SMTPRecipientsRefused(
+                {address: reply}
+            )
+            for address, reply in refused.items()
+        }
+
+
+class _SMSConnection:
+    """
+    A connection to an SMS gateway speaking the line protocol of the stand-in server.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.socket = socket.create_connection((host, port), timeout=10)
+        self.file = self.socket.makefile("rwb")
+
+    def request(self, line: str) -> str:
+        self.file.write(line.encode("utf-8") + b"\r\n")
+        self.file.flush()
+        reply = self.file.readline()
+        if not reply:
+            raise ConnectionError("SMS gateway closed the connection")
+        return reply.decode("utf-8").rstrip("\r\n")
+
+    def close(self) -> None:
+        self.file.close()
+        self.socket.close()
+
+
+class PooledSMSSender(srp.SenderInterface):
+    """
+    Implementation of the SenderInterface which sends SMS messages to a gateway, reusing
+    pooled connections across calls.
+    """
+
+    def __init__(self, host: str, port: int, max_size: int = 8, max_idle: float = 60.0):
+        """
+        :param host: the SMS gateway host
+        :param port: the SMS gateway port
+        :param max_size: the maximum number of open gateway connections
+        :param max_idle: the number of seconds after which an idle connection is closed
+        """
+        self.pool: ConnectionPool[_SMSConnection] = ConnectionPool(
+            connect=lambda: _SMSConnection(host, port),
+            close=lambda connection: connection.close(),
+            is_healthy=lambda connection: connection.request("PING") == "PONG",
+            max_size=max_size,
+            max_idle=max_idle,
+        )
+
+    def _send(self, numbers: list[str], message: str) -> list[str]:
+        """
+        Sends a message to several numbers and returns the rejected ones. A connection
+        answering anything but a reply to SEND is dropped, as a stale reply left on it
+        would be read by the next request.
+        """
+        # the protocol is framed by lines and separates numbers by commas, so neither
+        # may appear unescaped
+        if "\r" in message or "\n" in message:
+            raise ValueError("SMS messages cannot contain line breaks")
+        for number in numbers:
+            if not number or any(c in number for c in ", \r\n"):
+                raise ValueError(f"invalid phone number {number!r}")
+
+        with self.pool.connection() as connection:
+            reply = connection.request(f"SEND {','.join(numbers)} {message}")
+            if reply == "OK":
+                return []
+            if reply.startswith("ERR ") and set(reply[4:].split(",")) <= set(numbers):
+                return reply[4:].split(",")
+            # raising inside the block drops the connection instead of returning it to
+            # the pool
+            raise ConnectionError(f"unexpected reply from SMS gateway: {reply!r}")
+
+    def send(self, recipient_info: Any, message: str) -> None:
+        """
+        Sends the sms message to a provided recipient.
+
+        :param recipient_info: A user instance containing all info needed to send the
+            sms to the user.
+        :param message: the actual sms
+        """
+        if self._send([recipient_info.phone_number], message):
+            raise ConnectionError(f"{recipient_info.phone_number} was rejected")
+
+    def send_batch(
+        self, recipients: Sequence[Any], message: str
+    ) -> dict[str, Exception]:
+        """
+        Sends the sms message to many recipients in a single gateway request.
+
+        :param recipients: the users to send the sms to
+        :param message: the actual sms
+        :return: a mapping of the usernames whose sms could not be sent to the raised
+            exception
+        """
+        by_number = {
+            recipient_info.phone_number: recipient_info for recipient_info in recipients
+        }
+        return {
+            by_number[number].username: ConnectionError(f"{number} was rejected")
+            for number in self._send(list(by_number), message)
+        }
+
+
+def driver():
+    from stand_in_server import StandInSMSServer, StandInSMTPServer
+
+    users = [
+        srp.User(
+            username=f"User{i}", email=f"user{i}@example.com", phone_number=f"0{i}"
+        )
+        for i in range(5)
+    ]
+
+    with StandInSMTPServer(rejected={"user3@example.com"}) as smtp_server:
+        sender = PooledEmailSender(*smtp_server.address)
+        for user in users:
+            try:
+                sender.send(
+                    recipient_info=user, message="Welcome to our emailing platform!"
+                )
+            except smtplib.SMTPRecipientsRefused as e:
+                print(f"Email to {user.username} was refused: {e}")
+        print(f"Email batch failures: {sender.send_batch(users, 'Hello again!')}")
+        sender.pool.close()
+        print(
+            f"SMTP: {smtp_server.connections} connection(s), {smtp_server.messages} emails"
+        )
+
+    with StandInSMSServer() as sms_server:
+        sender = PooledSMSSender(*sms_server.address)
+        for user in users:
+            sender.send(recipient_info=user, message="Welcome to our SMS platform!")
+        sender.pool.close()
+        print(
+            f"SMS: {sms_server.connections} connection(s), {sms_server.messages} messages"
+        )
+
+
+if __name__ == "__main__":
+    driver()
@@ -0,0 +1,74 @@
+import csv
+import json
+import os
+from importlib import import_module
+from typing import Any, Iterator
+
+srp = import_module("prg04-srp_adherence")
+
+
+def iter_users_csv(path: str | os.PathLike, user_type: Any = None) -> Iterator[Any]:
+    """
+    Streams users from a CSV file with a `username,email,phone_number` header, one row
+    at a time.
+
+    :param path: the CSV file
+    :param user_type: the class the users are created with, `User` by default
+    """
+    user_type = user_type or srp.User
+    with open(path, newline="", encoding="utf-8") as fh:
+        for row in csv.DictReader(fh):
+            yield user_type(
+                username=row["username"],
+                email=row["email"],
+                phone_number=row["phone_number"],
+            )
+
+
+def iter_users_jsonl(path: str | os.PathLike, user_type: Any = None) -> Iterator[Any]:
+    """
+    Streams users from a JSON lines file holding one object with `username`, `email` and
+    `phone_number` per line.
+
+    :param path: the JSONL file
+    :param user_type: the class the users are created with, `User` by default
+    """
+    user_type = user_type or srp.User
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            yield user_type(
+                username=record["username"],
+                email=record["email"],
+                phone_number=record["phone_number"],
+            )
+
+
+def driver():
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "users.jsonl")
+        with open(path, "w", encoding="utf-8") as fh:
+            for name in ("JohnDoe", "JaneDoe"):
+                record = {
+                    "username": name,
+                    "email": f"{name.lower()}@example.com",
+                    "phone_number": "xxxxx",
+                }
+                fh.write(json.dumps(record) + "\n")
+
+        user_manager = srp.UserManager()
+        print(f"Loaded {user_manager.add_users(iter_users_jsonl(path))} users")
+        print(
+            [
+                user.username
+                for user in user_manager.find_by_email("janedoe@example.com")
+            ]
+        )
+
+
+if __name__ == "__main__":
+    driver()
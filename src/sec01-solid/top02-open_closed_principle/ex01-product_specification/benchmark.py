@@ -0,0 +1,177 @@
+import json
+import os
+import random
+import tempfile
+import time
+from importlib import import_module
+
+import numpy as np
+from parallel_filter import parallel_filter
+from product_catalog import ProductCatalog
+from product_repository import IndexedProductRepository
+from spec_compiler import compile_specification
+
+ocp = import_module("prg02-ocp_adherence")
+
+
+def make_products(count: int) -> list:
+    colors = list(ocp.Color)
+    sizes = list(ocp.Size)
+    return [
+        ocp.Product(f"product{i}", random.choice(colors), random.choice(sizes))
+        for i in range(count)
+    ]
+
+
+def _filter_time(products: list, spec) -> tuple[float, int]:
+    start = time.perf_counter()
+    matches = sum(1 for _ in ocp.FilterSpec.filter(items=products, spec=spec))
+    return time.perf_counter() - start, matches
+
+
+def benchmark_compiled(count: int = 1_000_000) -> None:
+    """
+    Compares `FilterSpec.filter` over interpreted and compiled specification trees.
+
+    :param count: the number of products, the original target of 10M works the same way
+        but takes a while
+    """
+    products = make_products(count)
+    # written with the least selective operand first, which the sample based ordering
+    # fixes
+    spec = (
+        ~ocp.SizeSpecification(ocp.Size.SMALL)
+        & ocp.ColorSpecification(ocp.Color.GREEN)
+        & ocp.SizeSpecification(ocp.Size.LARGE)
+    ) | ocp.ColorSpecification(ocp.Color.RED) & ocp.SizeSpecification(ocp.Size.SMALL)
+
+    print(f"Filtering {count} products")
+    variants = (
+        ("interpreted", spec),
+        ("compiled", compile_specification(spec)),
+        ("compiled, ordered", compile_specification(spec, sample=products[:1000])),
+    )
+    baseline = None
+    for label, variant in variants:
+        elapsed, matches = _filter_time(products, variant)
+        baseline = baseline or elapsed
+        print(
+            f" - {label:18s} {elapsed * 1000:9.1f} ms, {matches} matches, "
+            f"{baseline / elapsed:5.1f}x"
+        )
+
+
+def benchmark_columnar(count: int = 10_000_000, scanned: int = 1_000_000) -> None:
+    """
+    Compares filtering a columnar ProductCatalog with `FilterSpec.filter` over Product
+    objects.
+
+    :param count: the number of products in the catalog
+    :param scanned: the number of Product objects filtered for comparison
+    """
+    rng = np.random.default_rng()
+    catalog = ProductCatalog.from_columns(
+        names=[f"product{i}" for i in range(count)],
+        colors=rng.integers(1, len(ocp.Color) + 1, count, dtype=np.uint8),
+        sizes=rng.integers(1, len(ocp.Size) + 1, count, dtype=np.uint8),
+    )
+    spec = ocp.ColorSpecification(ocp.Color.GREEN) & ~ocp.SizeSpecification(
+        ocp.Size.SMALL
+    ) | ocp.SizeSpecification(ocp.Size.LARGE)
+
+    start = time.perf_counter()
+    view = catalog.select(spec)
+    columnar = time.perf_counter() - start
+
+    elapsed, _ = _filter_time(make_products(scanned), spec)
+
+    print(f"Filtering {count} products in a columnar catalog")
+    print(f" - column masks:       {columnar * 1000:9.1f} ms, {len(view)} matches")
+    print(
+        f" - FilterSpec.filter:  {elapsed * count / scanned * 1000:9.1f} ms "
+        f"(extrapolated from {scanned} products)"
+    )
+
+
+def benchmark_indexed(count: int = 1_000_000) -> None:
+    """
+    Compares answering equality specifications from attribute indexes with scanning
+    every product.
+
+    :param count: the number of products
+    """
+    products = make_products(count)
+    repository = IndexedProductRepository()
+    start = time.perf_counter()
+    for product in products:
+        repository.add(product)
+    indexing = time.perf_counter() - start
+
+    specs = (
+        ocp.ColorSpecification(ocp.Color.GREEN) & ocp.SizeSpecification(ocp.Size.LARGE),
+        ocp.ColorSpecification(ocp.Color.RED) & ~ocp.SizeSpecification(ocp.Size.SMALL),
+    )
+    print(f"Querying {count} products, indexed in {indexing * 1000:.1f} ms")
+    for spec in specs:
+        print(repository.explain(spec))
+        start = time.perf_counter()
+        matches = sum(1 for _ in repository.filter(spec))
+        indexed = time.perf_counter() - start
+        scanned, _ = _filter_time(products, spec)
+        print(
+            f" - all {matches} results: indexed {indexed * 1000:.1f} ms, "
+            f"scanned {scanned * 1000:.1f} ms"
+        )
+
+
+def benchmark_parallel(count: int = 1_000_000) -> None:
+    """
+    Compares filtering a JSONL file line by line in one process with the chunked process
+    pool, for 1 up to all CPUs.
+
+    :param count: the number of products in the file
+    """
+    spec = compile_specification(
+        ocp.ColorSpecification(ocp.Color.GREEN) & ~ocp.SizeSpecification(ocp.Size.SMALL)
+    )
+    colors = [c.name for c in ocp.Color]
+    sizes = [s.name for s in ocp.Size]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "products.jsonl")
+        with open(path, "w", encoding="utf-8") as fh:
+            for i in range(count):
+                record = {
+                    "name": f"product{i}",
+                    "color": random.choice(colors),
+                    "size": random.choice(sizes),
+                }
+                fh.write(json.dumps(record) + "\n")
+
+        start = time.perf_counter()
+        with open(path, encoding="utf-8") as fh:
+            products = (
+                ocp.Product(r["name"], ocp.Color[r["color"]], ocp.Size[r["size"]])
+                for r in map(json.loads, fh)
+            )
+            matches = sum(1 for _ in ocp.FilterSpec.filter(items=products, spec=spec))
+        serial = time.perf_counter() - start
+
+        print(f"Filtering a JSONL file of {count} products, {matches} matches")
+        print(f" - single process:  {serial * 1000:9.1f} ms")
+        workers = 1
+        while workers <= (os.cpu_count() or 1):
+            start = time.perf_counter()
+            sum(1 for _ in parallel_filter(path, spec, workers=workers))
+            elapsed = time.perf_counter() - start
+            print(
+                f" - {workers:3d} worker(s):    {elapsed * 1000:9.1f} ms, "
+                f"{serial / elapsed:5.2f}x"
+            )
+            workers *= 2
+
+
+if __name__ == "__main__":
+    benchmark_compiled()
+    benchmark_columnar()
+    benchmark_indexed()
+    benchmark_parallel()
@@ -0,0 +1,208 @@
+import csv
+import json
+import mmap
+import os
+import queue
+from collections import deque
+from importlib import import_module
+from itertools import chain
+from multiprocessing import Pool
+from typing import Any, Iterable, Iterator
+
+ocp = import_module("prg02-ocp_adherence")
+
+# state of a worker process, set once by _init_worker rather than sent along with every
+# chunk
+_worker: dict[str, Any] = {}
+
+
+def _parse_jsonl(line: bytes):
+    record = json.loads(line)
+    return ocp.Product(
+        record["name"], ocp.Color[record["color"]], ocp.Size[record["size"]]
+    )
+
+
+def _parse_csv(line: bytes):
+    name, color, size = next(csv.reader([line.decode("utf-8")]))
+    return ocp.Product(name, ocp.Color[color], ocp.Size[size])
+
+
+_PARSERS = {"jsonl": _parse_jsonl, "csv": _parse_csv}
+
+
+def _init_worker(path: str, spec: Any, fmt: str) -> None:
+    fh = open(path, "rb")
+    _worker["file"] = fh
+    _worker["map"] = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+    _worker["spec"] = spec
+    _worker["parse"] = _PARSERS[fmt]
+
+
+def _filter_chunk(bounds: tuple[int, int]) -> list[tuple[str, int, int]]:
+    """
+    Parses the lines of one chunk of the mapped file and returns the matching products
+    in a compact form.
+    """
+    start, end = bounds
+    spec = _worker["spec"]
+    parse = _worker["parse"]
+    matches = []
+    for line in _worker["map"][start:end].splitlines():
+        if not line.strip():
+            continue
+        product = parse(line)
+        if spec.is_satisfied(product):
+            matches.append((product.name, product.color.value, product.size.value))
+    return matches
+
+
+def chunk_bounds(
+    path: str, chunk_size: int, skip_header: bool = False
+) -> Iterator[tuple[int, int]]:
+    """
+    Splits a file into byte ranges of roughly `chunk_size` bytes that start and end on
+    line boundaries.
+
+    :param path: the file to split
+    :param chunk_size: the approximate number of bytes per chunk
+    :param skip_header: whether the first line is a header that belongs to no chunk
+    """
+    with open(path, "rb") as fh:
+        size = os.fstat(fh.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = mm.find(b"\n") + 1 if skip_header else 0
+            if skip_header and start == 0:
+                return
+            while start < size:
+                newline = mm.find(b"\n", min(start + chunk_size, size) - 1)
+                end = size if newline == -1 else newline + 1
+                yield start, end
+                start = end
+
+
+def parallel_filter(
+    path: str | os.PathLike,
+    spec: Any,
+    fmt: str = "jsonl",
+    workers: int | None = None,
+    chunk_size: int = 4 * 1024 * 1024,
+    ordered: bool = True,
+    max_in_flight: int | None = None,
+) -> Iterator[Any]:
+    """
+    Filters the products of a JSONL or CSV file in a pool of processes, which map the
+    file themselves and receive only the byte range of each chunk.
+
+    JSONL records hold `name`, `color` and `size`, CSV files a `name,color,size` header,
+    colors and sizes are given by their enum names. Every record has to fit on a single
+    line.
+
+    :param path: the file to filter
+    :param spec: the specification, which has to be picklable
+    :param fmt: either "jsonl" or "csv"
+    :param workers: the number of worker processes, one per CPU by default
+    :param chunk_size: the approximate number of bytes parsed per task
+    :param ordered: whether products are yielded in file order or as soon as their chunk
+        is done
+    :param max_in_flight: the number of chunks submitted but not yet consumed, twice the
+        number of workers by default, so a consumer slower than the pool holds up
+        parsing instead of letting results pile up in memory
+    """
+    if fmt not in _PARSERS:
+        raise ValueError(f"unsupported format {fmt!r}")
+    path = os.fspath(path)
+    bounds = chunk_bounds(path, chunk_size, skip_header=fmt == "csv")
+    # a file without records needs no pool, whose workers could not even map it
+    first = next(bounds, None)
+    if first is None:
+        return
+    bounds = chain([first], bounds)
+    window = max_in_flight or 2 * (workers or os.cpu_count() or 1)
+    with Pool(workers, initializer=_init_worker, initargs=(path, spec, fmt)) as pool:
+        results = (
+            _ordered_results(pool, bounds, window)
+            if ordered
+            else _unordered_results(pool, bounds, window)
+        )
+        for matches in results:
+            for name, color, size in matches:
+                yield ocp.Product(name, ocp.Color(color), ocp.Size(size))
+
+
+def _ordered_results(
+    pool: Any, bounds: Iterable[tuple[int, int]], window: int
+) -> Iterator[list[tuple[str, int, int]]]:
+    """
+    Yields the matches of every chunk in file order, submitting a chunk only once one of
+    `window` is consumed
+    """
+    pending = deque()
+    for chunk in bounds:
+        pending.append(pool.apply_async(_filter_chunk, (chunk,)))
+        if len(pending) >= window:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def _unordered_results(
+    pool: Any, bounds: Iterable[tuple[int, int]], window: int
+) -> Iterator[list[tuple[str, int, int]]]:
+    """
+    Yields the matches of every chunk as soon as it is done, with at most `window`
+    chunks not yet consumed
+    """
+    done = queue.SimpleQueue()
+
+    def take() -> list[tuple[str, int, int]]:
+        result = done.get()
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    in_flight = 0
+    for chunk in bounds:
+        pool.apply_async(
+            _filter_chunk, (chunk,), callback=done.put, error_callback=done.put
+        )
+        in_flight += 1
+        if in_flight >= window:
+            yield take()
+            in_flight -= 1
+    for _ in range(in_flight):
+        yield take()
+
+
+class FileFilter(ocp.FilterInterface):
+    @staticmethod
+    def filter(items: str, spec: Any) -> Any:
+        """Filter the products of a JSONL file on provided specification"""
+        return parallel_filter(items, spec)
+
+
+def driver():
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "products.jsonl")
+        with open(path, "w", encoding="utf-8") as fh:
+            for name, color, size in (
+                ("Pear", "GREEN", "SMALL"),
+                ("Ball", "GREEN", "MEDIUM"),
+                ("Palace", "BLUE", "LARGE"),
+            ):
+                fh.write(
+                    json.dumps({"name": name, "color": color, "size": size}) + "\n"
+                )
+
+        green = ocp.ColorSpecification(ocp.Color.GREEN)
+        print("Green products (from file):")
+        for p in FileFilter.filter(items=path, spec=green):
+            print(f" - {p.name} is green")
+
+
+if __name__ == "__main__":
+    driver()
@@ -36,18 +36,62 @@ class Specification(ABC):
         """Allows for combining the '&' (ampersand) operator to combine specification requirements"""
         return AndSpecification(self, other)
 
+    def __or__(self, other):
+        """
+        Allows for combining the '|' (pipe) operator to accept either specification
+        """
+        return OrSpecification(self, other)
+
+    def __invert__(self):
+        """Allows for the '~' (tilde) operator to negate a specification"""
+        return NotSpecification(self)
+
 
 class AndSpecification(Specification):
     """ "Specification implementation that allows to bind multiple specifications together that must all be satisfied"""
 
     def __init__(self, *args):
-        self.args = args
+        # chains like a & b & c are kept flat instead of nesting ever deeper
+        self.args = tuple(
+            arg
+            for spec in args
+            for arg in (spec.args if isinstance(spec, AndSpecification) else (spec,))
+        )
 
     def is_satisfied(self, item) -> bool:
         """Validates whether all specifications are validated by the given item"""
         return all(map(lambda spec: spec.is_satisfied(item), self.args))
 
 
+class OrSpecification(Specification):
+    """
+    Specification implementation that is satisfied as soon as any of the bound
+    specifications is satisfied
+    """
+
+    def __init__(self, *args):
+        self.args = tuple(
+            arg
+            for spec in args
+            for arg in (spec.args if isinstance(spec, OrSpecification) else (spec,))
+        )
+
+    def is_satisfied(self, item) -> bool:
+        """Validates whether any of the specifications is validated by the given item"""
+        return any(map(lambda spec: spec.is_satisfied(item), self.args))
+
+
+class NotSpecification(Specification):
+    """Specification implementation that negates another specification"""
+
+    def __init__(self, spec):
+        self.spec = spec
+
+    def is_satisfied(self, item) -> bool:
+        """Validates whether the specification is not validated by the given item"""
+        return not self.spec.is_satisfied(item)
+
+
 class ColorSpecification(Specification):
     """Color specification"""
 
@@ -110,6 +154,16 @@ def driver():
     for p in FilterSpec.filter(items=products, spec=small_blue):
         print(f" - {p.name} is small and blue")
 
+    print("Small or blue items:")
+    for p in FilterSpec.filter(
+        items=products, spec=small | ColorSpecification(Color.BLUE)
+    ):
+        print(f" - {p.name} is small or blue")
+
+    print("Green items that are not small:")
+    for p in FilterSpec.filter(items=products, spec=green & ~small):
+        print(f" - {p.name} is green and not small")
+
 
 if __name__ == "__main__":
     driver()
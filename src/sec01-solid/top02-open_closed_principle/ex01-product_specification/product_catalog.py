@@ -0,0 +1,196 @@
+from importlib import import_module
+from typing import Any, Callable, Iterable, Iterator
+
+import numpy as np
+
+ocp = import_module("prg02-ocp_adherence")
+
+
+class ProductCatalog:
+    """
+    Columnar storage for products: names, colors and sizes each live in their own NumPy
+    array, with the enums encoded by their small integer values. Specifications are
+    evaluated as boolean masks over whole columns.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._names = np.empty(capacity, dtype=object)
+        self._colors = np.empty(capacity, dtype=np.uint8)
+        self._sizes = np.empty(capacity, dtype=np.uint8)
+        self._count = 0
+
+    @classmethod
+    def from_products(cls, products: Iterable[Any]):
+        """Builds a catalog from Product objects"""
+        products = list(products)
+        catalog = cls(capacity=max(len(products), 1))
+        catalog._names[: len(products)] = [p.name for p in products]
+        catalog._colors[: len(products)] = [p.color.value for p in products]
+        catalog._sizes[: len(products)] = [p.size.value for p in products]
+        catalog._count = len(products)
+        return catalog
+
+    @classmethod
+    def from_columns(cls, names: Any, colors: Any, sizes: Any):
+        """
+        Builds a catalog directly from name, encoded color and encoded size columns
+        """
+        catalog = cls(capacity=max(len(colors), 1))
+        catalog._names[: len(names)] = names
+        catalog._colors[: len(colors)] = colors
+        catalog._sizes[: len(sizes)] = sizes
+        catalog._count = len(colors)
+        return catalog
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int):
+        """Materializes a single Product"""
+        if not -self._count <= index < self._count:
+            raise IndexError("catalog index out of range")
+        index %= self._count
+        return ocp.Product(
+            self._names[index],
+            ocp.Color(int(self._colors[index])),
+            ocp.Size(int(self._sizes[index])),
+        )
+
+    @property
+    def colors(self) -> np.ndarray:
+        """The encoded color column"""
+        return self._colors[: self._count]
+
+    @property
+    def sizes(self) -> np.ndarray:
+        """The encoded size column"""
+        return self._sizes[: self._count]
+
+    @property
+    def names(self) -> np.ndarray:
+        """The name column"""
+        return self._names[: self._count]
+
+    def _grow(self, needed: int) -> None:
+        capacity = max(len(self._colors) * 2, needed)
+        for column in ("_names", "_colors", "_sizes"):
+            old = getattr(self, column)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[: self._count] = old[: self._count]
+            setattr(self, column, new)
+
+    def append(self, product: Any) -> int:
+        """Adds a product and returns its index, growing the columns geometrically"""
+        if self._count == len(self._colors):
+            self._grow(self._count + 1)
+        index = self._count
+        self._names[index] = product.name
+        self._colors[index] = product.color.value
+        self._sizes[index] = product.size.value
+        self._count += 1
+        return index
+
+    def mask(self, spec: Any) -> np.ndarray:
+        """Evaluates a specification over all products at once"""
+        for spec_type in type(spec).__mro__:
+            if spec_type in _masks:
+                return _masks[spec_type](spec, self)
+        # specifications without a column mask are evaluated product by product
+        return np.fromiter(
+            (spec.is_satisfied(self[i]) for i in range(self._count)),
+            dtype=bool,
+            count=self._count,
+        )
+
+    def select(self, spec: Any) -> "CatalogView":
+        """Returns a lazy view of all products satisfying a specification"""
+        return CatalogView(self, np.flatnonzero(self.mask(spec)))
+
+
+class CatalogView:
+    """
+    A lazy selection of catalog products, which are only materialized when accessed
+    """
+
+    def __init__(self, catalog: ProductCatalog, indices: np.ndarray):
+        self.catalog = catalog
+        self.indices = indices
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __getitem__(self, position: int):
+        return self.catalog[int(self.indices[position])]
+
+    def __iter__(self) -> Iterator[Any]:
+        for index in self.indices:
+            yield self.catalog[int(index)]
+
+
+# spec type -> function evaluating a spec of that type over the columns of a catalog
+_masks: dict[type, Callable[[Any, ProductCatalog], np.ndarray]] = {}
+
+
+def column_mask(spec_type: type):
+    """
+    Registers how a specification type is evaluated over catalog columns, so new
+    specifications can be too
+    """
+
+    def register(func):
+        _masks[spec_type] = func
+        return func
+
+    return register
+
+
+@column_mask(ocp.ColorSpecification)
+def _color(spec, catalog) -> np.ndarray:
+    return catalog.colors == spec.color.value
+
+
+@column_mask(ocp.SizeSpecification)
+def _size(spec, catalog) -> np.ndarray:
+    return catalog.sizes == spec.size.value
+
+
+@column_mask(ocp.AndSpecification)
+def _and(spec, catalog) -> np.ndarray:
+    return np.logical_and.reduce([catalog.mask(arg) for arg in spec.args])
+
+
+@column_mask(ocp.OrSpecification)
+def _or(spec, catalog) -> np.ndarray:
+    return np.logical_or.reduce([catalog.mask(arg) for arg in spec.args])
+
+
+@column_mask(ocp.NotSpecification)
+def _not(spec, catalog) -> np.ndarray:
+    return ~catalog.mask(spec.spec)
+
+
+class ColumnarFilter(ocp.FilterInterface):
+    @staticmethod
+    def filter(items: ProductCatalog, spec: Any) -> Any:
+        """Filter a catalog on provided specification"""
+        return items.select(spec)
+
+
+def driver():
+    catalog = ProductCatalog()
+    catalog.append(ocp.Product("Pear", ocp.Color.GREEN, ocp.Size.SMALL))
+    catalog.append(ocp.Product("Ball", ocp.Color.GREEN, ocp.Size.MEDIUM))
+    catalog.append(ocp.Product("Palace", ocp.Color.BLUE, ocp.Size.LARGE))
+
+    green = ocp.ColorSpecification(ocp.Color.GREEN)
+    small = ocp.SizeSpecification(ocp.Size.SMALL)
+
+    print("Green products that are not small:")
+    view = ColumnarFilter.filter(items=catalog, spec=green & ~small)
+    print(f" - indices: {view.indices}")
+    for p in view:
+        print(f" - {p.name} is green and not small")
+
+
+if __name__ == "__main__":
+    driver()
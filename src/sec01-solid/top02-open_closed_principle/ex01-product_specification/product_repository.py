@@ -0,0 +1,217 @@
+from importlib import import_module
+from typing import Any, Callable, Iterator
+
+ocp = import_module("prg02-ocp_adherence")
+
+
+# spec type -> function returning the (attribute, value) pair an equality spec of that
+# type compares against
+_indexed: dict[type, Callable[[Any], tuple[str, Any]]] = {}
+
+
+def indexed_attribute(spec_type: type):
+    """
+    Registers a specification type as an equality check that can be answered from an
+    attribute index
+    """
+
+    def register(func):
+        _indexed[spec_type] = func
+        return func
+
+    return register
+
+
+@indexed_attribute(ocp.ColorSpecification)
+def _color(spec) -> tuple[str, Any]:
+    return "color", spec.color
+
+
+@indexed_attribute(ocp.SizeSpecification)
+def _size(spec) -> tuple[str, Any]:
+    return "size", spec.size
+
+
+class IndexedProductRepository:
+    """
+    Product storage with a set index per attribute, kept up to date on every insert and
+    delete.
+
+    Specification trees made of indexed equality checks joined by AND, OR and NOT are
+    answered by set operations on those indexes. An AND mixing indexed and other checks
+    narrows the candidates through the indexes and checks only those, anything else
+    falls back to scanning all products.
+    """
+
+    def __init__(self, attributes: tuple[str, ...] = ("color", "size")):
+        self._products: dict[int, Any] = {}
+        self._indexes: dict[str, dict[Any, set[int]]] = {a: {} for a in attributes}
+        self._next_id = 0
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._products.values())
+
+    def get(self, product_id: int):
+        """Looks up a product by its id"""
+        return self._products[product_id]
+
+    def add(self, product: Any) -> int:
+        """Stores a product, indexes its attributes and returns its id"""
+        product_id = self._next_id
+        self._next_id += 1
+        self._products[product_id] = product
+        for attribute, index in self._indexes.items():
+            index.setdefault(getattr(product, attribute), set()).add(product_id)
+        return product_id
+
+    def remove(self, product_id: int) -> None:
+        """Deletes a product and drops it from the indexes"""
+        product = self._products.pop(product_id)
+        for attribute, index in self._indexes.items():
+            value = getattr(product, attribute)
+            ids = index[value]
+            ids.discard(product_id)
+            if not ids:
+                del index[value]
+
+    def _lookup(self, spec: Any) -> tuple[str, Any] | None:
+        for spec_type in type(spec).__mro__:
+            if spec_type in _indexed:
+                attribute, value = _indexed[spec_type](spec)
+                return (attribute, value) if attribute in self._indexes else None
+        return None
+
+    def _resolve(self, spec: Any) -> set[int] | None:
+        """
+        Answers a specification from the indexes alone, or returns None if it contains
+        non-indexed checks
+        """
+        if (lookup := self._lookup(spec)) is not None:
+            attribute, value = lookup
+            return self._indexes[attribute].get(value, set())
+        if isinstance(spec, ocp.AndSpecification):
+            resolved = [self._resolve(arg) for arg in spec.args]
+            if any(ids is None for ids in resolved):
+                return None
+            resolved.sort(key=len)
+            return resolved[0].intersection(*resolved[1:])
+        if isinstance(spec, ocp.OrSpecification):
+            resolved = [self._resolve(arg) for arg in spec.args]
+            if any(ids is None for ids in resolved):
+                return None
+            return set().union(*resolved)
+        if isinstance(spec, ocp.NotSpecification):
+            ids = self._resolve(spec.spec)
+            return None if ids is None else self._products.keys() - ids
+        return None
+
+    def _narrow(self, spec: Any) -> tuple[set[int], list[Any]] | None:
+        """
+        Splits an AND into the candidates of its indexed operands and the operands left
+        to check
+        """
+        if not isinstance(spec, ocp.AndSpecification):
+            return None
+        candidates: list[set[int]] = []
+        remaining = []
+        for arg in spec.args:
+            ids = self._resolve(arg)
+            if ids is None:
+                remaining.append(arg)
+            else:
+                candidates.append(ids)
+        if not candidates:
+            return None
+        candidates.sort(key=len)
+        return candidates[0].intersection(*candidates[1:]), remaining
+
+    def filter(self, spec: Any) -> Iterator[Any]:
+        """Yields the products satisfying a specification in insertion order"""
+        ids = self._resolve(spec)
+        if ids is not None:
+            return (self._products[i] for i in sorted(ids))
+        narrowed = self._narrow(spec)
+        if narrowed is not None:
+            candidates, remaining = narrowed
+            return (
+                self._products[i]
+                for i in sorted(candidates)
+                if all(arg.is_satisfied(self._products[i]) for arg in remaining)
+            )
+        return (p for p in self._products.values() if spec.is_satisfied(p))
+
+    def explain(self, spec: Any) -> str:
+        """
+        Describes which path a query takes and how many products each index lookup
+        yields
+        """
+        if self._resolve(spec) is not None:
+            return "index lookup\n" + self._describe(spec, 1)
+        narrowed = self._narrow(spec)
+        if narrowed is not None:
+            candidates, remaining = narrowed
+            checked = ", ".join(type(arg).__name__ for arg in remaining)
+            return (
+                f"index lookup, then checking {len(candidates)} candidates against {checked}\n"
+                + self._describe(spec, 1)
+            )
+        return f"full scan of {len(self)} products\n" + self._describe(spec, 1)
+
+    def _describe(self, spec: Any, depth: int) -> str:
+        indent = "  " * depth
+        if (lookup := self._lookup(spec)) is not None:
+            attribute, value = lookup
+            count = len(self._indexes[attribute].get(value, ()))
+            return f"{indent}{attribute} == {value} ({count} products)"
+        if isinstance(spec, (ocp.AndSpecification, ocp.OrSpecification)):
+            name = "AND" if isinstance(spec, ocp.AndSpecification) else "OR"
+            lines = [f"{indent}{name}"]
+            lines.extend(self._describe(arg, depth + 1) for arg in spec.args)
+            return "\n".join(lines)
+        if isinstance(spec, ocp.NotSpecification):
+            return f"{indent}NOT\n" + self._describe(spec.spec, depth + 1)
+        return f"{indent}{type(spec).__name__} (not indexed, checked per product)"
+
+
+class IndexedFilter(ocp.FilterInterface):
+    @staticmethod
+    def filter(items: IndexedProductRepository, spec: Any) -> Any:
+        """Filter a repository on provided specification"""
+        return items.filter(spec)
+
+
+def driver():
+    repository = IndexedProductRepository()
+    repository.add(ocp.Product("Pear", ocp.Color.GREEN, ocp.Size.SMALL))
+    ball = repository.add(ocp.Product("Ball", ocp.Color.GREEN, ocp.Size.MEDIUM))
+    repository.add(ocp.Product("Palace", ocp.Color.BLUE, ocp.Size.LARGE))
+    repository.add(ocp.Product("Tree", ocp.Color.GREEN, ocp.Size.LARGE))
+
+    class NameSpecification(ocp.Specification):
+        def __init__(self, prefix):
+            self.prefix = prefix
+
+        def is_satisfied(self, item) -> bool:
+            return item.name.startswith(self.prefix)
+
+    green = ocp.ColorSpecification(ocp.Color.GREEN)
+    small = ocp.SizeSpecification(ocp.Size.SMALL)
+
+    for spec in (
+        green & ~small,
+        green & NameSpecification("T"),
+        NameSpecification("P"),
+    ):
+        print(repository.explain(spec))
+        for p in IndexedFilter.filter(items=repository, spec=spec):
+            print(f" -> {p.name}")
+
+    repository.remove(ball)
+    print(repository.explain(green))
+
+
+if __name__ == "__main__":
+    driver()
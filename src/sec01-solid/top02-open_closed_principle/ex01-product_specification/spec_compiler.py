@@ -0,0 +1,156 @@
+from importlib import import_module
+from typing import Any, Callable, Sequence
+
+ocp = import_module("prg02-ocp_adherence")
+
+
+class CompiledSpecification(ocp.Specification):
+    """Specification backed by a single generated predicate"""
+
+    def __init__(self, source: str, namespace: dict[str, Any]):
+        self.source = source
+        self.namespace = namespace
+        self.predicate: Callable[[Any], bool] = eval(
+            compile(f"lambda item: {source}", "<specification>", "eval"),
+            dict(namespace),
+        )
+
+    def __reduce__(self):
+        """
+        Pickles the source rather than the generated function, e.g. to hand the spec to
+        worker processes
+        """
+        return CompiledSpecification, (self.source, self.namespace)
+
+    def is_satisfied(self, item: Any) -> bool:
+        """
+        Evaluates the generated predicate, hot loops may call `predicate` directly to
+        skip this call
+        """
+        return self.predicate(item)
+
+
+class _Context:
+    """Collects the constants referenced by the generated code"""
+
+    def __init__(self):
+        self.namespace: dict[str, Any] = {}
+
+    def constant(self, value: Any) -> str:
+        name = f"c{len(self.namespace)}"
+        self.namespace[name] = value
+        return name
+
+
+# spec type -> function building a Python expression over `item` for a spec of that type
+_expressions: dict[type, Callable[[Any, _Context, "_Compiler"], str]] = {}
+
+
+def expression(spec_type: type):
+    """
+    Registers how a specification type is turned into code, so new specifications can be
+    compiled too
+    """
+
+    def register(func):
+        _expressions[spec_type] = func
+        return func
+
+    return register
+
+
+@expression(ocp.ColorSpecification)
+def _color(spec, context, compiler) -> str:
+    return f"item.color == {context.constant(spec.color)}"
+
+
+@expression(ocp.SizeSpecification)
+def _size(spec, context, compiler) -> str:
+    return f"item.size == {context.constant(spec.size)}"
+
+
+@expression(ocp.AndSpecification)
+def _and(spec, context, compiler) -> str:
+    args = compiler.order(spec.args, rejecting_first=True)
+    return "(" + " and ".join(compiler.build(arg, context) for arg in args) + ")"
+
+
+@expression(ocp.OrSpecification)
+def _or(spec, context, compiler) -> str:
+    args = compiler.order(spec.args, rejecting_first=False)
+    return "(" + " or ".join(compiler.build(arg, context) for arg in args) + ")"
+
+
+@expression(ocp.NotSpecification)
+def _not(spec, context, compiler) -> str:
+    return f"(not {compiler.build(spec.spec, context)})"
+
+
+class _Compiler:
+    """Turns a specification tree into the source of one flat expression"""
+
+    def __init__(self, sample: Sequence[Any] | None):
+        self.sample = sample
+
+    def selectivity(self, spec) -> float:
+        """The share of sample items that satisfy a specification"""
+        return sum(1 for item in self.sample if spec.is_satisfied(item)) / len(
+            self.sample
+        )
+
+    def order(self, specs: Sequence[Any], rejecting_first: bool) -> Sequence[Any]:
+        """
+        Orders the operands of a boolean operator so it short-circuits as early as
+        possible: an AND evaluates the most rejecting operand first, an OR the most
+        accepting one.
+        """
+        if not self.sample:
+            return specs
+        return sorted(
+            specs,
+            key=self.selectivity,
+            reverse=not rejecting_first,
+        )
+
+    def build(self, spec, context: _Context) -> str:
+        for spec_type in type(spec).__mro__:
+            if spec_type in _expressions:
+                return _expressions[spec_type](spec, context, self)
+        # specifications without a registered expression are still called, just not
+        # inlined
+        return f"{context.constant(spec.is_satisfied)}(item)"
+
+
+def compile_specification(
+    spec: Any, sample: Sequence[Any] | None = None
+) -> CompiledSpecification:
+    """
+    Compiles a specification tree into a single flat predicate, without a virtual call
+    per node and item.
+
+    :param spec: the specification to compile
+    :param sample: items used to measure how selective every operand is, operands are
+        kept in order without one
+    """
+    context = _Context()
+    source = _Compiler(sample).build(spec, context)
+    return CompiledSpecification(source, context.namespace)
+
+
+def driver():
+    pear = ocp.Product("Pear", ocp.Color.GREEN, ocp.Size.SMALL)
+    ball = ocp.Product("Ball", ocp.Color.GREEN, ocp.Size.MEDIUM)
+    palace = ocp.Product("Palace", ocp.Color.BLUE, ocp.Size.LARGE)
+    products = [pear, ball, palace]
+
+    spec = ocp.ColorSpecification(ocp.Color.GREEN) & ~ocp.SizeSpecification(
+        ocp.Size.SMALL
+    ) | ocp.SizeSpecification(ocp.Size.LARGE)
+    compiled = compile_specification(spec, sample=products)
+    print(f"Compiled to: {compiled.source}")
+    for p in ocp.FilterSpec.filter(items=products, spec=compiled):
+        print(f" - {p.name} matches")
+
+
+if __name__ == "__main__":
+    driver()
@@ -0,0 +1,104 @@
+import random
+import time
+from importlib import import_module
+
+import numpy as np
+from quote_cache import CachedShippingCostCalculator, ShippingQuoteCache
+
+ocp = import_module("prg04-ocp_adherence")
+
+
+class FlatRateShipping(ocp.ShippingStrategy):
+    """A strategy without an array kernel, priced through the per-order fallback"""
+
+    def calculate_cost(self, order) -> float:
+        return 4.99 if order.weight < 20 else 9.99
+
+
+def _timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def benchmark_batch(count: int = 1_000_000) -> None:
+    """
+    Compares pricing orders one call at a time with `calculate_many` and
+    `calculate_arrays`.
+
+    :param count: the number of orders
+    """
+    rng = np.random.default_rng()
+    weights = rng.uniform(0.1, 50, count)
+    distances = rng.uniform(1, 2000, count)
+    orders = [
+        ocp.Order(weight=w, distance=d)
+        for w, d in zip(weights.tolist(), distances.tolist())
+    ]
+
+    print(f"Pricing {count} orders")
+    for strategy in (ocp.StandardShipping(), ocp.ExpressShipping(), FlatRateShipping()):
+        calculator = ocp.ShippingCostCalculator(strategy)
+        single = _timed(lambda: [calculator.calculate_shipping_cost(o) for o in orders])
+        many = _timed(calculator.calculate_many, orders)
+        arrays = _timed(calculator.calculate_arrays, weights, distances)
+        print(
+            f" - {type(strategy).__name__:17s} one by one {single * 1000:8.1f} ms, "
+            f"calculate_many {many * 1000:8.1f} ms, "
+            f"calculate_arrays {arrays * 1000:8.1f} ms"
+        )
+
+
+class ZoneTableShipping(ocp.ShippingStrategy):
+    """
+    A strategy looking its rates up in a zone table, standing in for a costly real-world
+    quote
+    """
+
+    def __init__(self, zones: int = 1_000):
+        self.zones = [(z * 10.0, 0.4 + z * 0.001) for z in range(zones)]
+
+    def calculate_cost(self, order) -> float:
+        rate = next(r for limit, r in reversed(self.zones) if order.distance >= limit)
+        return order.weight * rate + order.distance * 0.1
+
+
+def benchmark_cache(
+    quotes: int = 200_000, buckets: int = 5_000, skew: float = 1.1
+) -> None:
+    """
+    Measures the latency of cached quotes on a Zipfian workload, where few
+    weight/distance buckets are hot.
+
+    :param quotes: the number of quoted orders
+    :param buckets: the number of distinct weight/distance buckets
+    :param skew: the exponent of the Zipf distribution
+    """
+    pairs = [(random.uniform(0.1, 50), random.uniform(1, 2000)) for _ in range(buckets)]
+    popularity = [1 / rank**skew for rank in range(1, buckets + 1)]
+    orders = [
+        ocp.Order(weight=w, distance=d)
+        for w, d in random.choices(pairs, weights=popularity, k=quotes)
+    ]
+
+    print(
+        f"Quoting {quotes} orders drawn from {buckets} Zipf(s={skew}) distributed buckets"
+    )
+    # a quote as cheap as StandardShipping's is not worth caching, the zone table lookup
+    # is
+    for strategy in (ocp.StandardShipping(), ZoneTableShipping()):
+        plain = ocp.ShippingCostCalculator(strategy)
+        cache = ShippingQuoteCache(maxsize=1_000)
+        cached = CachedShippingCostCalculator(strategy, cache)
+        uncached = _timed(lambda: [plain.calculate_shipping_cost(o) for o in orders])
+        hot = _timed(lambda: [cached.calculate_shipping_cost(o) for o in orders])
+        print(
+            f" - {type(strategy).__name__:17s} uncached {uncached / quotes * 1e6:6.2f} us, "
+            f"cached {hot / quotes * 1e6:6.2f} us per quote, "
+            f"hit rate {cache.hit_rate:.1%}"
+        )
+
+
+if __name__ == "__main__":
+    benchmark_batch()
+    benchmark_cache()
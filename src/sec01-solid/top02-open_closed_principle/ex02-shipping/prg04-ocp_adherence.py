@@ -1,4 +1,10 @@
 from abc import ABC, abstractmethod
+from typing import Any, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # batch quoting falls back to pricing order by order
+    np = None
 
 
 class Order:
@@ -16,23 +22,51 @@ class ShippingStrategy(ABC):
     def calculate_cost(self, order) -> float:
         pass
 
+    def calculate_costs(self, weights: Any, distances: Any) -> Any:
+        """
+        Optional array kernel which prices many orders at once from arrays of their
+        weights and distances. Strategies without one return None and are priced order
+        by order.
+        """
+        return None
+
 
 class StandardShipping(ShippingStrategy):
     """Implementation of ShippingStrategy for standard shipping"""
 
+    weight_rate = 0.5
+    distance_rate = 0.1
+
     def calculate_cost(self, order: Order) -> float:
         """Calculates the cost for an order for standard shipment"""
         # Standard shipping cost calculation logic
-        return order.weight * 0.5 + order.distance * 0.1
+        return order.weight * self.weight_rate + order.distance * self.distance_rate
+
+    def calculate_costs(self, weights: Any, distances: Any) -> Any:
+        """
+        Calculates the costs for arrays of order weights and distances for standard
+        shipment
+        """
+        return weights * self.weight_rate + distances * self.distance_rate
 
 
 class ExpressShipping(ShippingStrategy):
     """Implementation of ShippingStrategy for express shipping"""
 
+    weight_rate = 0.8
+    distance_rate = 0.3
+
     def calculate_cost(self, order: Order):
         """Calculates the cost for an order for express shipment"""
         # Express shipping cost calculation logic
-        return order.weight * 0.8 + order.distance * 0.3
+        return order.weight * self.weight_rate + order.distance * self.distance_rate
+
+    def calculate_costs(self, weights: Any, distances: Any) -> Any:
+        """
+        Calculates the costs for arrays of order weights and distances for express
+        shipment
+        """
+        return weights * self.weight_rate + distances * self.distance_rate
 
 
 class ShippingCostCalculator:
@@ -47,6 +81,63 @@ class ShippingCostCalculator:
         """Calculates the actual shipping costs for an order"""
         return self.strategy.calculate_cost(order)
 
+    def _kernel_applies(self) -> bool:
+        """
+        Whether the array kernel prices like calculate_cost, which only holds when both
+        come from the same class, not when a subclass overrides just one of them.
+        """
+        mro = type(self.strategy).__mro__
+
+        def owner(name: str) -> type:
+            return next(cls for cls in mro if name in vars(cls))
+
+        return owner("calculate_costs") is owner("calculate_cost")
+
+    def calculate_many(self, orders: Sequence[Order]) -> Any:
+        """
+        Calculates the shipping costs for many orders in one call, through the array
+        kernel of the strategy when it has one. Without NumPy the costs are returned as
+        a list.
+        """
+        if np is None or not self._kernel_applies():
+            costs = [self.strategy.calculate_cost(order) for order in orders]
+            return costs if np is None else np.array(costs, dtype=float)
+        weights = np.fromiter(
+            (o.weight for o in orders), dtype=float, count=len(orders)
+        )
+        distances = np.fromiter(
+            (o.distance for o in orders), dtype=float, count=len(orders)
+        )
+        costs = self.strategy.calculate_costs(weights, distances)
+        if costs is None:
+            costs = np.fromiter(
+                (self.strategy.calculate_cost(o) for o in orders),
+                dtype=float,
+                count=len(orders),
+            )
+        return costs
+
+    def calculate_arrays(self, weights: Any, distances: Any) -> Any:
+        """
+        Calculates the shipping costs for orders given as NumPy arrays of weights and
+        distances, without creating any Order objects unless the strategy lacks an array
+        kernel.
+        """
+        costs = (
+            self.strategy.calculate_costs(weights, distances)
+            if self._kernel_applies()
+            else None
+        )
+        if costs is None:
+            costs = np.array(
+                [
+                    self.strategy.calculate_cost(Order(weight=w, distance=d))
+                    for w, d in zip(weights.tolist(), distances.tolist())
+                ],
+                dtype=float,
+            )
+        return costs
+
 
 def driver():
     """Driver function to demonstrate the Open/Closed Principle"""
@@ -61,6 +152,11 @@ def driver():
     print("Standard Shipping Cost:", standard_calculator.calculate_shipping_cost(order))
     print("Express Shipping Cost:", express_calculator.calculate_shipping_cost(order))
 
+    # price several orders in one call
+    orders = [order, Order(weight=2, distance=50), Order(weight=25, distance=400)]
+    print("Standard Shipping Costs:", standard_calculator.calculate_many(orders))
+    print("Express Shipping Costs:", express_calculator.calculate_many(orders))
+
 
 if __name__ == "__main__":
     driver()
@@ -0,0 +1,147 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from importlib import import_module
+from typing import Any
+
+ocp = import_module("prg04-ocp_adherence")
+
+
+class ShippingQuoteCache:
+    """
+    A bounded LRU cache of shipping quotes, keyed by strategy and by weight and distance
+    buckets.
+
+    Weights and distances are rounded up to a multiple of their step, and a quote is
+    priced for the upper bound of its buckets, so every order in a bucket gets the same
+    quote no matter which one came first. Entries may expire after a time to live, and
+    all quotes of a strategy are dropped at once by `invalidate`.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 100_000,
+        weight_step: float | None = 0.5,
+        distance_step: float | None = 10.0,
+        ttl: float | None = None,
+    ):
+        """
+        :param maxsize: the maximum number of cached quotes
+        :param weight_step: the width of a weight bucket, None to key on the exact
+            weight
+        :param distance_step: the width of a distance bucket, None to key on the exact
+            distance
+        :param ttl: the number of seconds a quote stays valid, None to keep quotes until
+            they are evicted
+        """
+        self.maxsize = maxsize
+        self.weight_step = weight_step
+        self.distance_step = distance_step
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> (quote, expiry time)
+        self._quotes: OrderedDict[tuple, tuple[float, float]] = OrderedDict()
+        # bumping the generation of a strategy makes all of its cached quotes
+        # unreachable at once
+        self._generations: dict[Any, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._quotes)
+
+    @staticmethod
+    def _bucket(value: float, step: float | None) -> float:
+        return value if step is None else math.ceil(value / step) * step
+
+    def quote(self, strategy: Any, order: Any) -> float:
+        """
+        Returns the cached quote for the buckets of an order, pricing and caching it on
+        a miss.
+
+        :param strategy: the ShippingStrategy to price with
+        :param order: the order to quote
+        """
+        weight = self._bucket(order.weight, self.weight_step)
+        distance = self._bucket(order.distance, self.distance_step)
+        key = (strategy, self._generations.get(strategy, 0), weight, distance)
+        # the clock is only read when quotes can expire
+        now = time.monotonic() if self.ttl is not None else 0.0
+        with self._lock:
+            cached = self._quotes.get(key)
+            if cached is not None and cached[1] > now:
+                self._quotes.move_to_end(key)
+                self.hits += 1
+                return cached[0]
+            self.misses += 1
+
+        cost = strategy.calculate_cost(ocp.Order(weight=weight, distance=distance))
+        expires = now + self.ttl if self.ttl is not None else math.inf
+        with self._lock:
+            self._quotes[key] = (cost, expires)
+            self._quotes.move_to_end(key)
+            while len(self._quotes) > self.maxsize:
+                self._quotes.popitem(last=False)
+                self.evictions += 1
+        return cost
+
+    def invalidate(self, strategy: Any = None) -> None:
+        """
+        Drops the cached quotes of a strategy, e.g. after its rates changed, or of all
+        strategies.
+
+        :param strategy: the strategy whose quotes are dropped, None to clear the whole
+            cache
+        """
+        with self._lock:
+            if strategy is None:
+                self._quotes.clear()
+                self._generations.clear()
+            else:
+                self._generations[strategy] = self._generations.get(strategy, 0) + 1
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of quotes served from the cache"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class CachedShippingCostCalculator(ocp.ShippingCostCalculator):
+    """
+    Calculator which serves quotes from a ShippingQuoteCache, which may be shared
+    between calculators.
+    """
+
+    def __init__(self, strategy: Any, cache: ShippingQuoteCache | None = None):
+        super().__init__(strategy)
+        self.cache = cache if cache is not None else ShippingQuoteCache()
+
+    def calculate_shipping_cost(self, order: Any) -> float:
+        """Returns the cached quote for the weight and distance buckets of an order"""
+        return self.cache.quote(self.strategy, order)
+
+
+def driver():
+    cache = ShippingQuoteCache(weight_step=1, distance_step=50)
+    standard = ocp.StandardShipping()
+    calculator = CachedShippingCostCalculator(standard, cache)
+
+    for weight, distance in ((9.2, 96), (9.9, 80), (10, 100)):
+        order = ocp.Order(weight=weight, distance=distance)
+        print(
+            f"Quote for {weight} kg over {distance} km: {calculator.calculate_shipping_cost(order)}"
+        )
+    print(f"Hits: {cache.hits}, misses: {cache.misses}")
+
+    # the rates of the strategy change, so its cached quotes have to go
+    standard.weight_rate = 0.6
+    cache.invalidate(standard)
+    order = ocp.Order(weight=10, distance=100)
+    print(f"Quote after the rate change: {calculator.calculate_shipping_cost(order)}")
+
+
+if __name__ == "__main__":
+    driver()
@@ -0,0 +1,58 @@
+import time
+from importlib import import_module
+
+import numpy as np
+from shape_array import ShapeArray
+
+lsp = import_module("prg02-lsp_adherence")
+
+
+def benchmark_areas(count: int = 10_000_000, objects: int = 1_000_000) -> None:
+    """
+    Compares summing areas over a ShapeArray with calling `area()` on Rectangle and
+    Square objects.
+
+    :param count: the number of shapes in the array
+    :param objects: the number of shape objects summed for comparison
+    """
+    rng = np.random.default_rng()
+    widths = rng.uniform(1, 100, count)
+    heights = rng.uniform(1, 100, count)
+    squares = rng.random(count) < 0.5
+    heights[squares] = widths[squares]
+    shapes = ShapeArray.from_columns(widths, heights, squares)
+
+    start = time.perf_counter()
+    total = shapes.total_area()
+    vectorized = time.perf_counter() - start
+
+    start = time.perf_counter()
+    shapes.areas()
+    areas = time.perf_counter() - start
+
+    items = [
+        lsp.Square(w) if s else lsp.Rectangle(w, h)
+        for w, h, s in zip(
+            widths[:objects].tolist(),
+            heights[:objects].tolist(),
+            squares[:objects].tolist(),
+        )
+    ]
+    start = time.perf_counter()
+    sum(shape.area() for shape in items)
+    per_object = time.perf_counter() - start
+
+    print(f"Summing the areas of {count} shapes, total {total:.4g}")
+    print(f" - ShapeArray.total_area: {vectorized * 1000:9.1f} ms")
+    print(f" - ShapeArray.areas:      {areas * 1000:9.1f} ms")
+    print(
+        f" - Shape.area per object: {per_object * count / objects * 1000:9.1f} ms "
+        f"(extrapolated from {objects} objects)"
+    )
+    print(
+        f" - memory: {(widths.nbytes + heights.nbytes + squares.nbytes) / count:.0f} bytes per shape in columns"
+    )
+
+
+if __name__ == "__main__":
+    benchmark_areas()
@@ -0,0 +1,204 @@
+from importlib import import_module
+from typing import Any, Iterable, Iterator
+
+import numpy as np
+
+lsp = import_module("prg02-lsp_adherence")
+
+_RECTANGLE = 0
+_SQUARE = 1
+
+
+class ShapeArray:
+    """
+    Struct-of-arrays storage for rectangles and squares: widths, heights and the kind of
+    every shape each live in their own NumPy array. A square keeps its side in both the
+    width and the height column, so the area of every shape is simply width times height
+    and all areas are computed in one vectorized call.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._widths = np.empty(capacity, dtype=np.float64)
+        self._heights = np.empty(capacity, dtype=np.float64)
+        self._kinds = np.empty(capacity, dtype=np.uint8)
+        self._count = 0
+
+    @classmethod
+    def from_shapes(cls, shapes: Iterable[Any]):
+        """Builds an array from Rectangle and Square objects"""
+        shapes = list(shapes)
+        array = cls(capacity=max(len(shapes), 1))
+        for shape in shapes:
+            array.append(shape)
+        return array
+
+    @classmethod
+    def from_columns(cls, widths: Any, heights: Any, squares: Any = None):
+        """
+        Builds an array directly from width and height columns, with an optional boolean
+        column marking squares. Squares must have equal widths and heights.
+        """
+        kinds = np.zeros(len(widths), dtype=np.uint8)
+        if squares is not None:
+            kinds[np.asarray(squares, dtype=bool)] = _SQUARE
+            square = kinds == _SQUARE
+            if not np.array_equal(
+                np.asarray(widths)[square], np.asarray(heights)[square]
+            ):
+                raise ValueError("squares must have equal widths and heights")
+        array = cls(capacity=max(len(widths), 1))
+        array._widths[: len(widths)] = widths
+        array._heights[: len(heights)] = heights
+        array._kinds[: len(kinds)] = kinds
+        array._count = len(widths)
+        return array
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int):
+        """Returns a view of a single shape, reading and writing the columns in place"""
+        if not -self._count <= index < self._count:
+            raise IndexError("shape index out of range")
+        index %= self._count
+        if self._kinds[index] == _SQUARE:
+            return SquareView(self, index)
+        return RectangleView(self, index)
+
+    def __iter__(self) -> Iterator[Any]:
+        for index in range(self._count):
+            yield self[index]
+
+    @property
+    def widths(self) -> np.ndarray:
+        """The width column, read-only so squares cannot be reshaped through it"""
+        return _read_only(self._widths[: self._count])
+
+    @property
+    def heights(self) -> np.ndarray:
+        """The height column, read-only so squares cannot be reshaped through it"""
+        return _read_only(self._heights[: self._count])
+
+    @property
+    def squares(self) -> np.ndarray:
+        """A boolean column marking the squares"""
+        return self._kinds[: self._count] == _SQUARE
+
+    def _grow(self, needed: int) -> None:
+        capacity = max(len(self._widths) * 2, needed)
+        for column in ("_widths", "_heights", "_kinds"):
+            old = getattr(self, column)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[: self._count] = old[: self._count]
+            setattr(self, column, new)
+
+    def _push(self, width: float, height: float, kind: int) -> int:
+        if self._count == len(self._widths):
+            self._grow(self._count + 1)
+        index = self._count
+        self._widths[index] = width
+        self._heights[index] = height
+        self._kinds[index] = kind
+        self._count += 1
+        return index
+
+    def add_rectangle(self, width: float, height: float) -> int:
+        """Adds a rectangle and returns its index"""
+        return self._push(width, height, _RECTANGLE)
+
+    def add_square(self, side: float) -> int:
+        """Adds a square and returns its index"""
+        return self._push(side, side, _SQUARE)
+
+    def append(self, shape: Any) -> int:
+        """Adds a Rectangle or Square object and returns its index"""
+        if isinstance(shape, lsp.Square):
+            return self.add_square(shape.side)
+        if isinstance(shape, lsp.Rectangle):
+            return self.add_rectangle(shape.width, shape.height)
+        raise TypeError(f"unsupported shape {type(shape).__name__}")
+
+    def areas(self) -> np.ndarray:
+        """Calculates the areas of all shapes at once"""
+        return self._widths[: self._count] * self._heights[: self._count]
+
+    def total_area(self) -> float:
+        """Calculates the summed area of all shapes"""
+        # a dot product sums the areas without materializing them
+        return float(np.dot(self._widths[: self._count], self._heights[: self._count]))
+
+    def scale(self, factor: float) -> None:
+        """Scales every shape by the same factor, which keeps squares square"""
+        self._widths[: self._count] *= factor
+        self._heights[: self._count] *= factor
+
+
+def _read_only(column: np.ndarray) -> np.ndarray:
+    view = column.view()
+    view.flags.writeable = False
+    return view
+
+
+class RectangleView(lsp.Rectangle):
+    """A Rectangle whose dimensions live in a ShapeArray"""
+
+    def __init__(self, array: ShapeArray, index: int):
+        self._array = array
+        self._index = index
+
+    @property
+    def _width(self) -> float:
+        return float(self._array._widths[self._index])
+
+    @_width.setter
+    def _width(self, value: float) -> None:
+        self._array._widths[self._index] = value
+
+    @property
+    def _height(self) -> float:
+        return float(self._array._heights[self._index])
+
+    @_height.setter
+    def _height(self, value: float) -> None:
+        self._array._heights[self._index] = value
+
+
+class SquareView(lsp.Square):
+    """
+    A Square whose side lives in a ShapeArray, written to both columns at once so they
+    never disagree
+    """
+
+    def __init__(self, array: ShapeArray, index: int):
+        self._array = array
+        self._index = index
+
+    @property
+    def _side(self) -> float:
+        return float(self._array._widths[self._index])
+
+    @_side.setter
+    def _side(self, value: float) -> None:
+        self._array._widths[self._index] = value
+        self._array._heights[self._index] = value
+
+
+def driver():
+    shapes = ShapeArray()
+    shapes.add_rectangle(width=2, height=3)
+    shapes.add_square(side=5)
+    print(f"Areas: {shapes.areas()}, total: {shapes.total_area()}")
+
+    rectangle, square = shapes
+    rectangle.width = 6
+    print(
+        f"Expected an area of {rectangle.width * rectangle.height}, got {rectangle.area()}"
+    )
+
+    square.width = 11
+    print(f"Expected an area of {square.side**2}, got {square.area()}")
+    print(f"Stored as {square}, widths {shapes.widths}, heights {shapes.heights}")
+
+
+if __name__ == "__main__":
+    driver()
@@ -0,0 +1,224 @@
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from importlib import import_module
+
+from external_sort import ExternalMergeSort, read_integers, write_integers
+from hybrid_sort import IntroSort
+from integer_sort import AutoSort, CountingSort, RadixSort
+from parallel_sort import ParallelSampleSort
+from streaming_top_k import StreamingTopK
+
+lsp = import_module("prg04-lsp_adherence")
+
+
+def make_inputs(size: int) -> dict[str, list[int]]:
+    """Builds the input distributions the sorting algorithms are measured on"""
+    numbers = [random.randrange(size) for _ in range(size)]
+    return {
+        "random": numbers,
+        "sorted": sorted(numbers),
+        "reversed": sorted(numbers, reverse=True),
+        # a hundred copies of every number on average
+        "duplicates": [random.randrange(size // 100 or 1) for _ in range(size)],
+    }
+
+
+def _sort_time(algorithm, nums: list[int]) -> float:
+    # sorted before timing, as some algorithms sort the list they are given in place
+    expected = sorted(nums)
+    nums = nums.copy()
+    start = time.perf_counter()
+    result = lsp.sort_numbers(algorithm, nums)
+    elapsed = time.perf_counter() - start
+    assert result == expected
+    return elapsed
+
+
+def benchmark_hybrid(size: int = 100_000, small: int = 2_000) -> None:
+    """
+    Compares IntroSort with QuickSort and BubbleSort across input distributions.
+
+    :param size: the number of numbers sorted by IntroSort and QuickSort
+    :param small: the number of numbers sorted by BubbleSort
+    """
+    print(f"Sorting {size} numbers ({small} for BubbleSort)")
+    large, short = make_inputs(size), make_inputs(small)
+    for name, nums in large.items():
+        intro = _sort_time(IntroSort(), nums)
+        quick = _sort_time(lsp.QuickSort(), nums)
+        bubble = _sort_time(lsp.BubbleSort(), short[name])
+        print(
+            f" - {name:10s} IntroSort {intro * 1000:8.1f} ms, "
+            f"QuickSort {quick * 1000:8.1f} ms, "
+            f"BubbleSort {bubble * 1000:8.1f} ms"
+        )
+
+
+def benchmark_external(memory_budget: int = 4 * 2**20, factor: int = 10) -> None:
+    """
+    Sorts a file of 64-bit integers `factor` times larger than the memory budget with
+    ExternalMergeSort.
+
+    :param memory_budget: the memory budget of the sort in bytes
+    :param factor: how many times the file is larger than the budget
+    """
+    count = memory_budget * factor // 8
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, "numbers.bin")
+        destination = os.path.join(directory, "sorted.bin")
+        write_integers(
+            source, (random.randrange(-(2**63), 2**63) for _ in range(count))
+        )
+
+        algorithm = ExternalMergeSort(memory_budget=memory_budget)
+        tracemalloc.start()
+        start = time.perf_counter()
+        stats = algorithm.sort_file(source, destination)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        previous = None
+        for value in read_integers(destination):
+            assert previous is None or previous <= value
+            previous = value
+
+    print(
+        f"Sorting a {count * 8 / 2**20:.0f} MiB file with a "
+        f"{memory_budget / 2**20:.0f} MiB memory budget"
+    )
+    print(f" - {elapsed:.1f} s (traced), peak memory {peak / 2**20:.1f} MiB")
+    print(f" - {stats}, {stats.io_bytes / 2**20:.1f} MiB of I/O in total")
+
+
+def benchmark_parallel(size: int = 10_000_000, max_workers: int | None = None) -> None:
+    """
+    Measures how ParallelSampleSort scales from one worker to one per CPU, against
+    `sorted()`.
+
+    :param size: the number of 64-bit integers to sort
+    :param max_workers: the largest number of workers, one per CPU by default
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    nums = [random.randrange(-(2**63), 2**63) for _ in range(size)]
+    start = time.perf_counter()
+    expected = sorted(nums)
+    baseline = time.perf_counter() - start
+
+    print(f"Sorting {size} integers on {os.cpu_count()} CPUs")
+    print(f" - sorted():  {baseline * 1000:9.1f} ms")
+    workers = 1
+    while workers <= max_workers:
+        copy = nums.copy()
+        start = time.perf_counter()
+        ParallelSampleSort(workers=workers).sort(copy)
+        elapsed = time.perf_counter() - start
+        assert copy == expected
+        print(
+            f" - {workers:3d} workers {elapsed * 1000:9.1f} ms, "
+            f"{baseline / elapsed:5.2f}x sorted()"
+        )
+        workers *= 2
+
+
+def benchmark_integer(size: int = 500_000) -> None:
+    """
+    Compares CountingSort, RadixSort and AutoSort with QuickSort and `list.sort` on
+    integers of growing ranges.
+
+    :param size: the number of integers to sort
+    """
+    print(f"Sorting {size} integers")
+    for name, bits in (("16-bit", 16), ("32-bit", 32), ("64-bit", 64)):
+        nums = [
+            random.randrange(-(2 ** (bits - 1)), 2 ** (bits - 1)) for _ in range(size)
+        ]
+        timings = []
+        for algorithm in (CountingSort(), RadixSort(), AutoSort(), lsp.QuickSort()):
+            if isinstance(algorithm, CountingSort) and 2**bits > 4 * size:
+                timings.append(f"{type(algorithm).__name__} skipped")
+                continue
+            timings.append(
+                f"{type(algorithm).__name__} {_sort_time(algorithm, nums) * 1000:7.1f} ms"
+            )
+        copy = nums.copy()
+        start = time.perf_counter()
+        copy.sort()
+        timings.append(f"list.sort {(time.perf_counter() - start) * 1000:7.1f} ms")
+        picked = type(AutoSort().select(nums)).__name__
+        print(f" - {name} (AutoSort picks {picked}): " + ", ".join(timings))
+
+
+def check_selection(trials: int = 1_000) -> None:
+    """
+    Checks `top_k`, `nth_element` and StreamingTopK against `sorted()` on random inputs
+    of random sizes, with few or many duplicates, presorted or not.
+
+    :param trials: the number of random inputs
+    """
+    algorithm = IntroSort()
+    for _ in range(trials):
+        size = random.randrange(1, 500)
+        nums = [random.randrange(random.choice((3, size, 2**64))) for _ in range(size)]
+        if random.random() < 0.2:
+            nums.sort(reverse=random.random() < 0.5)
+        expected = sorted(nums)
+        k = random.randrange(size + 2)
+
+        assert algorithm.top_k(nums, k) == expected[:k]
+        assert algorithm.top_k(iter(nums), k) == expected[:k]
+        stream = StreamingTopK(k)
+        stream.extend(nums)
+        assert stream.result() == expected[:k]
+
+        if k < size:
+            partial = algorithm.nth_element(nums.copy(), k)
+            assert sorted(partial) == expected and partial[k] == expected[k]
+            assert all(n <= partial[k] for n in partial[:k])
+            assert all(n >= partial[k] for n in partial[k + 1 :])
+    print(
+        f"top_k, nth_element and StreamingTopK agree with sorted() on {trials} inputs"
+    )
+
+
+def benchmark_selection(size: int = 1_000_000, k: int = 100) -> None:
+    """
+    Compares taking the k smallest numbers by sorting all of them with `top_k`,
+    `nth_element` and StreamingTopK.
+
+    :param size: the number of numbers
+    :param k: the number of smallest numbers taken
+    """
+    check_selection()
+    nums = [random.randrange(size) for _ in range(size)]
+    algorithm = IntroSort()
+
+    def timed(func) -> float:
+        copy = nums.copy()
+        start = time.perf_counter()
+        func(copy)
+        return time.perf_counter() - start
+
+    def streamed(copy: list[int]) -> None:
+        StreamingTopK(k).extend(copy)
+
+    print(f"Taking the {k} smallest of {size} numbers")
+    for name, func in (
+        ("IntroSort.sort", lambda copy: algorithm.sort(copy)[:k]),
+        ("list.sort", lambda copy: sorted(copy)[:k]),
+        ("top_k", lambda copy: algorithm.top_k(copy, k)),
+        ("nth_element", lambda copy: sorted(algorithm.nth_element(copy, k)[:k])),
+        ("StreamingTopK", streamed),
+    ):
+        print(f" - {name:15s} {timed(func) * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    benchmark_hybrid()
+    benchmark_external()
+    benchmark_parallel()
+    benchmark_integer()
+    benchmark_selection()
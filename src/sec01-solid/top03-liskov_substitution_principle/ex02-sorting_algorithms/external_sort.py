@@ -0,0 +1,208 @@
+import heapq
+import os
+import tempfile
+from array import array
+from importlib import import_module
+from itertools import count, islice
+from typing import Iterable, Iterator, List
+
+lsp = import_module("prg04-lsp_adherence")
+
+# a list slot holding a 64-bit int costs a pointer, the int object itself and up to half
+# a pointer of sort buffer
+_BYTES_PER_ITEM = 8 + 36 + 4
+
+
+def read_integers(
+    path: str | os.PathLike, typecode: str = "q", buffer_size: int = 1 << 20
+) -> Iterator[int]:
+    """
+    Yields the integers of a binary file of fixed-width integers in native byte order.
+
+    :param path: the file to read
+    :param typecode: the array typecode of the integers, e.g. "q" for signed 64-bit
+    :param buffer_size: the number of bytes read at once
+    """
+    itemsize = array(typecode).itemsize
+    per_chunk = max(buffer_size // itemsize, 1)
+    with open(path, "rb") as fh:
+        if os.fstat(fh.fileno()).st_size % itemsize:
+            raise ValueError(f"{path} is not a file of {itemsize}-byte integers")
+        while True:
+            # reading straight into the array avoids holding every chunk twice, as bytes
+            # and as integers
+            values = array(typecode)
+            try:
+                values.fromfile(fh, per_chunk)
+            except EOFError:
+                pass
+            if not values:
+                return
+            yield from values
+
+
+def write_integers(
+    path: str | os.PathLike,
+    items: Iterable[int],
+    typecode: str = "q",
+    buffer_size: int = 1 << 20,
+) -> int:
+    """
+    Writes integers to a binary file of fixed-width integers in native byte order and
+    returns the bytes written.
+
+    :param path: the file to write
+    :param items: the integers to write
+    :param typecode: the array typecode of the integers, e.g. "q" for signed 64-bit
+    :param buffer_size: the number of bytes written at once
+    """
+    itemsize = array(typecode).itemsize
+    per_chunk = max(buffer_size // itemsize, 1)
+    written = 0
+    items = iter(items)
+    with open(path, "wb") as fh:
+        while chunk := array(typecode, islice(items, per_chunk)):
+            chunk.tofile(fh)
+            written += len(chunk) * itemsize
+    return written
+
+
+class ExternalSortStats:
+    """Statistics of one external sort"""
+
+    def __init__(self):
+        self.items = 0
+        self.runs = 0
+        self.merge_passes = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+
+    @property
+    def io_bytes(self) -> int:
+        """The number of bytes spilled to and read back from temporary files"""
+        return self.bytes_written + self.bytes_read
+
+    def __str__(self) -> str:
+        return (
+            f"{self.items} items in {self.runs} runs, {self.merge_passes} merge passes, "
+            f"{self.bytes_written / 2**20:.1f} MiB written, {self.bytes_read / 2**20:.1f} MiB read"
+        )
+
+
+class ExternalMergeSort(lsp.SortingAlgorithm):
+    """
+    External merge sort algorithm for inputs larger than memory: sorted runs that fit
+    the memory budget are spilled to temporary files as fixed-width integers and k-way
+    merged with a heap. When there are more runs than can be merged at once within the
+    budget, they are merged in several passes.
+    """
+
+    def __init__(
+        self,
+        memory_budget: int = 64 * 2**20,
+        typecode: str = "q",
+        max_fan_in: int = 64,
+        temp_dir: str | None = None,
+    ):
+        """
+        :param memory_budget: the approximate number of bytes of integers held in memory
+            at once
+        :param typecode: the array typecode of the spilled integers, e.g. "q" for signed
+            64-bit
+        :param max_fan_in: the maximum number of runs merged at once
+        :param temp_dir: the directory of the temporary files, the system default if
+            None
+        """
+        if max_fan_in < 2:
+            raise ValueError("at least two runs have to be merged at once")
+        self.memory_budget = memory_budget
+        self.typecode = typecode
+        self.max_fan_in = max_fan_in
+        self.temp_dir = temp_dir
+        self.stats = ExternalSortStats()
+
+    def sort(self, nums: List[int]) -> List[int]:
+        # the sorted integers are only assigned once all of them were spilled, so nums
+        # is read before it is written
+        nums[:] = list(self.iter_sorted(nums))
+        return nums
+
+    def sort_file(
+        self, source: str | os.PathLike, destination: str | os.PathLike
+    ) -> ExternalSortStats:
+        """Sorts a binary file of fixed-width integers into another one"""
+        buffer_size = self._buffer_size(self.max_fan_in)
+        sorted_items = self.iter_sorted(
+            read_integers(source, self.typecode, buffer_size)
+        )
+        write_integers(destination, sorted_items, self.typecode, buffer_size)
+        return self.stats
+
+    def iter_sorted(self, items: Iterable[int]) -> Iterator[int]:
+        """
+        Yields the integers of an iterable in sorted order, holding only about the
+        memory budget in memory
+        """
+        stats = self.stats = ExternalSortStats()
+        run_length = max(self.memory_budget // _BYTES_PER_ITEM, 1)
+        numbers = count()
+        with tempfile.TemporaryDirectory(dir=self.temp_dir) as directory:
+            runs = []
+            items = iter(items)
+            while run := list(islice(items, run_length)):
+                run.sort()
+                stats.items += len(run)
+                runs.append(self._spill(directory, next(numbers), run))
+                # dropped before the next run is read, so only one run is held at a time
+                del run
+            stats.runs = len(runs)
+
+            # merge passes shrink the number of runs until a single merge fits the
+            # fan-in
+            while len(runs) > self.max_fan_in:
+                stats.merge_passes += 1
+                merged = []
+                for start in range(0, len(runs), self.max_fan_in):
+                    group = runs[start : start + self.max_fan_in]
+                    merged.append(
+                        self._spill(directory, next(numbers), self._merge(group))
+                    )
+                    for path in group:
+                        os.remove(path)
+                runs = merged
+
+            if runs:
+                stats.merge_passes += 1
+                yield from self._merge(runs)
+
+    def _spill(self, directory: str, number: int, items: Iterable[int]) -> str:
+        path = os.path.join(directory, f"run{number:06d}.bin")
+        self.stats.bytes_written += write_integers(
+            path, items, self.typecode, self._buffer_size(self.max_fan_in)
+        )
+        return path
+
+    def _buffer_size(self, runs: int) -> int:
+        # the budget is shared by the read buffers of all merged runs and the write
+        # buffer
+        return max(self.memory_budget // (runs + 1), 4096)
+
+    def _read_run(self, path: str, buffer_size: int) -> Iterator[int]:
+        self.stats.bytes_read += os.path.getsize(path)
+        return read_integers(path, self.typecode, buffer_size)
+
+    def _merge(self, runs: list[str]) -> Iterator[int]:
+        buffer_size = self._buffer_size(len(runs))
+        return heapq.merge(*(self._read_run(path, buffer_size) for path in runs))
+
+
+def driver():
+    numbers = [5, 3, 8, 1, 2, 7, 4, 6]
+    # a tiny budget forces several runs even for a handful of numbers
+    algorithm = ExternalMergeSort(memory_budget=3 * _BYTES_PER_ITEM, max_fan_in=2)
+    print("Sorted using External Merge Sort:", lsp.sort_numbers(algorithm, numbers))
+    print(f"Spilled {algorithm.stats}")
+
+
+if __name__ == "__main__":
+    driver()
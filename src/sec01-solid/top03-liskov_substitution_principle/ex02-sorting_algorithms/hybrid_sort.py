@@ -0,0 +1,137 @@
+from importlib import import_module
+from itertools import pairwise
+from typing import List
+
+lsp = import_module("prg04-lsp_adherence")
+
+
+def _insertion_sort(nums: List[int], low: int, high: int) -> None:
+    """Sorts nums[low:high] in place, fast for short or nearly sorted ranges"""
+    for i in range(low + 1, high):
+        item = nums[i]
+        j = i - 1
+        while j >= low and nums[j] > item:
+            nums[j + 1] = nums[j]
+            j -= 1
+        nums[j + 1] = item
+
+
+def _bounded_insertion_sort(nums: List[int], low: int, high: int, limit: int) -> bool:
+    """
+    Insertion sorts nums[low:high] in place, but gives up once more than `limit` numbers
+    were moved. Returns whether the range got sorted, it is left a permutation of itself
+    either way.
+    """
+    moved = 0
+    for i in range(low + 1, high):
+        item = nums[i]
+        j = i - 1
+        while j >= low and nums[j] > item:
+            nums[j + 1] = nums[j]
+            j -= 1
+        nums[j + 1] = item
+        moved += i - 1 - j
+        if moved > limit:
+            return False
+    return True
+
+
+def _sift_down(nums: List[int], low: int, root: int, end: int) -> None:
+    item = nums[low + root]
+    child = 2 * root + 1
+    while child < end:
+        if child + 1 < end and nums[low + child + 1] > nums[low + child]:
+            child += 1
+        if nums[low + child] <= item:
+            break
+        nums[low + root] = nums[low + child]
+        root = child
+        child = 2 * root + 1
+    nums[low + root] = item
+
+
+def _heapsort(nums: List[int], low: int, high: int) -> None:
+    """Sorts nums[low:high] in place in guaranteed O(n log n)"""
+    size = high - low
+    for root in range(size // 2 - 1, -1, -1):
+        _sift_down(nums, low, root, size)
+    for end in range(size - 1, 0, -1):
+        nums[low], nums[low + end] = nums[low + end], nums[low]
+        _sift_down(nums, low, 0, end)
+
+
+class IntroSort(lsp.SortingAlgorithm):
+    """
+    Hybrid sort algorithm: quick sort with a median-of-three pivot and Hoare
+    partitioning, insertion sort for short ranges and heap sort once partitioning
+    degenerates, so it never exceeds O(n log n). Sorted, reversed and nearly sorted
+    input is detected up front and finished in linear time.
+    """
+
+    def __init__(self, insertion_threshold: int = 16):
+        """
+        :param insertion_threshold: the range length below which insertion sort takes
+            over
+        """
+        self.insertion_threshold = insertion_threshold
+
+    def sort(self, nums: List[int]) -> List[int]:
+        size = len(nums)
+        if size < 2:
+            return nums
+        if self._presorted(nums):
+            return nums
+
+        # ranges are kept on an explicit stack rather than recursed into, so deep inputs
+        # cannot overflow the stack
+        stack = [(0, size, 2 * size.bit_length())]
+        while stack:
+            low, high, depth = stack.pop()
+            while high - low > self.insertion_threshold:
+                if depth == 0:
+                    _heapsort(nums, low, high)
+                    break
+                depth -= 1
+                # the partition works on an inclusive range, the split starts the upper
+                # part
+                split = lsp._hoare_partition(nums, low, high - 1) + 1
+                # the larger part waits on the stack, which keeps the stack logarithmic
+                if split - low < high - split:
+                    stack.append((split, high, depth))
+                    high = split
+                else:
+                    stack.append((low, split, depth))
+                    low = split
+            else:
+                _insertion_sort(nums, low, high)
+        return nums
+
+    @staticmethod
+    def _presorted(nums: List[int]) -> bool:
+        """
+        Sorts input which is already sorted, reversed or close to sorted in linear time,
+        if it is
+        """
+        descents = sum(1 for a, b in pairwise(nums) if a > b)
+        if descents == 0:
+            return True
+        if not any(a < b for a, b in pairwise(nums)):
+            nums.reverse()
+            return True
+        # few descents hint at a few misplaced numbers, which insertion sort fixes with
+        # a bounded number of moves
+        if descents <= len(nums) // 64:
+            return _bounded_insertion_sort(nums, 0, len(nums), limit=len(nums))
+        return False
+
+
+def driver():
+    numbers = [5, 3, 8, 1, 2, 7, 4, 6]
+    print("Sorted using Intro Sort:", lsp.sort_numbers(IntroSort(), numbers.copy()))
+
+    ascending = list(range(100_000))
+    print("Sorted 100000 presorted numbers:", IntroSort().sort(ascending) == ascending)
+
+
+if __name__ == "__main__":
+    driver()
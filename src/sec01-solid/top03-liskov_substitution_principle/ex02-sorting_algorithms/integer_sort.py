@@ -0,0 +1,210 @@
+from array import array
+from importlib import import_module
+from itertools import repeat
+from typing import Any, List
+
+from hybrid_sort import IntroSort
+
+try:
+    import numpy as np
+except ImportError:  # the sorts fall back to the array module
+    np = None
+
+lsp = import_module("prg04-lsp_adherence")
+
+_SIGN_BIT = 1 << 63
+
+
+class CountingSort(lsp.SortingAlgorithm):
+    """
+    Counting sort algorithm for integers within a small range: O(n + k) for k possible
+    values, independent of how the numbers are ordered. Backed by NumPy, or by an array
+    of counts without it. Numbers spread over a range too large to count are radix
+    sorted instead, or sorted by IntroSort if they do not fit 64 bits, rather than
+    allocating a count for every value in between.
+    """
+
+    def __init__(self, max_factor: int = 64, min_span: int = 1 << 16):
+        """
+        :param max_factor: the largest value range, as a multiple of the count, that is
+            counted
+        :param min_span: a value range that is always counted, however few the numbers
+        """
+        self.max_factor = max_factor
+        self.min_span = min_span
+
+    def _countable(self, low: int, high: int, size: int) -> bool:
+        return high - low + 1 <= max(self.max_factor * size, self.min_span)
+
+    def sort(self, nums: List[int]) -> List[int]:
+        if len(nums) < 2:
+            return nums
+        values = _int64_values(nums)
+        if values is not None:
+            if not self._countable(int(values.min()), int(values.max()), len(nums)):
+                return RadixSort().sort(nums)
+            nums[:] = self._sort_values(values).tolist()
+            return nums
+
+        low, high = min(nums), max(nums)
+        if not self._countable(low, high, len(nums)):
+            if -_SIGN_BIT <= low and high < _SIGN_BIT:
+                return RadixSort().sort(nums)
+            return IntroSort().sort(nums)
+        counts = array("Q", bytes(8 * (high - low + 1)))
+        for value in nums:
+            counts[value - low] += 1
+        position = 0
+        for offset, count in enumerate(counts):
+            if count:
+                nums[position : position + count] = repeat(low + offset, count)
+                position += count
+        return nums
+
+    @staticmethod
+    def _sort_values(values: "np.ndarray") -> "np.ndarray":
+        """Counts numbers whose range the caller checked to be small enough"""
+        low, high = int(values.min()), int(values.max())
+        counts = np.bincount(values - low, minlength=high - low + 1)
+        return np.repeat(np.arange(low, high + 1, dtype=np.int64), counts)
+
+
+class RadixSort(lsp.SortingAlgorithm):
+    """
+    LSD radix sort algorithm for 64-bit integers: one stable pass per digit of the key
+    range, starting with the least significant one. Backed by NumPy with 16-bit digits,
+    or by array buckets with 8-bit digits without it.
+    """
+
+    def sort(self, nums: List[int]) -> List[int]:
+        if len(nums) < 2:
+            return nums
+        values = _int64_values(nums)
+        if values is not None:
+            nums[:] = self._sort_values(values).tolist()
+        else:
+            nums[:] = self._sort_array(nums)
+        return nums
+
+    @staticmethod
+    def _sort_values(values: "np.ndarray") -> "np.ndarray":
+        # flipping the sign bit orders signed numbers like unsigned ones, rebasing on
+        # the minimum saves passes
+        keys = values.view(np.uint64) ^ np.uint64(_SIGN_BIT)
+        low = keys.min()
+        keys -= low
+        for shift in range(0, int(keys.max()).bit_length(), 16):
+            digits = (keys >> np.uint64(shift)).astype(np.uint16)
+            # a stable sort of 16-bit digits is a counting pass in NumPy
+            keys = keys[np.argsort(digits, kind="stable")]
+        keys += low
+        return (keys ^ np.uint64(_SIGN_BIT)).view(np.int64)
+
+    @staticmethod
+    def _sort_array(nums: List[int]) -> array:
+        low = min(nums)
+        keys = array("Q", (value - low for value in nums))
+        for shift in range(0, (max(nums) - low).bit_length(), 8):
+            buckets = [array("Q") for _ in range(256)]
+            for key in keys:
+                buckets[(key >> shift) & 0xFF].append(key)
+            keys = array("Q")
+            for bucket in buckets:
+                keys.extend(bucket)
+        return array("q", (key + low for key in keys))
+
+
+def _int64_values(nums: List[int]) -> "np.ndarray | None":
+    """
+    Converts the numbers to a NumPy array if NumPy is present and they are all 64-bit
+    integers
+    """
+    if np is None:
+        return None
+    try:
+        values = np.asarray(nums)
+    except OverflowError:
+        return None
+    return values.astype(np.int64, copy=False) if values.dtype.kind == "i" else None
+
+
+class AutoSort(lsp.SortingAlgorithm):
+    """
+    Sorting algorithm which picks a strategy from the numbers it is given: counting sort
+    when their range is small relative to their count, radix sort when its digit passes
+    are cheaper than the comparisons of a comparison sort, and the fallback algorithm
+    otherwise.
+    """
+
+    def __init__(
+        self,
+        fallback: lsp.SortingAlgorithm | None = None,
+        counting_factor: int = 4,
+        min_size: int = 64,
+    ):
+        """
+        :param fallback: the algorithm for everything else, IntroSort by default
+        :param counting_factor: the largest value range, as a multiple of the count,
+            that is counting sorted
+        :param min_size: the count below which the fallback is always used
+        """
+        self.fallback = fallback or IntroSort()
+        self.counting_factor = counting_factor
+        self.min_size = min_size
+
+    def select(self, nums: List[int]) -> lsp.SortingAlgorithm:
+        """Returns the algorithm the numbers would be sorted with"""
+        return self._plan(nums)[0]
+
+    def _plan(self, nums: List[int]) -> tuple[lsp.SortingAlgorithm, Any]:
+        """
+        Picks the algorithm, along with the numbers as a NumPy array if they were
+        converted for picking it
+        """
+        size = len(nums)
+        if size < self.min_size:
+            return self.fallback, None
+        # with NumPy the numbers are converted once, for measuring their range and for
+        # sorting them
+        values = _int64_values(nums)
+        if values is not None:
+            low, high = int(values.min()), int(values.max())
+        elif np is None and all(isinstance(n, int) for n in nums):
+            low, high = min(nums), max(nums)
+        else:
+            return self.fallback, None
+
+        span = high - low + 1
+        if span <= self.counting_factor * size:
+            return CountingSort(), values
+        # every 16-bit digit costs one pass over the numbers, a comparison sort takes
+        # about log2(n) of them
+        passes = -(-span.bit_length() // 16)
+        if values is not None and passes * 4 <= size.bit_length():
+            return RadixSort(), values
+        return self.fallback, None
+
+    def sort(self, nums: List[int]) -> List[int]:
+        algorithm, values = self._plan(nums)
+        if values is None:
+            return algorithm.sort(nums)
+        nums[:] = algorithm._sort_values(values).tolist()
+        return nums
+
+
+def driver():
+    numbers = [5, 3, 8, 1, 2, 7, 4, 6]
+    print(
+        "Sorted using Counting Sort:", lsp.sort_numbers(CountingSort(), numbers.copy())
+    )
+    print("Sorted using Radix Sort:", lsp.sort_numbers(RadixSort(), numbers.copy()))
+
+    auto = AutoSort()
+    for nums in (numbers * 100, [n * 1_000_003 for n in numbers] * 100_000):
+        print(
+            f"AutoSort picks {type(auto.select(nums)).__name__} for {len(nums)} numbers"
+        )
+
+
+if __name__ == "__main__":
+    driver()
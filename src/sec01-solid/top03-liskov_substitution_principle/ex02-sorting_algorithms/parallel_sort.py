@@ -0,0 +1,145 @@
+import os
+from importlib import import_module
+from multiprocessing import Pool
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, List
+
+import numpy as np
+
+lsp = import_module("prg04-lsp_adherence")
+
+# state of a worker process, set once by _init_worker rather than sent along with every
+# task
+_worker: dict[str, Any] = {}
+
+
+def _init_worker(source: str, target: str, count: int) -> None:
+    for name, shm_name in (("source", source), ("target", target)):
+        shm = SharedMemory(name=shm_name)
+        _worker[name + "_shm"] = shm
+        _worker[name] = np.ndarray(count, dtype=np.int64, buffer=shm.buf)
+
+
+def _sort_block(task: tuple[int, int, np.ndarray]) -> np.ndarray:
+    """Sorts one block of the source in place and returns where the splitters cut it"""
+    start, end, splitters = task
+    block = _worker["source"][start:end]
+    block.sort()
+    return np.searchsorted(block, splitters, side="right")
+
+
+def _sort_bucket(task: tuple[int, list[tuple[int, int]]]) -> None:
+    """
+    Gathers the sorted pieces of one bucket from all blocks into the target and sorts it
+    in place
+    """
+    offset, pieces = task
+    source, target = _worker["source"], _worker["target"]
+    position = offset
+    for start, end in pieces:
+        target[position : position + end - start] = source[start:end]
+        position += end - start
+    # the bucket consists of sorted runs, which a stable sort merges rather than sorting
+    # from scratch
+    target[offset:position].sort(kind="stable")
+
+
+class ParallelSampleSort(lsp.SortingAlgorithm):
+    """
+    Parallel sample sort algorithm for 64-bit integers. The numbers are copied into
+    shared memory once, workers sort blocks of it in place, splitters picked from a
+    random sample cut every block into one piece per bucket, and each worker gathers and
+    merges one bucket. Only block bounds and splitters travel between processes.
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        oversampling: int = 64,
+        min_parallel: int = 1 << 16,
+    ):
+        """
+        :param workers: the number of worker processes, one per CPU by default
+        :param oversampling: the number of samples drawn per bucket to pick the
+            splitters from
+        :param min_parallel: the input length below which numbers are sorted in this
+            process
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.oversampling = oversampling
+        self.min_parallel = min_parallel
+
+    def sort(self, nums: List[int]) -> List[int]:
+        count = len(nums)
+        if count < max(self.min_parallel, 2):
+            nums.sort()
+            return nums
+
+        source_shm = SharedMemory(create=True, size=count * 8)
+        target_shm = SharedMemory(create=True, size=count * 8)
+        try:
+            source = np.ndarray(count, dtype=np.int64, buffer=source_shm.buf)
+            target = np.ndarray(count, dtype=np.int64, buffer=target_shm.buf)
+            source[:] = nums
+            self._sort_shared(source_shm.name, target_shm.name, source)
+            nums[:] = target.tolist() if isinstance(nums, list) else target
+            # the views have to go before the shared memory can be closed
+            del source, target
+        finally:
+            for shm in (source_shm, target_shm):
+                shm.close()
+                shm.unlink()
+        return nums
+
+    def _splitters(self, source: np.ndarray) -> np.ndarray:
+        """
+        Picks one splitter less than there are buckets, evenly spaced over a sorted
+        random sample
+        """
+        size = self.workers * self.oversampling
+        sample = np.sort(source[np.random.default_rng().integers(0, len(source), size)])
+        return sample[self.oversampling :: self.oversampling][: self.workers - 1]
+
+    def _sort_shared(self, source_name: str, target_name: str, source: np.ndarray):
+        count = len(source)
+        splitters = self._splitters(source)
+        bounds = np.linspace(0, count, self.workers + 1, dtype=np.int64)
+        blocks = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+        with Pool(
+            self.workers,
+            initializer=_init_worker,
+            initargs=(source_name, target_name, count),
+        ) as pool:
+            cuts = pool.map(
+                _sort_block, [(start, end, splitters) for start, end in blocks]
+            )
+
+            # the pieces of bucket j are the ranges between the (j-1)-th and j-th cut of
+            # every block
+            pieces: list[list[tuple[int, int]]] = [[] for _ in range(self.workers)]
+            for (start, end), block_cuts in zip(blocks, cuts):
+                edges = [start, *(start + block_cuts).tolist(), end]
+                for bucket in range(self.workers):
+                    pieces[bucket].append((edges[bucket], edges[bucket + 1]))
+
+            tasks = []
+            offset = 0
+            for bucket_pieces in pieces:
+                tasks.append((offset, bucket_pieces))
+                offset += sum(end - start for start, end in bucket_pieces)
+            pool.map(_sort_bucket, tasks)
+
+
+def driver():
+    import random
+
+    numbers = [random.randrange(-1000, 1000) for _ in range(100_000)]
+    expected = sorted(numbers)
+    sorted_numbers = lsp.sort_numbers(ParallelSampleSort(workers=4), numbers)
+    print("Sorted using Parallel Sample Sort:", sorted_numbers[:8], "...")
+    print("Identical to sorted():", sorted_numbers == expected)
+
+
+if __name__ == "__main__":
+    driver()
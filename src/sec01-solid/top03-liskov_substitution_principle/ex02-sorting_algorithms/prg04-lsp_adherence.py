@@ -1,5 +1,91 @@
+import heapq
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterable, List
+
+
+def _median_of_three(nums: List[int], low: int, high: int) -> int:
+    a, b, c = nums[low], nums[(low + high) // 2], nums[high - 1]
+    if a < b:
+        return b if b < c else (c if a < c else a)
+    return a if a < c else (c if b < c else b)
+
+
+def _median_of_medians(nums: List[int], low: int, high: int) -> int:
+    """
+    A pivot guaranteed to discard a constant share of nums[low:high] on every partition
+    """
+    medians = [
+        sorted(nums[i : min(i + 5, high)])[(min(i + 5, high) - i) // 2]
+        for i in range(low, high, 5)
+    ]
+    middle = len(medians) // 2
+    _select(medians, middle, 0, len(medians))
+    return medians[middle]
+
+
+def _select(nums: List[int], k: int, low: int, high: int) -> None:
+    """
+    Introselect: quickselect with median-of-three pivots, switching to median-of-medians
+    pivots once it has partitioned more often than a balanced run would, which keeps it
+    O(n) in the worst case.
+    """
+    depth = 2 * (high - low).bit_length()
+    while high - low > 16:
+        if depth:
+            depth -= 1
+            pivot = _median_of_three(nums, low, high)
+        else:
+            pivot = _median_of_medians(nums, low, high)
+        # three-way partitioning, so runs of duplicates of the pivot are settled at once
+        lt, i, gt = low, low, high
+        while i < gt:
+            item = nums[i]
+            if item < pivot:
+                nums[lt], nums[i] = item, nums[lt]
+                lt += 1
+                i += 1
+            elif item > pivot:
+                gt -= 1
+                nums[i], nums[gt] = nums[gt], item
+            else:
+                i += 1
+        if k < lt:
+            high = lt
+        elif k >= gt:
+            low = gt
+        else:
+            return
+    nums[low:high] = sorted(nums[low:high])
+
+
+def _hoare_partition(nums: List[int], low: int, high: int) -> int:
+    """
+    Hoare partitions nums[low:high + 1] around the median of its first, middle and last
+    number, and returns the last index of the lower part, with both parts non-empty.
+    """
+    # the median of the first, middle and last number makes a poor pivot unlikely on
+    # presorted input, ordering the three also leaves sentinels at both ends
+    mid = (low + high) // 2
+    if nums[mid] < nums[low]:
+        nums[mid], nums[low] = nums[low], nums[mid]
+    if nums[high] < nums[low]:
+        nums[high], nums[low] = nums[low], nums[high]
+    if nums[high] < nums[mid]:
+        nums[high], nums[mid] = nums[mid], nums[high]
+    pivot = nums[mid]
+    # numbers equal to the pivot stop both scans, so runs of duplicates are split evenly
+    # instead of all landing on one side
+    i, j = low - 1, high + 1
+    while True:
+        i += 1
+        while nums[i] < pivot:
+            i += 1
+        j -= 1
+        while nums[j] > pivot:
+            j -= 1
+        if i >= j:
+            return j
+        nums[i], nums[j] = nums[j], nums[i]
 
 
 class SortingAlgorithm(ABC):
@@ -10,6 +96,25 @@ class SortingAlgorithm(ABC):
         """Sorts the List"""
         raise NotImplementedError
 
+    def top_k(self, nums: Iterable[int], k: int) -> List[int]:
+        """
+        Returns the k smallest numbers in ascending order, the same as sorted(nums)[:k],
+        in O(n log k). The numbers may also be any iterable, which is consumed keeping
+        no more than k of them in a heap.
+        """
+        return heapq.nsmallest(k, nums)
+
+    def nth_element(self, nums: List[int], k: int) -> List[int]:
+        """
+        Partially sorts the List in place in O(n): nums[k] ends up holding the number
+        sorting would put there, with no larger number before it and no smaller one
+        after it.
+        """
+        if not 0 <= k < len(nums):
+            raise IndexError("nth_element index out of range")
+        _select(nums, k, 0, len(nums))
+        return nums
+
 
 class BubbleSort(SortingAlgorithm):
     """Bubble sort algorithm"""
@@ -17,9 +122,15 @@ class BubbleSort(SortingAlgorithm):
     def sort(self, nums: List[int]) -> List[int]:
         # Bubble sort logic
         for i in range(len(nums)):
-            for j in range(len(nums) - 1):
+            swapped = False
+            # the last i numbers are already in place
+            for j in range(len(nums) - 1 - i):
                 if nums[j] > nums[j + 1]:
                     nums[j], nums[j + 1] = nums[j + 1], nums[j]
+                    swapped = True
+            # a pass without swaps means the list is sorted
+            if not swapped:
+                break
         return nums
 
 
@@ -27,20 +138,18 @@ class QuickSort(SortingAlgorithm):
     """Quick sort algorithm"""
 
     def _partition(self, nums: List[int], low: int, high: int) -> int:
-        pivot = nums[high]
-        i = low - 1
-        for j in range(low, high):
-            if nums[j] <= pivot:
-                i += 1
-                nums[i], nums[j] = nums[j], nums[i]
-        nums[i + 1], nums[high] = nums[high], nums[i + 1]
-        return i + 1
+        return _hoare_partition(nums, low, high)
 
     def _quicksort(self, nums: List[int], low: int, high: int) -> List[int]:
-        if low < high:
+        while low < high:
             pi = self._partition(nums, low, high)
-            self._quicksort(nums, low, pi - 1)
-            self._quicksort(nums, pi + 1, high)
+            # recursing into the smaller part only keeps the recursion depth logarithmic
+            if pi - low < high - pi:
+                self._quicksort(nums, low, pi)
+                low = pi + 1
+            else:
+                self._quicksort(nums, pi + 1, high)
+                high = pi
         return nums
 
     def sort(self, nums: List[int]) -> List[int]:
@@ -65,6 +174,10 @@ def driver():
     sorted_numbers = sort_numbers(QuickSort(), numbers.copy())
     print("Sorted using Quick Sort:", sorted_numbers)
 
+    # Select without sorting everything
+    print("Three smallest:", QuickSort().top_k(numbers, 3))
+    print("Median:", QuickSort().nth_element(numbers.copy(), 4)[4])
+
 
 if __name__ == "__main__":
     driver()
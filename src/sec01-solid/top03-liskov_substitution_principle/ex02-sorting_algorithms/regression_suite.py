@@ -0,0 +1,288 @@
+import argparse
+import inspect
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from importlib import import_module
+from typing import Any, Callable, Iterator
+
+lsp = import_module("prg04-lsp_adherence")
+
+# modules whose SortingAlgorithm subclasses are part of the suite
+MODULES = (
+    "prg04-lsp_adherence",
+    "hybrid_sort",
+    "external_sort",
+    "parallel_sort",
+    "integer_sort",
+)
+
+SIZES = (1_000, 10_000, 100_000)
+
+
+def _random(size: int, rng: random.Random) -> list[int]:
+    return [rng.randrange(size) for _ in range(size)]
+
+
+def _sorted(size: int, rng: random.Random) -> list[int]:
+    return sorted(_random(size, rng))
+
+
+def _reversed(size: int, rng: random.Random) -> list[int]:
+    return sorted(_random(size, rng), reverse=True)
+
+
+def _few_unique(size: int, rng: random.Random) -> list[int]:
+    return [rng.randrange(16) for _ in range(size)]
+
+
+def _organ_pipe(size: int, rng: random.Random) -> list[int]:
+    half = size // 2
+    return list(range(half)) + list(range(size - half - 1, -1, -1))
+
+
+DISTRIBUTIONS: dict[str, Callable[[int, random.Random], list[int]]] = {
+    "random": _random,
+    "sorted": _sorted,
+    "reversed": _reversed,
+    "few-unique": _few_unique,
+    "organ-pipe": _organ_pipe,
+}
+
+
+class _CountingInt(int):
+    """
+    An int counting how often it is compared, integer kernels which bypass comparisons
+    count none
+    """
+
+    comparisons = 0
+
+    def __lt__(self, other):
+        _CountingInt.comparisons += 1
+        return int.__lt__(self, other)
+
+    def __le__(self, other):
+        _CountingInt.comparisons += 1
+        return int.__le__(self, other)
+
+    def __gt__(self, other):
+        _CountingInt.comparisons += 1
+        return int.__gt__(self, other)
+
+    def __ge__(self, other):
+        _CountingInt.comparisons += 1
+        return int.__ge__(self, other)
+
+
+def discover_algorithms() -> dict[str, type]:
+    """Finds every concrete SortingAlgorithm subclass in the suite modules"""
+    for module in MODULES:
+        import_module(module)
+    found: dict[str, type] = {}
+    pending = list(lsp.SortingAlgorithm.__subclasses__())
+    while pending:
+        cls = pending.pop()
+        pending.extend(cls.__subclasses__())
+        if not inspect.isabstract(cls):
+            found[cls.__name__] = cls
+    return dict(sorted(found.items()))
+
+
+def _measure(algorithm: Any, nums: list[int], repeat: int) -> dict[str, Any]:
+    """
+    Sorts copies of the numbers, first for the best wall time, then counting
+    comparisons, then tracing memory
+    """
+    expected = sorted(nums)
+    seconds = float("inf")
+    for _ in range(repeat):
+        copy = nums.copy()
+        start = time.perf_counter()
+        result = algorithm.sort(copy)
+        seconds = min(seconds, time.perf_counter() - start)
+        if result != expected:
+            raise AssertionError(f"{type(algorithm).__name__} sorted incorrectly")
+
+    counted = [_CountingInt(n) for n in nums]
+    _CountingInt.comparisons = 0
+    algorithm.sort(counted)
+    comparisons = _CountingInt.comparisons
+
+    copy = nums.copy()
+    tracemalloc.start()
+    algorithm.sort(copy)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": seconds, "comparisons": comparisons, "peak_bytes": peak}
+
+
+def run_suite(
+    sizes: tuple[int, ...] = SIZES,
+    distributions: tuple[str, ...] = tuple(DISTRIBUTIONS),
+    repeat: int = 3,
+    time_limit: float = 5.0,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """
+    Runs every discovered algorithm on every size and distribution and returns the
+    results.
+
+    Sizes are run in ascending order, a size is skipped for an algorithm and
+    distribution when the previous one, extrapolated quadratically, would take longer
+    than the time limit, so O(n²) cases do not stall the suite.
+
+    :param sizes: the input sizes
+    :param distributions: the names of the input distributions
+    :param repeat: the number of timed runs, of which the fastest is recorded
+    :param time_limit: the longest a single sort is expected to take in seconds
+    :param seed: the seed of the inputs, so runs are comparable
+    """
+    results = []
+    for name, cls in discover_algorithms().items():
+        for distribution in distributions:
+            previous = None
+            for size in sorted(sizes):
+                entry = {"algorithm": name, "distribution": distribution, "size": size}
+                results.append(entry)
+                if previous and previous[1] * (size / previous[0]) ** 2 > time_limit:
+                    entry["skipped"] = "over the time limit"
+                    continue
+                nums = DISTRIBUTIONS[distribution](size, random.Random(seed))
+                entry.update(_measure(cls(), nums, repeat))
+                previous = size, entry["seconds"]
+                print(
+                    f"{name:18s} {distribution:10s} {size:8d} "
+                    f"{entry['seconds'] * 1000:10.1f} ms {entry['comparisons']:12d} cmp "
+                    f"{entry['peak_bytes'] / 2**20:8.1f} MiB",
+                    file=sys.stderr,
+                )
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "repeat": repeat,
+        "seed": seed,
+        "results": results,
+    }
+
+
+def _keyed(report: dict[str, Any]) -> dict[tuple, dict[str, Any]]:
+    return {
+        (r["algorithm"], r["distribution"], r["size"]): r
+        for r in report["results"]
+        if "skipped" not in r
+    }
+
+
+def compare(
+    report: dict[str, Any],
+    baseline: dict[str, Any],
+    threshold: float = 0.25,
+    min_seconds: float = 0.01,
+    time_threshold: float = 1.0,
+    min_repeat: int = 3,
+) -> Iterator[str]:
+    """
+    Yields a description of every measurement that got worse than its baseline by more
+    than the threshold.
+
+    Comparisons and peak memory are deterministic and held to `threshold`. Wall times
+    vary from run to run, so they are held to the looser `time_threshold`, and only
+    compared when both runs kept the fastest of at least `min_repeat` timed runs.
+
+    :param report: the results of the current run
+    :param baseline: the results of a stored run
+    :param threshold: the tolerated relative increase of comparisons and peak memory,
+        e.g. 0.25 for 25%
+    :param min_seconds: the wall time below which timings are too noisy to compare
+    :param time_threshold: the tolerated relative increase of wall time
+    :param min_repeat: the number of timed runs below which timings are not compared
+    """
+    timed = min(report.get("repeat", 1), baseline.get("repeat", 1)) >= min_repeat
+    current = _keyed(report)
+    for key, before in _keyed(baseline).items():
+        after = current.get(key)
+        if after is None:
+            continue
+        for metric in ("seconds", "comparisons", "peak_bytes"):
+            tolerated = threshold
+            if metric == "seconds":
+                if not timed or before[metric] < min_seconds:
+                    continue
+                tolerated = time_threshold
+            if after[metric] > before[metric] * (1 + tolerated) and after[metric] > 0:
+                yield (
+                    f"{' '.join(map(str, key))}: {metric} {before[metric]:.6g} -> {after[metric]:.6g} "
+                    f"(+{(after[metric] / max(before[metric], 1e-12) - 1) * 100:.0f}%)"
+                )
+
+
+def driver():
+    parser = argparse.ArgumentParser(
+        description="Benchmark every SortingAlgorithm and compare against a baseline"
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument(
+        "--distributions",
+        nargs="+",
+        choices=list(DISTRIBUTIONS),
+        default=list(DISTRIBUTIONS),
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--time-limit", type=float, default=5.0)
+    parser.add_argument("--output", default="sort_results.json")
+    parser.add_argument("--baseline", help="results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument(
+        "--min-seconds",
+        type=float,
+        default=0.01,
+        help="timings below this are too noisy to compare",
+    )
+    parser.add_argument(
+        "--time-threshold",
+        type=float,
+        default=1.0,
+        help="the tolerated relative increase of wall time",
+    )
+    parser.add_argument(
+        "--min-repeat",
+        type=int,
+        default=3,
+        help="timings of runs with fewer repeats are not compared",
+    )
+    args = parser.parse_args()
+
+    report = run_suite(
+        tuple(args.sizes), tuple(args.distributions), args.repeat, args.time_limit
+    )
+    with open(args.output, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Wrote {len(report['results'])} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        regressions = list(
+            compare(
+                report,
+                baseline,
+                args.threshold,
+                args.min_seconds,
+                args.time_threshold,
+                args.min_repeat,
+            )
+        )
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions past {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    driver()
@@ -0,0 +1,66 @@
+import heapq
+from importlib import import_module
+from typing import Iterable, List
+
+lsp = import_module("prg04-lsp_adherence")
+
+
+class StreamingTopK:
+    """
+    Keeps the k smallest numbers seen so far in a bounded heap, for streams that are
+    consumed bit by bit or never end. Every number costs O(log k) and memory stays O(k)
+    however long the stream gets.
+    """
+
+    def __init__(self, k: int):
+        """
+        :param k: the number of smallest numbers to keep
+        """
+        self.k = k
+        self.seen = 0
+        # a max-heap of the kept numbers, by storing them negated, so the largest one is
+        # evicted first
+        self._heap: list[int] = []
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, value: int) -> None:
+        """Offers a number, which is kept if it is among the k smallest so far"""
+        self.seen += 1
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, -value)
+        elif self._heap and value < -self._heap[0]:
+            heapq.heapreplace(self._heap, -value)
+
+    def extend(self, values: Iterable[int]) -> None:
+        """Offers every number of an iterable"""
+        for value in values:
+            self.push(value)
+
+    @property
+    def threshold(self) -> int | None:
+        """
+        The largest kept number, which a new number has to be below to be kept, None
+        until k numbers were seen
+        """
+        return -self._heap[0] if self._heap and len(self._heap) == self.k else None
+
+    def result(self) -> List[int]:
+        """Returns the k smallest numbers so far in ascending order"""
+        return sorted(-value for value in self._heap)
+
+
+def driver():
+    top = StreamingTopK(k=3)
+    for batch in ([5, 3, 8], [1, 2], [7, 4, 6]):
+        top.extend(batch)
+        print(f"Three smallest of {top.seen} numbers so far: {top.result()}")
+    print(
+        "Same as SortingAlgorithm.top_k:",
+        top.result() == lsp.QuickSort().top_k([5, 3, 8, 1, 2, 7, 4, 6], 3),
+    )
+
+
+if __name__ == "__main__":
+    driver()
@@ -0,0 +1,66 @@
+import time
+from importlib import import_module
+
+from command_plan import operate_many
+
+isp = import_module("prg04-isp_adherence")
+
+
+class QuietTV(isp.ChannelChangeable, isp.VolumeControllable):
+    """A TV which records its state instead of printing it"""
+
+    def __init__(self):
+        self.on = False
+        self.channel = 0
+        self.volume = 0
+
+    def turn_on(self):
+        self.on = True
+
+    def turn_off(self):
+        self.on = False
+
+    def change_channel(self, channel: int):
+        self.channel = channel
+
+    def adjust_volume(self, volume: int):
+        self.volume = volume
+
+
+def benchmark_operate(devices: int = 10_000, commands: int = 50) -> None:
+    """
+    Compares replaying a command sequence through RemoteControl.operate with
+    `operate_many`.
+
+    :param devices: the number of devices
+    :param commands: the number of commands in the sequence
+    """
+    sequence = [
+        (
+            isp.MethodCommand("change_channel", channel=i)
+            if i % 2
+            else isp.MethodCommand("adjust_volume", i)
+        )
+        for i in range(commands)
+    ]
+    tvs = [QuietTV() for _ in range(devices)]
+
+    start = time.perf_counter()
+    for tv in tvs:
+        isp.RemoteControl(tv).operate(sequence)
+    one_by_one = time.perf_counter() - start
+
+    start = time.perf_counter()
+    operate_many(tvs, sequence)
+    planned = time.perf_counter() - start
+
+    print(f"Replaying {commands} commands on {devices} devices")
+    print(f" - RemoteControl.operate: {one_by_one * 1000:8.1f} ms")
+    print(
+        f" - operate_many:          {planned * 1000:8.1f} ms, "
+        f"{one_by_one / planned:.1f}x faster"
+    )
+
+
+if __name__ == "__main__":
+    benchmark_operate()
@@ -0,0 +1,150 @@
+import inspect
+import keyword
+from importlib import import_module
+from typing import Any, Iterable, Sequence
+
+isp = import_module("prg04-isp_adherence")
+
+
+def _constant(namespace: dict[str, Any], value: Any) -> str:
+    """
+    Adds an object to the namespace of the generated code and returns the name it is
+    referenced by
+    """
+    name = f"c{len(namespace)}"
+    namespace[name] = value
+    return name
+
+
+def _arguments(args: tuple, kwargs: dict, namespace: dict[str, Any]) -> list[str]:
+    arguments = [_constant(namespace, a) for a in args]
+    # keywords such as `class` are identifiers too, but cannot be written as keyword
+    # arguments
+    if all(key.isidentifier() and not keyword.iskeyword(key) for key in kwargs):
+        arguments.extend(
+            f"{key}={_constant(namespace, v)}" for key, v in kwargs.items()
+        )
+    else:
+        arguments.append(f"**{_constant(namespace, kwargs)}")
+    return arguments
+
+
+def _method_call(device_type: type, command: Any, namespace: dict[str, Any]) -> str:
+    """
+    Resolves and validates the method of a MethodCommand and returns the code calling it
+    """
+    if not callable(getattr(device_type, command.method, None)):
+        raise AttributeError(f"{device_type.__name__} has no method {command.method!r}")
+    function = inspect.getattr_static(device_type, command.method)
+    try:
+        inspect.signature(getattr(device_type, command.method)).bind(
+            *((None,) if inspect.isfunction(function) else ()),
+            *command.args,
+            **command.kwargs,
+        )
+    except TypeError as e:
+        raise TypeError(
+            f"invalid arguments for {device_type.__name__}.{command.method}: {e}"
+        ) from e
+
+    arguments = _arguments(command.args, command.kwargs, namespace)
+    if inspect.isfunction(function):
+        # a plain function is called directly, which skips the attribute lookup and the
+        # bound method
+        return f"{_constant(namespace, function)}({', '.join(['device', *arguments])})"
+    return f"device.{command.method}({', '.join(arguments)})"
+
+
+class CommandPlan(isp.Command):
+    """
+    A sequence of commands compiled for one device type: method names are resolved and
+    their arguments checked once, and the whole sequence runs as a single generated
+    function. As a Command itself, a plan can be handed to RemoteControl.operate like
+    any other command.
+    """
+
+    def __init__(self, device_type: type, commands: Sequence[Any]):
+        self.device_type = device_type
+        self.commands = list(commands)
+        namespace: dict[str, Any] = {}
+        lines = []
+        for command in self.commands:
+            if isinstance(command, isp.MethodCommand):
+                lines.append(_method_call(device_type, command, namespace))
+            else:
+                # other commands are still executed, just not resolved in advance
+                lines.append(f"{_constant(namespace, command)}.execute(device)")
+        self.source = "def plan(device):\n" + "".join(
+            f"    {line}\n" for line in lines or ["pass"]
+        )
+        exec(compile(self.source, "<command plan>", "exec"), namespace)
+        self._plan = namespace["plan"]
+
+    def execute(self, on: Any):
+        """
+        Runs the compiled plan on a device of the type it was compiled for. The plan
+        calls the functions of that type directly, so any other device, subclasses
+        included as they may override them, has the commands executed one by one
+        instead.
+        """
+        if type(on) is self.device_type:
+            self._plan(on)
+        else:
+            for command in self.commands:
+                command.execute(on)
+
+
+def compile_commands(device_type: type, commands: Sequence[Any]) -> CommandPlan:
+    """
+    Compiles a list of commands for a device type, raising AttributeError for unknown
+    methods and TypeError for arguments they do not accept before any device is touched.
+
+    :param device_type: the class of the devices the plan runs on
+    :param commands: the commands to compile
+    """
+    return CommandPlan(device_type, commands)
+
+
+def operate_many(devices: Iterable[Any], commands: Sequence[Any]) -> int:
+    """
+    Executes a list of commands on many devices, compiling it once per device type, and
+    returns the number of devices operated.
+
+    :param devices: the devices to operate
+    :param commands: the commands executed on every device
+    """
+    plans: dict[type, CommandPlan] = {}
+    count = 0
+    for device in devices:
+        device_type = type(device)
+        plan = plans.get(device_type)
+        if plan is None:
+            plan = plans[device_type] = compile_commands(device_type, commands)
+        # the plan was compiled for exactly this type, so the check in execute is
+        # skipped
+        plan._plan(device)
+        count += 1
+    return count
+
+
+def driver():
+    tv_commands = [
+        isp.MethodCommand(method="change_channel", **{"channel": 5}),
+        isp.MethodCommand(method="adjust_volume", **{"volume": 20}),
+    ]
+    plan = compile_commands(isp.TV, tv_commands)
+    print(plan.source)
+
+    with isp.RemoteControl(isp.TV()) as tv_remote:
+        tv_remote.operate([plan])
+
+    print(f"Operated {operate_many([isp.TV(), isp.TV()], tv_commands)} TVs")
+
+    try:
+        compile_commands(isp.Stereo, tv_commands)
+    except AttributeError as e:
+        print(f"Rejected before running: {e}")
+
+
+if __name__ == "__main__":
+    driver()
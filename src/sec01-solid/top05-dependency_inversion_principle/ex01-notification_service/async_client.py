@@ -0,0 +1,276 @@
+import asyncio
+import inspect
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from typing import Any
+
+dip = import_module("prg02-dip_adherence")
+
+
+class _Notification:
+    __slots__ = ("service", "recipient", "message", "enqueued", "attempts")
+
+    def __init__(self, service: Any, recipient: Any, message: str):
+        self.service = service
+        self.recipient = recipient
+        self.message = message
+        self.enqueued = time.perf_counter()
+        self.attempts = 0
+
+
+class NotificationMetrics:
+    """Counters and latencies of an AsyncNotificationClient"""
+
+    def __init__(self, samples: int = 10_000):
+        """
+        :param samples: the number of most recent latencies kept for percentiles
+        """
+        self.enqueued = 0
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.batches = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.throttled = 0
+        self.latencies: deque[float] = deque(maxlen=samples)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.sent} sent in {self.batches} batches, {self.failed} failed, {self.retries} retries, "
+            f"queue depth {self.queue_depth} (max {self.max_queue_depth}, throttled {self.throttled} times), "
+            f"latency p50 {self.latency(0.5) * 1000:.1f} ms, p99 {self.latency(0.99) * 1000:.1f} ms"
+        )
+
+    def latency(self, percentile: float) -> float:
+        """
+        The latency from enqueueing to sending at a percentile, e.g. 0.99, over the
+        recent notifications
+        """
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        return ordered[min(int(percentile * len(ordered)), len(ordered) - 1)]
+
+
+class AsyncNotificationClient:
+    """
+    Notification client which queues notifications and sends them from worker tasks.
+
+    Workers take up to `batch_size` queued notifications at a time, group them per
+    NotificationService and hand every group to `send_notifications` in one call. Failed
+    notifications are queued again after an exponential backoff, which they wait out
+    apart from the workers, and given up after `max_retries`. The queue is bounded, so a
+    producer sending faster than the services accept waits in `send_notification`
+    instead of growing memory without limit.
+    """
+
+    def __init__(
+        self,
+        max_queue: int = 1_000,
+        workers: int = 4,
+        batch_size: int = 50,
+        max_retries: int = 3,
+        backoff: float = 0.1,
+        max_backoff: float = 5.0,
+    ):
+        """
+        :param max_queue: the maximum number of queued notifications
+        :param workers: the number of worker tasks, and of threads for blocking services
+        :param batch_size: the maximum number of notifications taken by a worker at once
+        :param max_retries: the number of retries before a notification is given up
+        :param backoff: the delay before the first retry in seconds, doubled for every
+            further one
+        :param max_backoff: the longest delay before a retry in seconds
+        """
+        if max_queue < 1 or workers < 1 or batch_size < 1:
+            raise ValueError("max_queue, workers and batch_size must be at least 1")
+        self.max_queue = max_queue
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.metrics = NotificationMetrics()
+        # the notifications given up on, with the last exception, most recent last
+        self.failures: deque[tuple[Any, Any, str, Exception]] = deque(maxlen=1_000)
+        self._queue: asyncio.Queue[_Notification] | None = None
+        self._tasks: list[asyncio.Task] = []
+        # notifications waiting out their backoff before they are queued again
+        self._retrying: set[asyncio.Task] = set()
+        self._executor: ThreadPoolExecutor | None = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args, **kwargs):
+        await self.close()
+
+    async def start(self) -> None:
+        """Starts the worker tasks"""
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def close(self) -> None:
+        """
+        Waits until every queued notification was sent or given up on, then stops the
+        workers
+        """
+        if self._queue is None:
+            return
+        while True:
+            await self._queue.join()
+            if not self._retrying:
+                break
+            # a retry queued again after the queue drained has to be sent as well
+            await asyncio.gather(*self._retrying)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._executor.shutdown()
+        self._queue = None
+
+    async def send_notification(
+        self, service: Any, recipient: Any, message: str
+    ) -> None:
+        """
+        Queues a notification, waiting while the queue is full.
+
+        :param service: the NotificationService to send the notification with
+        :param recipient: the recipient of the notification
+        :param message: the message to send
+        """
+        if self._queue is None:
+            raise RuntimeError("the client has not been started")
+        notification = _Notification(service, recipient, message)
+        if self._queue.full():
+            self.metrics.throttled += 1
+        await self._queue.put(notification)
+        self.metrics.enqueued += 1
+        self._record_depth()
+
+    def _record_depth(self) -> None:
+        depth = self._queue.qsize()
+        self.metrics.queue_depth = depth
+        self.metrics.max_queue_depth = max(self.metrics.max_queue_depth, depth)
+
+    async def _work(self) -> None:
+        queue = self._queue
+        while True:
+            taken = [await queue.get()]
+            # whatever else is already waiting joins the batch, without waiting for more
+            while len(taken) < self.batch_size and not queue.empty():
+                taken.append(queue.get_nowait())
+            self._record_depth()
+
+            groups: dict[int, list[_Notification]] = {}
+            for notification in taken:
+                groups.setdefault(id(notification.service), []).append(notification)
+            try:
+                # a group failing unexpectedly must not take the worker down with it
+                await asyncio.gather(
+                    *(self._deliver(group) for group in groups.values()),
+                    return_exceptions=True,
+                )
+            finally:
+                for _ in taken:
+                    queue.task_done()
+
+    async def _deliver(self, group: list[_Notification]) -> None:
+        """
+        Sends the notifications of one service, scheduling the failed ones to be queued
+        again after a backoff
+        """
+        service = group[0].service
+        self.metrics.batches += 1
+        try:
+            failures = await self._send(
+                service, [(n.recipient, n.message) for n in group]
+            )
+        except Exception as e:
+            failures = {position: e for position in range(len(group))}
+        if not isinstance(failures, dict):
+            error = TypeError(
+                f"send_notifications returned {type(failures).__name__}, not a dict"
+            )
+            failures = {position: error for position in range(len(group))}
+
+        now = time.perf_counter()
+        for position, notification in enumerate(group):
+            error = failures.get(position)
+            if error is None:
+                self.metrics.sent += 1
+                self.metrics.latencies.append(now - notification.enqueued)
+            elif notification.attempts < self.max_retries:
+                notification.attempts += 1
+                self.metrics.retries += 1
+                self._schedule_retry(notification)
+            else:
+                self.metrics.failed += 1
+                self.failures.append(
+                    (service, notification.recipient, notification.message, error)
+                )
+
+    def _schedule_retry(self, notification: _Notification) -> None:
+        """
+        Queues a notification again once its backoff has passed. The wait runs in its
+        own task rather than in the worker, so a failing service never keeps the workers
+        from notifications for healthy ones.
+        """
+        delay = min(self.backoff * 2 ** (notification.attempts - 1), self.max_backoff)
+
+        async def requeue():
+            await asyncio.sleep(delay)
+            await self._queue.put(notification)
+            self._record_depth()
+
+        task = asyncio.create_task(requeue())
+        self._retrying.add(task)
+        task.add_done_callback(self._retrying.discard)
+
+    async def _send(
+        self, service: Any, notifications: list[tuple[Any, str]]
+    ) -> dict[int, Exception]:
+        """
+        Awaits asynchronous services directly and runs blocking ones on the thread pool
+        """
+        if inspect.iscoroutinefunction(service.send_notifications):
+            return await service.send_notifications(notifications)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, service.send_notifications, notifications
+        )
+
+
+def driver():
+    class FlakySMSService(dip.SMSService):
+        """Fails every first attempt of a notification"""
+
+        def __init__(self):
+            self.seen = set()
+
+        def send_notification(self, recipient: str, message: str):
+            if recipient not in self.seen:
+                self.seen.add(recipient)
+                raise ConnectionError("gateway timeout")
+            super().send_notification(recipient, message)
+
+    async def notify():
+        email, sms = dip.EmailService(), FlakySMSService()
+        async with AsyncNotificationClient(
+            max_queue=4, workers=2, backoff=0.01
+        ) as client:
+            for i in range(3):
+                await client.send_notification(email, f"user{i}@example.com", "Hello!")
+                await client.send_notification(sms, f"12345678{i}", "Hello!")
+        print(client.metrics)
+
+    asyncio.run(notify())
+
+
+if __name__ == "__main__":
+    driver()
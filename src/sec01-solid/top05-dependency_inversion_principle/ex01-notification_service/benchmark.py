@@ -0,0 +1,128 @@
+import asyncio
+import contextlib
+import io
+import random
+import time
+from importlib import import_module
+
+from async_client import AsyncNotificationClient
+from notification_router import Channel, NotificationRouter
+
+dip = import_module("prg02-dip_adherence")
+
+
+class StandInService(dip.NotificationService):
+    """
+    A service with a fixed round-trip per call, bulk calls included, which fails a share
+    of notifications
+    """
+
+    def __init__(self, round_trip: float = 0.002, failure_rate: float = 0.0):
+        self.round_trip = round_trip
+        self.failure_rate = failure_rate
+        self.delivered = 0
+
+    def send_notification(self, recipient, message):
+        time.sleep(self.round_trip)
+        if random.random() < self.failure_rate:
+            raise ConnectionError("gateway timeout")
+        self.delivered += 1
+
+    def send_notifications(self, notifications):
+        time.sleep(self.round_trip)
+        failures = {}
+        for position in range(len(notifications)):
+            if random.random() < self.failure_rate:
+                failures[position] = ConnectionError("gateway timeout")
+            else:
+                self.delivered += 1
+        return failures
+
+
+def benchmark_async(notifications: int = 2_000, max_queue: int = 200) -> None:
+    """
+    Compares sending notifications one by one through NotificationServiceClient with
+    AsyncNotificationClient, for a producer much faster than the services.
+
+    :param notifications: the number of notifications
+    :param max_queue: the queue bound of the async client
+    """
+    services = [StandInService(failure_rate=0.05) for _ in range(3)]
+
+    start = time.perf_counter()
+    # the synchronous client prints every failure
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(notifications):
+            client = dip.NotificationServiceClient(services[i % 3])
+            client.send_notification(f"user{i}", "Hello!")
+    synchronous = time.perf_counter() - start
+
+    async def produce() -> AsyncNotificationClient:
+        async with AsyncNotificationClient(
+            max_queue=max_queue, backoff=0.005
+        ) as client:
+            for i in range(notifications):
+                await client.send_notification(services[i % 3], f"user{i}", "Hello!")
+        return client
+
+    start = time.perf_counter()
+    client = asyncio.run(produce())
+    asynchronous = time.perf_counter() - start
+
+    print(f"Sending {notifications} notifications over 3 services, 5% failing")
+    print(
+        f" - NotificationServiceClient: {synchronous * 1000:8.1f} ms, "
+        f"{notifications / synchronous:7.0f}/s, failures only printed"
+    )
+    print(
+        f" - AsyncNotificationClient:   {asynchronous * 1000:8.1f} ms, "
+        f"{notifications / asynchronous:7.0f}/s"
+    )
+    print(f"   {client.metrics}")
+
+
+def benchmark_router(notifications: int = 1_000) -> None:
+    """
+    Load tests a NotificationRouter sending every notification over email, SMS and push,
+    with a slow SMS gateway, against calling the three services one after another.
+
+    :param notifications: the number of notifications, each sent over all three channels
+    """
+    round_trips = {"email": 0.002, "sms": 0.02, "push": 0.001}
+    workers = {"email": 8, "sms": 16, "push": 4}
+
+    services = {name: StandInService(rt) for name, rt in round_trips.items()}
+    start = time.perf_counter()
+    for i in range(notifications // 10):
+        for service in services.values():
+            service.send_notification(f"user{i}", "Hello!")
+    serial = (time.perf_counter() - start) * 10
+
+    channels = [
+        Channel(name, StandInService(round_trips[name]), workers[name])
+        for name in round_trips
+    ]
+    start = time.perf_counter()
+    with NotificationRouter(channels) as router:
+        for i in range(notifications):
+            router.route({name: f"user{i}" for name in round_trips}, "Hello!")
+    routed = time.perf_counter() - start
+
+    print(f"Sending {notifications} notifications over email, SMS and push")
+    print(
+        f" - serial service calls: {serial:6.2f} s "
+        f"(extrapolated from {notifications // 10} notifications)"
+    )
+    print(f" - NotificationRouter:   {routed:6.2f} s")
+    for channel in channels:
+        finished = channel.last_done - channel.first_submitted
+        print(
+            f"   {channel.name:5s} {round_trips[channel.name] * 1000:4.0f} ms "
+            f"round-trip, {channel.workers:2d} workers: {channel.throughput:6.0f}/s, "
+            f"done after {finished:5.2f} s"
+        )
+
+
+if __name__ == "__main__":
+    benchmark_async()
+    benchmark_router()
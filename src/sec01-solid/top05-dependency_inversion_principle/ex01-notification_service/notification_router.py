@@ -0,0 +1,174 @@
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from importlib import import_module
+from typing import Any, Mapping, Sequence
+
+dip = import_module("prg02-dip_adherence")
+
+
+class ChannelSaturated(Exception):
+    """
+    Raised for a notification refused because its channel has too many pending
+    notifications
+    """
+
+
+class Channel:
+    """
+    A NotificationService with its own pool of worker threads and its own bound on
+    pending notifications, so a slow channel only ever holds up its own notifications.
+    """
+
+    def __init__(
+        self, name: str, service: Any, workers: int = 4, max_pending: int = 10_000
+    ):
+        """
+        :param name: the name notifications are routed by, e.g. "email"
+        :param service: the NotificationService sending the notifications
+        :param workers: the number of threads sending notifications of this channel
+        :param max_pending: the number of queued or running notifications above which
+            new ones are refused
+        """
+        self.name = name
+        self.service = service
+        self.workers = workers
+        self.max_pending = max_pending
+        self.submitted = 0
+        self.sent = 0
+        self.failed = 0
+        self.rejected = 0
+        self.first_submitted: float | None = None
+        self.last_done: float | None = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix=f"channel-{name}"
+        )
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: {self.sent} sent, {self.failed} failed, {self.rejected} rejected, "
+            f"{self.throughput:.0f} notifications/s on {self.workers} workers"
+        )
+
+    @property
+    def throughput(self) -> float:
+        """
+        The number of notifications sent per second, from the first submission to the
+        last completion
+        """
+        if self.first_submitted is None or self.last_done is None:
+            return 0.0
+        elapsed = self.last_done - self.first_submitted
+        return self.sent / elapsed if elapsed > 0 else 0.0
+
+    def submit(self, recipient: Any, message: str) -> Future:
+        """
+        Queues a notification on the pool of the channel, or refuses it right away if
+        the channel is saturated
+        """
+        with self._lock:
+            if self.first_submitted is None:
+                self.first_submitted = time.perf_counter()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            future = Future()
+            future.set_exception(
+                ChannelSaturated(
+                    f"{self.max_pending} notifications pending on {self.name}"
+                )
+            )
+            return future
+        with self._lock:
+            self.submitted += 1
+        return self._executor.submit(self._send, recipient, message)
+
+    def _send(self, recipient: Any, message: str) -> None:
+        try:
+            self.service.send_notification(recipient, message)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        else:
+            with self._lock:
+                self.sent += 1
+        finally:
+            self.last_done = time.perf_counter()
+            self._slots.release()
+
+    def close(self) -> None:
+        """Waits for the pending notifications and stops the worker threads"""
+        self._executor.shutdown(wait=True)
+
+
+class NotificationRouter:
+    """
+    Dispatches a notification to all channels a recipient prefers at once, each channel
+    sending on its own pool.
+    """
+
+    def __init__(self, channels: Sequence[Channel]):
+        self.channels = {channel.name: channel for channel in channels}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+    def route(
+        self,
+        addresses: Mapping[str, Any],
+        message: str,
+        preferences: Sequence[str] | None = None,
+    ) -> dict[str, Future]:
+        """
+        Sends a message over every preferred channel the recipient has an address for,
+        without waiting for any of them, and returns a future per channel.
+
+        :param addresses: the address of the recipient per channel name, e.g. {"email":
+            "user@example.com"}
+        :param message: the message to send
+        :param preferences: the channel names to send over, all channels with an address
+            if None
+        """
+        names = preferences if preferences is not None else list(addresses)
+        # every name is checked before anything is submitted, so an unknown channel
+        # never leaves a partial dispatch
+        unknown = [name for name in names if name not in self.channels]
+        if unknown:
+            raise KeyError(f"unknown channels {', '.join(map(repr, unknown))}")
+        return {
+            name: self.channels[name].submit(addresses[name], message)
+            for name in names
+            if name in addresses
+        }
+
+    def close(self) -> None:
+        """Waits for all pending notifications and stops every channel"""
+        for channel in self.channels.values():
+            channel.close()
+
+
+def driver():
+    router = NotificationRouter(
+        [
+            Channel("email", dip.EmailService(), workers=4),
+            Channel("sms", dip.SMSService(), workers=2),
+            Channel("push", dip.PushNotificationService(), workers=2),
+        ]
+    )
+    with router:
+        addresses = {"email": "user@example.com", "sms": "123456789", "push": "user"}
+        router.route(addresses, "Hello over every channel!")
+        futures = router.route(addresses, "Hello over push and SMS!", ["push", "sms"])
+        wait(futures.values())
+    for channel in router.channels.values():
+        print(channel)
+
+
+if __name__ == "__main__":
+    driver()
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Sequence
 
 
 class NotificationService(ABC):
@@ -9,6 +9,22 @@ class NotificationService(ABC):
     def send_notification(self, recipient: Any, message: str):
         pass
 
+    def send_notifications(
+        self, notifications: Sequence[tuple[Any, str]]
+    ) -> dict[int, Exception]:
+        """
+        Sends a batch of (recipient, message) pairs and returns the positions of those
+        that failed, mapped to the raised exception. Services with a bulk API override
+        this to send the batch in one round-trip.
+        """
+        failures = {}
+        for position, (recipient, message) in enumerate(notifications):
+            try:
+                self.send_notification(recipient, message)
+            except Exception as e:
+                failures[position] = e
+        return failures
+
 
 class EmailService(NotificationService):
     """Service to send emails"""
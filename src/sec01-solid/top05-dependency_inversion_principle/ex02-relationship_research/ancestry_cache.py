@@ -0,0 +1,257 @@
+from collections import OrderedDict, deque
+from importlib import import_module
+from itertools import takewhile
+from typing import Iterator
+
+from relationship_index import IndexedRelationships
+
+dip = import_module("prg04-dip_adherence")
+
+
+class ClosureCache:
+    """
+    A least recently used cache of transitive closures: for a person id, the ids of
+    everyone reachable from it with the number of generations in between, in the order
+    of a breadth-first walk.
+
+    A closure near the root of a large tree holds most of its persons, so the cache is
+    bounded by the entries of all its closures as well as by their number, and a
+    closure larger than the whole budget is not kept at all.
+    """
+
+    def __init__(self, maxsize: int = 1_024, max_entries: int = 1_000_000):
+        """
+        :param maxsize: the number of closures kept
+        :param max_entries: the number of ids kept across all closures
+        """
+        self.maxsize = maxsize
+        self.max_entries = max_entries
+        self.entries = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._closures: OrderedDict[int, dict[int, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._closures)
+
+    def __str__(self) -> str:
+        return (
+            f"{len(self)}/{self.maxsize} closures of {self.entries}/{self.max_entries} "
+            f"entries, {self.hits} hits, {self.misses} misses, "
+            f"{self.invalidations} invalidated, hit rate {self.hit_rate:.1%}"
+        )
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of lookups answered from the cache"""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, person_id: int) -> dict[int, int] | None:
+        closure = self._closures.get(person_id)
+        if closure is None:
+            self.misses += 1
+            return None
+        self._closures.move_to_end(person_id)
+        self.hits += 1
+        return closure
+
+    def put(self, person_id: int, closure: dict[int, int]) -> None:
+        previous = self._closures.pop(person_id, None)
+        if previous is not None:
+            self.entries -= len(previous)
+        if len(closure) > self.max_entries:
+            return
+        self._closures[person_id] = closure
+        self.entries += len(closure)
+        while len(self._closures) > self.maxsize or self.entries > self.max_entries:
+            _, evicted = self._closures.popitem(last=False)
+            self.entries -= len(evicted)
+
+    def invalidate(self, person_id: int) -> None:
+        """
+        Drops the closure of a person and every closure reaching it, the only ones a new
+        relation can change
+        """
+        stale = [
+            key
+            for key, closure in self._closures.items()
+            if key == person_id or person_id in closure
+        ]
+        for key in stale:
+            self.entries -= len(self._closures.pop(key))
+        self.invalidations += len(stale)
+
+
+def _closure(index: list[list[int]], start: int) -> dict[int, int]:
+    """
+    Walks an adjacency index breadth-first from an id, returning the depth of every id
+    reached
+    """
+    depths = {start: 0}
+    pending = deque([start])
+    while pending:
+        current = pending.popleft()
+        depth = depths[current] + 1
+        for related in index[current]:
+            if related not in depths:
+                depths[related] = depth
+                pending.append(related)
+    del depths[start]
+    return depths
+
+
+class CachedRelationships(IndexedRelationships):
+    """
+    IndexedRelationships remembering the descendants and ancestors of the persons asked
+    about, so repeated queries on the same part of the tree are answered without walking
+    it again. Adding a relation drops only the closures it changes: the descendants of
+    the parent and of everyone above it, and the ancestors of the child and of everyone
+    below it.
+    """
+
+    def __init__(self, maxsize: int = 1_024, max_entries: int = 1_000_000):
+        """
+        :param maxsize: the number of closures kept per direction
+        :param max_entries: the number of ids kept across the closures of a direction
+        """
+        super().__init__()
+        self.descendants = ClosureCache(maxsize, max_entries)
+        self.ancestors = ClosureCache(maxsize, max_entries)
+
+    def add_parent_and_child(self, parent: dip.Person, child: dip.Person):
+        """
+        Enables construction of the family tree, keeping the cached closures the new
+        relation leaves unchanged
+        """
+        edges = self.edges
+        super().add_parent_and_child(parent, child)
+        if self.edges == edges:
+            return
+        if self.descendants:
+            self.descendants.invalidate(self.id_of(parent))
+        if self.ancestors:
+            self.ancestors.invalidate(self.id_of(child))
+
+    def _cached_closure(
+        self, cache: ClosureCache, index: list[list[int]], person: dip.Person
+    ) -> dict[int, int]:
+        person_id = self._ids.get(person)
+        if person_id is None:
+            return {}
+        closure = cache.get(person_id)
+        if closure is None:
+            closure = _closure(index, person_id)
+            cache.put(person_id, closure)
+        return closure
+
+    def _within(
+        self, closure: dict[int, int], max_depth: int | None
+    ) -> Iterator[dip.Person]:
+        persons = self._persons
+        if max_depth is None:
+            return (persons[i] for i in closure)
+        # closures are in breadth-first order, so the walk stops at the first one too
+        # deep
+        within = takewhile(lambda item: item[1] <= max_depth, closure.items())
+        return (persons[i] for i, _ in within)
+
+    def find_descendants_of(
+        self,
+        person: dip.Person,
+        max_depth: int | None = None,
+        depth_first: bool = False,
+    ) -> Iterator[dip.Person]:
+        """
+        Finds the descendants of a person, generation by generation from the cache, or
+        depth first by walking
+        """
+        if depth_first:
+            return super().find_descendants_of(person, max_depth, depth_first)
+        closure = self._cached_closure(self.descendants, self._children, person)
+        return self._within(closure, max_depth)
+
+    def find_ancestors_of(
+        self,
+        person: dip.Person,
+        max_depth: int | None = None,
+        depth_first: bool = False,
+    ) -> Iterator[dip.Person]:
+        """
+        Finds the ancestors of a person, generation by generation from the cache, or
+        depth first by walking
+        """
+        if depth_first:
+            return super().find_ancestors_of(person, max_depth, depth_first)
+        closure = self._cached_closure(self.ancestors, self._parents, person)
+        return self._within(closure, max_depth)
+
+    def find_common_ancestors_of(
+        self, first: dip.Person, second: dip.Person, max_depth: int | None = None
+    ) -> Iterator[dip.Person]:
+        """
+        Finds the ancestors two persons share from their cached closures, nearest to the
+        first person first
+        """
+        first_closure = self._cached_closure(self.ancestors, self._parents, first)
+        second_closure = self._cached_closure(self.ancestors, self._parents, second)
+        persons = self._persons
+        shared = first_closure.items()
+        if max_depth is not None:
+            shared = takewhile(lambda item: item[1] <= max_depth, shared)
+            return (
+                persons[i]
+                for i, _ in shared
+                if i in second_closure and second_closure[i] <= max_depth
+            )
+        return (persons[i] for i, _ in shared if i in second_closure)
+
+    def is_ancestor_of(self, ancestor: dip.Person, person: dip.Person) -> bool:
+        """
+        Whether a person descends from another, a lookup once the ancestors of the
+        person are cached
+        """
+        ancestor_id = self._ids.get(ancestor)
+        closure = self._cached_closure(self.ancestors, self._parents, person)
+        return ancestor_id is not None and ancestor_id in closure
+
+
+def driver():
+    names = ["Ada", "Bob", "Cid", "Dee", "Eve", "Fay", "Gus"]
+    ada, bob, cid, dee, eve, fay, gus = map(dip.Person, names)
+
+    relationships = CachedRelationships()
+    for parent, child in [
+        (ada, cid),
+        (bob, cid),
+        (ada, dee),
+        (cid, eve),
+        (dee, fay),
+        (eve, gus),
+    ]:
+        relationships.add_parent_and_child(parent, child)
+
+    print(
+        f"Descendants of {ada}: {', '.join(map(str, relationships.find_descendants_of(ada)))}"
+    )
+    print(
+        f"Grandchildren of {ada}: {', '.join(map(str, relationships.find_descendants_of(ada, 2)))}"
+    )
+    print(
+        f"Ancestors of {gus}: {', '.join(map(str, relationships.find_ancestors_of(gus)))}"
+    )
+    print(
+        f"Common ancestors of {gus} and {fay}: {', '.join(map(str, relationships.find_common_ancestors_of(gus, fay)))}"
+    )
+
+    relationships.add_parent_and_child(fay, dip.Person("Hal"))
+    print(
+        f"Descendants of {ada} after Hal was born: {', '.join(map(str, relationships.find_descendants_of(ada)))}"
+    )
+    print(f"Descendants: {relationships.descendants}")
+    print(f"Ancestors:   {relationships.ancestors}")
+
+
+if __name__ == "__main__":
+    driver()
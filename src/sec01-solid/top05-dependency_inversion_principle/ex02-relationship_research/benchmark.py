@@ -0,0 +1,240 @@
+import csv
+import os
+import random
+import tempfile
+import time
+from importlib import import_module
+from typing import Iterator
+
+from ancestry_cache import CachedRelationships
+from relationship_index import IndexedRelationships
+from sqlite_relationships import SQLiteRelationships
+
+dip = import_module("prg04-dip_adherence")
+
+
+def family_tree(
+    persons: int, width: int = 10_000, seed: int = 0
+) -> Iterator[tuple[dip.Person, dip.Person]]:
+    """
+    Yields the parent-child relations of a family tree of generations of `width`
+    persons, where the persons of a generation are paired into couples and every child
+    of the next generation is given to a random couple, so each person but the founders
+    has two parents and every relation is yielded twice, once per parent.
+
+    :param persons: the number of persons in the tree
+    :param width: the number of persons per generation
+    :param seed: the seed of the tree, so runs are comparable
+    """
+    rng = random.Random(seed)
+    previous = [dip.Person(f"p{i}") for i in range(min(width, persons))]
+    created = len(previous)
+    while created < persons:
+        generation = [
+            dip.Person(f"p{i}") for i in range(created, min(created + width, persons))
+        ]
+        created += len(generation)
+        couples = len(previous) // 2
+        for child in generation:
+            couple = rng.randrange(couples) * 2
+            yield previous[couple], child
+            yield previous[couple + 1], child
+        previous = generation
+
+
+def benchmark_index(persons: int = 1_000_000, queries: int = 10_000) -> None:
+    """
+    Compares child lookups of Relationships, which scans every relation, with
+    IndexedRelationships on a family tree with millions of relations, and times the
+    parent and sibling queries only the index offers.
+
+    :param persons: the number of persons in the tree
+    :param queries: the number of persons queried on the index
+    """
+    relations = list(family_tree(persons))
+    rng = random.Random(1)
+    queried = [parent for parent, _ in rng.sample(relations, queries)]
+
+    start = time.perf_counter()
+    scanned = dip.Relationships()
+    for parent, child in relations:
+        scanned.add_parent_and_child(parent, child)
+    scanned_build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = IndexedRelationships()
+    for parent, child in relations:
+        indexed.add_parent_and_child(parent, child)
+    indexed_build = time.perf_counter() - start
+
+    # a scan takes seconds on a tree this size, so only a few are timed
+    scans = queried[:3]
+    start = time.perf_counter()
+    for person in scans:
+        expected = list(scanned.find_all_children_of(person))
+        if list(indexed.find_all_children_of(person)) != expected:
+            raise AssertionError(f"children of {person} differ")
+    scan = (time.perf_counter() - start) / len(scans)
+
+    timings = {}
+    for name, find in (
+        ("children", indexed.find_all_children_of),
+        ("parents", indexed.find_all_parents_of),
+        ("siblings", indexed.find_all_siblings_of),
+    ):
+        start = time.perf_counter()
+        for person in queried:
+            for _ in find(person):
+                pass
+        timings[name] = (time.perf_counter() - start) / queries
+
+    print(f"Family tree of {len(indexed)} persons and {indexed.edges} relations")
+    print(
+        f" - Relationships:        built in {scanned_build:6.2f} s, "
+        f"children in {scan * 1e6:12.1f} µs per query"
+    )
+    print(
+        f" - IndexedRelationships: built in {indexed_build:6.2f} s, "
+        + ", ".join(f"{name} in {t * 1e6:.1f} µs" for name, t in timings.items())
+        + " per query"
+    )
+
+
+def benchmark_ancestry(
+    persons: int = 50_000, width: int = 500, hot: int = 20, queries: int = 100
+) -> None:
+    """
+    Compares transitive queries walked on every call by IndexedRelationships with the
+    cached closures of CachedRelationships, for repeated queries on a few hot persons of
+    a deep tree and with relations added in between.
+
+    :param persons: the number of persons in the tree
+    :param width: the number of persons per generation, so the tree is persons / width
+        generations deep
+    :param hot: the number of persons queried
+    :param queries: the number of rounds, each asking every kind of query once
+    """
+    relations = list(family_tree(persons, width))
+    walked, cached = IndexedRelationships(), CachedRelationships()
+    for relationships in (walked, cached):
+        for parent, child in relations:
+            relationships.add_parent_and_child(parent, child)
+
+    rng = random.Random(2)
+    middle = [child for _, child in relations[len(relations) // 2 :]]
+    hot_persons = rng.sample(middle, hot)
+    pairs = [tuple(rng.sample(hot_persons, 2)) for _ in range(queries)]
+    newborns = iter(dip.Person(f"newborn{i}") for i in range(queries))
+
+    def workload(relationships: IndexedRelationships) -> tuple[float, int]:
+        found = 0
+        start = time.perf_counter()
+        for i, (first, second) in enumerate(pairs):
+            found += sum(1 for _ in relationships.find_descendants_of(first, 3))
+            found += sum(1 for _ in relationships.find_ancestors_of(first))
+            found += sum(
+                1 for _ in relationships.find_common_ancestors_of(first, second)
+            )
+            found += sum(
+                1 for _ in relationships.find_common_ancestors_of(first, second, 8)
+            )
+            found += relationships.is_ancestor_of(second, first)
+            if i % 10 == 0:
+                # a birth below a hot person drops the closures reaching it
+                relationships.add_parent_and_child(second, next(newborns))
+        return time.perf_counter() - start, found
+
+    walked_time, walked_found = workload(walked)
+    newborns = iter(dip.Person(f"newborn{i}") for i in range(queries))
+    cached_time, cached_found = workload(cached)
+    if walked_found != cached_found:
+        raise AssertionError("cached closures differ from walked ones")
+
+    print(
+        f"{queries} rounds of descendant, ancestor, common ancestor and ancestry queries on {hot} persons "
+        f"of a {persons // width} generation tree"
+    )
+    print(
+        f" - IndexedRelationships: {walked_time * 1000:8.1f} ms, "
+        f"{walked_time / queries * 1e6:8.1f} µs per round"
+    )
+    print(
+        f" - CachedRelationships:  {cached_time * 1000:8.1f} ms, "
+        f"{cached_time / queries * 1e6:8.1f} µs per round"
+    )
+    print(f"   descendants {cached.descendants}")
+    print(f"   ancestors   {cached.ancestors}")
+
+
+def benchmark_sqlite(persons: int = 1_000_000, queries: int = 10_000) -> None:
+    """
+    Compares starting from a CSV file of relations, rebuilt into IndexedRelationships on
+    every start, with SQLiteRelationships, imported once and reopened afterwards, and
+    times their child lookups.
+
+    :param persons: the number of persons in the tree
+    :param queries: the number of lookups, a fifth of them on a hundred persons asked
+        about repeatedly
+    """
+    relations = list(family_tree(persons))
+    rng = random.Random(3)
+    asked = [parent for parent, _ in rng.sample(relations, queries * 4 // 5)]
+    # the rest goes to a few persons asked about again and again
+    asked += rng.choices(asked[:100], k=queries - len(asked))
+    rng.shuffle(asked)
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "relations.csv")
+        path = os.path.join(directory, "relations.db")
+        with open(csv_path, "w", newline="", encoding="utf-8") as fh:
+            csv.writer(fh).writerows((p.name, c.name) for p, c in relations)
+        del relations
+
+        start = time.perf_counter()
+        indexed = IndexedRelationships()
+        with open(csv_path, newline="", encoding="utf-8") as fh:
+            for parent, child in csv.reader(fh):
+                indexed.add_parent_and_child(dip.Person(parent), dip.Person(child))
+        rebuild = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with SQLiteRelationships(path) as relationships:
+            imported = relationships.import_csv(csv_path)
+        bulk_import = time.perf_counter() - start
+
+        start = time.perf_counter()
+        relationships = SQLiteRelationships(path)
+        reopen = time.perf_counter() - start
+
+        with relationships:
+            start = time.perf_counter()
+            for person in asked:
+                for _ in relationships.find_all_children_of(person):
+                    pass
+            lookups = time.perf_counter() - start
+            hits, misses = relationships.hits, relationships.misses
+            for person in asked[:1_000]:
+                if list(relationships.find_all_children_of(person)) != list(
+                    indexed.find_all_children_of(person)
+                ):
+                    raise AssertionError(f"children of {person} differ")
+        size = os.path.getsize(path)
+
+    print(f"Starting from {imported} relations of {persons} persons")
+    print(
+        f" - IndexedRelationships: rebuilt from CSV in {rebuild:6.2f} s on every start"
+    )
+    print(
+        f" - SQLiteRelationships:  imported once in {bulk_import:6.2f} s into {size / 2**20:.0f} MiB, "
+        f"reopened in {reopen * 1000:.1f} ms"
+    )
+    print(
+        f"   {queries} child lookups in {lookups / queries * 1e6:.1f} µs each, "
+        f"{hits} answered from the cache and {misses} by the database"
+    )
+
+
+if __name__ == "__main__":
+    benchmark_index()
+    benchmark_ancestry()
+    benchmark_sqlite()
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
+from collections import deque
 from enum import Enum
-from typing import Any, Iterator
+from typing import Any, Callable, Iterable, Iterator
 
 
 class Person:
@@ -13,8 +14,14 @@ class Person:
         return self.name
 
     def __eq__(self, value: Any) -> bool:
+        if not isinstance(value, Person):
+            return NotImplemented
         return self.name == value.name
 
+    def __hash__(self) -> int:
+        """Persons equal by name hash alike, so they can key dicts and sets"""
+        return hash(self.name)
+
 
 class Relationship(Enum):
     """Enum to define the possible relationships"""
@@ -31,11 +38,84 @@ class RelationshipBrowser(ABC):
     def find_all_children_of(self, parent: Person) -> Iterator[Person]:
         pass
 
+    @abstractmethod
+    def find_all_parents_of(self, child: Person) -> Iterator[Person]:
+        pass
+
+    def find_descendants_of(
+        self, person: Person, max_depth: int | None = None, depth_first: bool = False
+    ) -> Iterator[Person]:
+        """
+        Finds the children, grandchildren and so on of a person, each once.
+
+        :param person: the person to start from
+        :param max_depth: the number of generations to go down, all if None
+        :param depth_first: whether to follow each line down before the next one instead
+            of going generation by generation
+        """
+        return _traverse(person, self.find_all_children_of, max_depth, depth_first)
+
+    def find_ancestors_of(
+        self, person: Person, max_depth: int | None = None, depth_first: bool = False
+    ) -> Iterator[Person]:
+        """
+        Finds the parents, grandparents and so on of a person, each once.
+
+        :param person: the person to start from
+        :param max_depth: the number of generations to go up, all if None
+        :param depth_first: whether to follow each line up before the next one instead
+            of going generation by generation
+        """
+        return _traverse(person, self.find_all_parents_of, max_depth, depth_first)
+
+    def find_common_ancestors_of(
+        self, first: Person, second: Person, max_depth: int | None = None
+    ) -> Iterator[Person]:
+        """Finds the ancestors two persons share, nearest to the first person first"""
+        shared = set(self.find_ancestors_of(second, max_depth))
+        return (a for a in self.find_ancestors_of(first, max_depth) if a in shared)
+
+    def is_ancestor_of(self, ancestor: Person, person: Person) -> bool:
+        """Whether a person descends from another"""
+        return any(a == ancestor for a in self.find_ancestors_of(person))
+
+
+def _traverse(
+    start: Person,
+    neighbours: Callable[[Person], Iterable[Person]],
+    max_depth: int | None,
+    depth_first: bool,
+) -> Iterator[Person]:
+    """
+    Walks the relations from a person without recursion, so deep trees cannot exhaust
+    the stack
+    """
+    # the shallowest depth each person was reached at, a person reached deeper first is
+    # walked again when reached shallower, so a depth limit never hides someone within
+    # reach
+    depths = {start: 0}
+    pending = deque([(start, 0)])
+    take = pending.pop if depth_first else pending.popleft
+    while pending:
+        person, depth = take()
+        if depth != depths[person] or depth == max_depth:
+            continue
+        for related in neighbours(person):
+            reached = depths.get(related)
+            if reached is None:
+                yield related
+            elif reached <= depth + 1:
+                continue
+            depths[related] = depth + 1
+            pending.append((related, depth + 1))
+
 
 class Relationships(RelationshipBrowser):
     """Enables finding of relationships"""
 
-    relations = []
+    def __init__(self):
+        # kept per instance, a class attribute would be shared by all Relationships
+        self.relations = []
 
     def add_parent_and_child(self, parent: Person, child: Person):
         """Enables construction of the family tree"""
@@ -50,6 +130,12 @@ class Relationships(RelationshipBrowser):
             if r[0] == parent and r[1] == Relationship.PARENT
         )
 
+    def find_all_parents_of(self, child: Person) -> Iterator[Person]:
+        """Finds all parents of child by name"""
+        return (
+            r[2] for r in self.relations if r[0] == child and r[1] == Relationship.CHILD
+        )
+
 
 class Research:
     """Enables heritage research"""
@@ -0,0 +1,111 @@
+from importlib import import_module
+from typing import Iterator
+
+dip = import_module("prg04-dip_adherence")
+
+
+class IndexedRelationships(dip.RelationshipBrowser):
+    """
+    Relationships kept as an adjacency index: every person gets an integer id, and the
+    children and parents of each id are kept in lists, so queries cost O(degree) instead
+    of a scan over every relation.
+    """
+
+    def __init__(self):
+        self._ids: dict[dip.Person, int] = {}
+        self._persons: list[dip.Person] = []
+        self._children: list[list[int]] = []
+        self._parents: list[list[int]] = []
+        self.edges = 0
+
+    def __len__(self) -> int:
+        return len(self._persons)
+
+    def __contains__(self, person: dip.Person) -> bool:
+        return person in self._ids
+
+    def id_of(self, person: dip.Person) -> int:
+        """The id of a person, registering persons seen for the first time"""
+        person_id = self._ids.get(person)
+        if person_id is None:
+            person_id = self._ids[person] = len(self._persons)
+            self._persons.append(person)
+            self._children.append([])
+            self._parents.append([])
+        return person_id
+
+    def person(self, person_id: int) -> dip.Person:
+        """The person registered under an id"""
+        return self._persons[person_id]
+
+    def add_parent_and_child(self, parent: dip.Person, child: dip.Person):
+        """
+        Enables construction of the family tree, a relation added twice is kept once
+        """
+        parent_id, child_id = self.id_of(parent), self.id_of(child)
+        children = self._children[parent_id]
+        if child_id in children:
+            return
+        children.append(child_id)
+        self._parents[child_id].append(parent_id)
+        self.edges += 1
+
+    def _related(
+        self, index: list[list[int]], person: dip.Person
+    ) -> Iterator[dip.Person]:
+        person_id = self._ids.get(person)
+        if person_id is None:
+            return iter(())
+        persons = self._persons
+        return (persons[i] for i in index[person_id])
+
+    def find_all_children_of(self, parent: dip.Person) -> Iterator[dip.Person]:
+        """Finds all children of parent"""
+        return self._related(self._children, parent)
+
+    def find_all_parents_of(self, child: dip.Person) -> Iterator[dip.Person]:
+        """Finds all parents of child"""
+        return self._related(self._parents, child)
+
+    def find_all_siblings_of(self, person: dip.Person) -> Iterator[dip.Person]:
+        """
+        Finds everyone sharing at least one parent with person, half-siblings included
+        """
+        person_id = self._ids.get(person)
+        if person_id is None:
+            return iter(())
+        siblings = dict.fromkeys(
+            sibling_id
+            for parent_id in self._parents[person_id]
+            for sibling_id in self._children[parent_id]
+            if sibling_id != person_id
+        )
+        persons = self._persons
+        return (persons[i] for i in siblings)
+
+
+def driver():
+    john, jane = dip.Person("John"), dip.Person("Jane")
+    chris, matt = dip.Person("Chris"), dip.Person("Matt")
+
+    relationships = IndexedRelationships()
+    for parent in (john, jane):
+        relationships.add_parent_and_child(parent, chris)
+        relationships.add_parent_and_child(parent, matt)
+
+    research = dip.Research(relationships)
+    research.find_children_of(john)
+    print(
+        f"Parents of {chris}: {', '.join(map(str, relationships.find_all_parents_of(chris)))}"
+    )
+    print(
+        f"Siblings of {chris}: {', '.join(map(str, relationships.find_all_siblings_of(chris)))}"
+    )
+    # persons are hashable by name, so an equal Person finds the same entry
+    print(
+        f"Children of another John: {len(list(relationships.find_all_children_of(dip.Person('John'))))}"
+    )
+
+
+if __name__ == "__main__":
+    driver()
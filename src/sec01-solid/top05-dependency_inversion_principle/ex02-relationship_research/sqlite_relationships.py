@@ -0,0 +1,205 @@
+import csv
+import os
+import sqlite3
+import tempfile
+from collections import OrderedDict
+from importlib import import_module
+from itertools import islice
+from typing import Iterable, Iterator
+
+dip = import_module("prg04-dip_adherence")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS persons (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS relations (
+    parent INTEGER NOT NULL REFERENCES persons (id),
+    child INTEGER NOT NULL REFERENCES persons (id),
+    PRIMARY KEY (parent, child)
+) WITHOUT ROWID;
+"""
+# the primary key serves lookups by parent, this index the ones by child
+_CHILD_INDEX = (
+    "CREATE INDEX IF NOT EXISTS relations_by_child ON relations (child, parent)"
+)
+
+# sqlite3 keeps the compiled statement of every distinct SQL text, so these constant
+# texts are prepared only once
+_ADD_PERSON = "INSERT OR IGNORE INTO persons (name) VALUES (?)"
+_ADD_RELATION = """
+INSERT OR IGNORE INTO relations (parent, child)
+SELECT p.id, c.id FROM persons p, persons c WHERE p.name = ? AND c.name = ?
+"""
+_CHILDREN = """
+SELECT c.name FROM persons p
+JOIN relations r ON r.parent = p.id
+JOIN persons c ON c.id = r.child
+WHERE p.name = ?
+"""
+_PARENTS = """
+SELECT p.name FROM persons c
+JOIN relations r ON r.child = c.id
+JOIN persons p ON p.id = r.parent
+WHERE c.name = ?
+"""
+
+
+class SQLiteRelationships(dip.RelationshipBrowser):
+    """
+    Relationships stored in an SQLite database: persons are kept by name in one table
+    and relations as pairs of person ids in another, indexed both ways. Opening an
+    existing database reads nothing up front, so startup takes the same time whatever
+    the size of the tree, and the results of recent lookups are kept in a small LRU
+    cache.
+    """
+
+    def __init__(self, path: str = ":memory:", cache_size: int = 256):
+        """
+        :param path: the database file, created if missing, or ":memory:" for a database
+            which is not kept
+        :param cache_size: the number of lookup results kept
+        """
+        self.path = path
+        self.cache_size = cache_size
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict[tuple[str, str], tuple[dip.Person, ...]] = (
+            OrderedDict()
+        )
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+            self._connection.execute(_CHILD_INDEX)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM persons").fetchone()[0]
+
+    def close(self) -> None:
+        """Closes the database, everything added is already committed"""
+        self._connection.close()
+
+    def add_parent_and_child(self, parent: dip.Person, child: dip.Person):
+        """Enables construction of the family tree, committing the relation at once"""
+        with self._connection:
+            self._connection.executemany(_ADD_PERSON, [(parent.name,), (child.name,)])
+            self._connection.execute(_ADD_RELATION, (parent.name, child.name))
+        self._cache.pop(("children", parent.name), None)
+        self._cache.pop(("parents", child.name), None)
+
+    def import_relations(
+        self, relations: Iterable[tuple[str, str]], batch_size: int = 100_000
+    ) -> int:
+        """
+        Adds parent and child name pairs in transactions of a batch each, and returns
+        the number of pairs read.
+
+        A batch is staged in a temporary table and added with two set-wise inserts
+        instead of three statements per pair. When the database has no relations yet,
+        the index by child is built once at the end rather than kept up to date on every
+        insert.
+
+        :param relations: the pairs of parent and child names
+        :param batch_size: the number of pairs per transaction
+        """
+        connection = self._connection
+        empty = connection.execute("SELECT 1 FROM relations LIMIT 1").fetchone() is None
+        if empty:
+            connection.execute("DROP INDEX IF EXISTS relations_by_child")
+        connection.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS staged (parent TEXT NOT NULL, child TEXT NOT NULL)"
+        )
+        relations = iter(relations)
+        count = 0
+        try:
+            while batch := list(islice(relations, batch_size)):
+                with connection:
+                    connection.executemany("INSERT INTO staged VALUES (?, ?)", batch)
+                    connection.execute(
+                        "INSERT OR IGNORE INTO persons (name) "
+                        "SELECT parent FROM staged UNION SELECT child FROM staged"
+                    )
+                    connection.execute(
+                        "INSERT OR IGNORE INTO relations (parent, child) "
+                        "SELECT p.id, c.id FROM staged s "
+                        "JOIN persons p ON p.name = s.parent JOIN persons c ON c.name = s.child"
+                    )
+                    connection.execute("DELETE FROM staged")
+                count += len(batch)
+        finally:
+            with connection:
+                connection.execute(_CHILD_INDEX)
+            connection.execute("PRAGMA optimize")
+            self._cache.clear()
+        return count
+
+    def import_csv(self, path: str, batch_size: int = 100_000) -> int:
+        """
+        Adds the relations of a CSV file of parent and child names, one pair per row,
+        and returns the number of rows.
+
+        :param path: the CSV file, without a header
+        :param batch_size: the number of rows per transaction
+        """
+        with open(path, newline="", encoding="utf-8") as fh:
+            rows = ((row[0], row[1]) for row in csv.reader(fh) if row)
+            return self.import_relations(rows, batch_size)
+
+    def _lookup(
+        self, kind: str, statement: str, person: dip.Person
+    ) -> Iterator[dip.Person]:
+        key = kind, person.name
+        result = self._cache.get(key)
+        if result is None:
+            self.misses += 1
+            rows = self._connection.execute(statement, (person.name,))
+            result = tuple(dip.Person(name) for name, in rows)
+            self._cache[key] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self.hits += 1
+            self._cache.move_to_end(key)
+        return iter(result)
+
+    def find_all_children_of(self, parent: dip.Person) -> Iterator[dip.Person]:
+        """Finds all children of parent by name"""
+        return self._lookup("children", _CHILDREN, parent)
+
+    def find_all_parents_of(self, child: dip.Person) -> Iterator[dip.Person]:
+        """Finds all parents of child by name"""
+        return self._lookup("parents", _PARENTS, child)
+
+
+def driver():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "relationships.db")
+        csv_path = os.path.join(directory, "relationships.csv")
+        with open(csv_path, "w", newline="", encoding="utf-8") as fh:
+            csv.writer(fh).writerows(
+                [("John", "Chris"), ("John", "Matt"), ("Chris", "Amy")]
+            )
+
+        with SQLiteRelationships(path) as relationships:
+            print(f"Imported {relationships.import_csv(csv_path)} relations")
+            relationships.add_parent_and_child(dip.Person("Matt"), dip.Person("Zoe"))
+
+        # reopening reads nothing up front, the relations are looked up when asked for
+        with SQLiteRelationships(path) as relationships:
+            research = dip.Research(relationships)
+            research.find_children_of(dip.Person("John"))
+            descendants = relationships.find_descendants_of(dip.Person("John"))
+            print(f"Descendants of John: {', '.join(map(str, descendants))}")
+
+
+if __name__ == "__main__":
+    driver()